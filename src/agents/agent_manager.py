@@ -28,9 +28,8 @@ Technology Stack:
 
 
 import os
+import sys
 import logging
-from chromadb import Client
-from chromadb.config import Settings
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain import hub
@@ -39,15 +38,19 @@ from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_community.chat_message_histories import ChatMessageHistory
 from dotenv import load_dotenv
 from tools import get_tools
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
+
+# Add path for vector store backend selection
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'embeddings'))
+from vector_db import create_client
 
 # Configure logging to DEBUG level
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AgentManager:
-    def __init__(self, db_path: str = r"D:\Code Explainer\src\embeddings\vector_db"):
-        """Initialize the agent manager with database, LLM, and tools."""
+    def __init__(self, db_path: str = r"D:\Code Explainer\src\embeddings\vector_db", monitoring: Optional[Any] = None):
+        """Initialize the agent manager with database, LLM, and tools (reporting cache metrics to monitoring)."""
         try:
             logger.debug("Initializing AgentManager")
             # Validate environment variables
@@ -55,7 +58,7 @@ class AgentManager:
                 raise ValueError("GEMINI_API_KEY environment variable is not set.")
 
             os.makedirs(db_path, exist_ok=True)
-            self.client = Client(Settings(persist_directory=db_path))
+            self.client = create_client(db_path)  # Backend chosen by VECTOR_DB_BACKEND
             self.llm = ChatGoogleGenerativeAI(
                 model="gemini-1.5-flash",
                 api_key=os.getenv("GEMINI_API_KEY"),
@@ -63,7 +66,7 @@ class AgentManager:
             )
             logger.debug("LLM initialized: %s", self.llm)
 
-            self.tools = get_tools(self.client)
+            self.tools = get_tools(self.client, monitoring=monitoring)
             logger.debug("Tools initialized: %s", [tool.name for tool in self.tools])
 
             # Use the official React prompt from LangChain hub
@@ -143,6 +146,35 @@ class AgentManager:
                 "error": str(e)
             }
 
+    async def aprocess_query(self, query: str, session_id: str = "default") -> Dict:
+        """Async process_query: awaits the agent (LLM and tool calls) with ainvoke."""
+        try:
+            logger.debug("Processing async query: %s, session_id: %s", query, session_id)
+
+            response = await self.agent_with_chat_history.ainvoke(
+                {"input": query},
+                config={"configurable": {"session_id": session_id}}
+            )
+            logger.debug("Agent response: %s", response)
+
+            final_answer = response.get("output", str(response))
+            logger.info("Successfully processed async query: %s", query[:50])
+            return {
+                "response": final_answer,
+                "source": "agent",
+                "session_id": session_id,
+                "success": True
+            }
+        except Exception as e:
+            logger.error("Async query processing failed: %s", str(e))
+            return {
+                "response": f"I apologize, but I encountered an error while processing your query: {str(e)}",
+                "source": "error",
+                "session_id": session_id,
+                "success": False,
+                "error": str(e)
+            }
+
     def process_query_simple(self, query: str) -> Dict:
         """Simple query processing without chat history for testing."""
         try:
@@ -27,34 +27,68 @@ Technology Stack:
 """
 
 import os
+import sys
 import logging
-import requests
-from chromadb import Client
-from chromadb.config import Settings
 from dotenv import load_dotenv
 from langchain_core.tools import Tool
-from langchain_huggingface import HuggingFaceEmbeddings
 from typing import Dict, Optional, List, Any
 import json
-import google.generativeai as genai
+
+try:
+    from chromadb import Client
+    from chromadb.config import Settings
+except ImportError:
+    # Only the chroma backend needs chromadb; the numpy backends pass their own client in
+    Client = Any
+    Settings = None
+
+# Add path for the shared embedding model registry and vector DB helpers
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'embeddings'))
+from model_registry import RegistryEmbeddings, get_query_cache
+from vector_db import DEFAULT_COLLECTION
+from mmr import mmr_select
+from lexical_index import RRF_K, get_lexical_index, query_identifiers, reciprocal_rank_fusion, tokenize
+
+# Add path for the shared HTTP client and Gemini model factory
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'pipeline'))
+from http_client import HTTPClientError, get_http_client
+import model_factory
 
 # Load environment variables
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_TIMEOUT = 15  # seconds
+WEB_SEARCH_UNAVAILABLE = "Web search is currently unavailable. Please configure API keys for Tavily or Gemini to enable web search functionality."
+
 class DatabaseTool:
     """Enhanced database retrieval tool with embeddings for coding questions."""
 
-    def __init__(self, client: Client):
+    # Query words that map to the "language" metadata written at ingestion time
+    LANGUAGE_QUERY_TERMS = {
+        "python": "python", "javascript": "javascript", "typescript": "javascript", "node.js": "javascript",
+        "java": "java", "c++": "cpp", "cpp": "cpp", "golang": "go", "rust": "rust", "sql": "sql",
+    }
+
+    def __init__(self, client: Client, collection_name: str = DEFAULT_COLLECTION, monitoring: Optional[Any] = None):
         self.client = client
+        self.collection_name = collection_name
+        self.monitoring = monitoring
+        self.query_cache = get_query_cache()
+        # Diversity-aware selection: fetch_k nearest chunks, then MMR down to top_k
+        self.top_k = 3
+        self.fetch_k = int(os.getenv("RETRIEVAL_FETCH_K", "20"))
+        self.mmr_lambda = float(os.getenv("RETRIEVAL_MMR_LAMBDA", "0.5"))
+        self.last_selection_stats: Dict[str, int] = {}
         self.embeddings = None
         self._initialize_embeddings()
 
     def _initialize_embeddings(self):
-        """Initialize embeddings for better query matching."""
+        """Initialize embeddings for better query matching (shared registry model, loaded lazily)."""
         try:
-            self.embeddings = HuggingFaceEmbeddings(
+            self.embeddings = RegistryEmbeddings(
                 model_name="sentence-transformers/all-MiniLM-L6-v2"
             )
             logger.info("Embeddings initialized successfully")
@@ -62,77 +96,237 @@ class DatabaseTool:
             logger.warning(f"Failed to initialize embeddings: {e}")
             self.embeddings = None
 
-    def retrieve_from_db(self, query: str) -> str:
+    def retrieve_from_db(self, query: str, where: Optional[Dict[str, Any]] = None) -> str:
         """Retrieve relevant coding information from Chroma database."""
         try:
-            collections = self.client.list_collections()
-            if not collections:
-                return "No coding knowledge collections found in the database. Please ensure your coding database is properly set up."
-
-            results_found = []
-
-            # Search through all collections for coding-related content
-            for collection_info in collections:
-                try:
-                    collection = self.client.get_collection(name=collection_info.name)
-
-                    # Generate query embedding if available
-                    if self.embeddings:
-                        query_embedding = self.embeddings.embed_query(query)
-                        results = collection.query(
-                            query_embeddings=[query_embedding],
-                            n_results=3,
-                            include=["documents", "metadatas", "distances"]
-                        )
-                    else:
-                        # Fallback to text search
-                        results = collection.query(
-                            query_texts=[query],
-                            n_results=3,
-                            include=["documents", "metadatas"]
-                        )
-
-                    # Process results from this collection
-                    if results["documents"][0]:
-                        for i, doc in enumerate(results["documents"][0]):
-                            metadata = results["metadatas"][0][i] if results["metadatas"][0] else {}
-                            distance = results.get("distances", [[]])[0][i] if results.get("distances") else None
-
-                            # Filter for relevant coding content
-                            if self._is_coding_related(doc, metadata):
-                                results_found.append({
-                                    "content": doc[:800] + "..." if len(doc) > 800 else doc,
-                                    "metadata": metadata,
-                                    "collection": collection_info.name,
-                                    "relevance_score": 1.0 - distance if distance else 0.5
-                                })
-
-                except Exception as e:
-                    logger.warning(f"Error searching collection {collection_info.name}: {e}")
-                    continue
+            consolidated = self._get_consolidated_collection()
+            collections = None
+            if consolidated is None:
+                collections = self.client.list_collections()
+                if not collections:
+                    return "No coding knowledge collections found in the database. Please ensure your coding database is properly set up."
+
+            identifiers = query_identifiers(query)
+            if consolidated is not None and identifiers:
+                # Exact identifiers (e.g. `heapq.nsmallest`) are answered from BM25 without an encoder pass,
+                # but only by chunks that contain one; partial-term hits go through the fused path
+                results_found = self._lexical_results(consolidated, query, where or self._infer_where(query),
+                                                      required_terms=identifiers)
+                if results_found:
+                    return self._format_results(results_found[:self.top_k])
+
+            # One forward pass per request, shared by every collection queried below
+            query_embedding = self._embed_query(query)
+
+            if consolidated is not None:
+                results_found = self._search_consolidated(consolidated, query, query_embedding, where)
+            else:
+                results_found = self._search_all_collections(collections, query, query_embedding)
 
             if not results_found:
                 return "No relevant coding information found in the database for your query. Try rephrasing your question or ask about general programming concepts."
 
-            # Sort by relevance and return top results
-            results_found.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-            top_results = results_found[:3]
-
-            formatted_output = "**Relevant Coding Information from Database:**\n\n"
-            for i, result in enumerate(top_results, 1):
-                formatted_output += f"**Result {i}:**\n"
-                formatted_output += f"Content: {result['content']}\n"
-                if result['metadata']:
-                    formatted_output += f"Source: {result['metadata']}\n"
-                formatted_output += f"Collection: {result['collection']}\n"
-                formatted_output += f"Relevance: {result['relevance_score']:.2f}\n\n"
-
-            return formatted_output
+            # Candidates arrive best first (vector, fused or legacy cosine order); MMR keeps its
+            # own selection order, so no re-sort here
+            results_found = self._select_diverse(results_found, query_embedding)
+            return self._format_results(results_found[:self.top_k])
 
         except Exception as e:
             logger.error(f"Database retrieval failed: {e}")
             return f"Database search encountered an error: {str(e)}. Please try a different search approach."
 
+    def _get_consolidated_collection(self):
+        """Return the consolidated collection if it exists and has data, else None (legacy fan-out)."""
+        try:
+            collection = self.client.get_collection(name=self.collection_name)
+            return collection if collection.count() > 0 else None
+        except Exception:
+            return None
+
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed the query once, through the shared LRU cache; None means fall back to text search."""
+        if not self.embeddings:
+            return None
+        try:
+            embedding, hit = self.query_cache.get_or_compute(query, self.embeddings.model_name, self.embeddings.embed_query)
+            if self.monitoring:
+                self.monitoring.record_cache_event("query_embedding", hit)
+            return embedding
+        except Exception as e:
+            logger.warning(f"Query embedding failed, falling back to text search: {e}")
+            return None
+
+    def _infer_where(self, query: str) -> Optional[Dict[str, Any]]:
+        """Build a Chroma `where` filter from a language named in the query."""
+        query_lower = f" {query.lower()} "
+        for term, language in self.LANGUAGE_QUERY_TERMS.items():
+            if f" {term} " in query_lower or f" {term}?" in query_lower or f" {term}," in query_lower:
+                return {"language": language}
+        return None
+
+    def _query_collection(self, collection, query: str, query_embedding: Optional[List[float]],
+                          n_results: int = 3, where: Optional[Dict[str, Any]] = None) -> Dict:
+        """Run one query against a collection, by embedding when available, else by text."""
+        kwargs = {"n_results": n_results}
+        if where:
+            kwargs["where"] = where
+        if query_embedding is not None:
+            return collection.query(
+                query_embeddings=[query_embedding],
+                include=["documents", "metadatas", "distances", "embeddings"],
+                **kwargs
+            )
+        # Fallback to text search
+        return collection.query(
+            query_texts=[query],
+            include=["documents", "metadatas"],
+            **kwargs
+        )
+
+    def _search_consolidated(self, collection, query: str, query_embedding: Optional[List[float]],
+                             where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Single query against the consolidated collection, narrowed by metadata filters."""
+        where = where or self._infer_where(query)
+        if query_embedding is None:
+            # No encoder available: BM25 beats Chroma's own text query, which needs a model too
+            lexical = self._lexical_results(collection, query, where)
+            if lexical:
+                return lexical
+        n_results = max(self.fetch_k, self.top_k) if query_embedding is not None else self.top_k
+        results = self._query_collection(collection, query, query_embedding, n_results=n_results, where=where)
+        results_found = self._collect_results(results, self.collection_name)
+        if not results_found and where:
+            # The filter was a guess from the query text, so retry unfiltered
+            logger.debug(f"No results with filter {where}, retrying without it")
+            results = self._query_collection(collection, query, query_embedding, n_results=n_results)
+            results_found = self._collect_results(results, self.collection_name)
+            where = None
+        return self._fuse_lexical(collection, query, results_found, where)
+
+    def _lexical_results(self, collection, query: str, where: Optional[Dict[str, Any]] = None,
+                         include_embeddings: bool = False, required_terms: Optional[List[str]] = None) -> List[Dict]:
+        """BM25 hits for the query as result entries, best first (only chunks containing one of `required_terms`, if given)."""
+        # Resolved per query: a versioned client's live directory (and its index) can change
+        lexical_index = get_lexical_index(self.client)
+        if lexical_index is None:
+            return []
+        hits = lexical_index.search(self.collection_name, query, k=max(self.fetch_k, self.top_k))
+        if not hits:
+            return []
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        kwargs = {"ids": [doc_id for doc_id, _ in hits], "include": include}
+        if where:
+            kwargs["where"] = where
+        rows = collection.get(**kwargs)
+        positions = {row_id: i for i, row_id in enumerate(rows.get("ids") or [])}
+        embeddings = rows.get("embeddings") if include_embeddings else None
+        top_score = hits[0][1] or 1.0
+        results_found = []
+        for doc_id, score in hits:
+            i = positions.get(doc_id)
+            if i is None:
+                continue  # Filtered out by `where`, or deleted since it was indexed
+            doc = rows["documents"][i]
+            metadata = rows["metadatas"][i] if rows.get("metadatas") else {}
+            if doc and required_terms and not set(required_terms) & set(tokenize(doc)):
+                continue  # BM25 matched only parts of the identifier
+            if doc and self._is_coding_related(doc, metadata):
+                results_found.append({
+                    "id": doc_id,
+                    "content": doc[:800] + "..." if len(doc) > 800 else doc,
+                    "metadata": metadata,
+                    "collection": self.collection_name,
+                    "relevance_score": score / top_score,
+                    "embedding": embeddings[i] if embeddings is not None else None
+                })
+        return results_found
+
+    def _fuse_lexical(self, collection, query: str, vector_results: List[Dict],
+                      where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Merge BM25 and vector candidates with reciprocal rank fusion, best first. BM25 and
+        cosine scores are not comparable, so relevance_score becomes the fused score scaled
+        to [0, 1] (1.0 = ranked first by both).
+        """
+        lexical = self._lexical_results(collection, query, where, include_embeddings=True)
+        if not lexical:
+            return vector_results
+        by_id = {result["id"]: result for result in lexical}
+        by_id.update({result["id"]: result for result in vector_results})  # Prefer the vector hit's fields
+        rankings = [[result["id"] for result in vector_results], [result["id"] for result in lexical]]
+        best_possible = len(rankings) / (RRF_K + 1)
+        fused_results = []
+        for result_id, score in reciprocal_rank_fusion(rankings):
+            fused_results.append({**by_id[result_id], "relevance_score": score / best_possible})
+        return fused_results
+
+    def _search_all_collections(self, collections, query: str, query_embedding: Optional[List[float]]) -> List[Dict]:
+        """Legacy fan-out over one collection per chunk file."""
+        results_found = []
+
+        # Search through all collections for coding-related content
+        for collection_info in collections:
+            try:
+                collection = self.client.get_collection(name=collection_info.name)
+                results = self._query_collection(collection, query, query_embedding, n_results=3)
+                results_found.extend(self._collect_results(results, collection_info.name))
+            except Exception as e:
+                logger.warning(f"Error searching collection {collection_info.name}: {e}")
+                continue
+        # Every entry carries a cosine relevance here, so one sort ranks across collections
+        results_found.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        return results_found
+
+    def _collect_results(self, results: Dict, collection_name: str) -> List[Dict]:
+        """Turn a Chroma query result into scored, coding-related result entries."""
+        results_found = []
+        if results["documents"][0]:
+            for i, doc in enumerate(results["documents"][0]):
+                if not doc:
+                    continue
+                metadata = results["metadatas"][0][i] if results["metadatas"][0] else {}
+                distance = results.get("distances", [[]])[0][i] if results.get("distances") else None
+                embeddings = results.get("embeddings")
+                has_embeddings = embeddings is not None and embeddings[0] is not None and len(embeddings[0]) > i
+                embedding = embeddings[0][i] if has_embeddings else None
+
+                # Filter for relevant coding content
+                if self._is_coding_related(doc, metadata):
+                    results_found.append({
+                        "id": results["ids"][0][i],
+                        "content": doc[:800] + "..." if len(doc) > 800 else doc,
+                        "metadata": metadata,
+                        "collection": collection_name,
+                        "relevance_score": 1.0 - distance if distance else 0.5,
+                        "embedding": embedding
+                    })
+        return results_found
+
+    def _select_diverse(self, results_found: List[Dict], query_embedding: Optional[List[float]]) -> List[Dict]:
+        """Reduce candidates to a diverse top_k with MMR over their returned embeddings."""
+        with_embeddings = [result for result in results_found if result.get("embedding") is not None]
+        if query_embedding is None or len(with_embeddings) <= self.top_k:
+            return results_found
+        selected, stats = mmr_select(query_embedding, [result["embedding"] for result in with_embeddings],
+                                     k=self.top_k, lambda_mult=self.mmr_lambda)
+        self.last_selection_stats = stats
+        logger.info(f"MMR kept {stats['selected']} of {stats['candidates']} candidates, "
+                    f"dropped {stats['duplicates_dropped']} near-duplicates")
+        return [with_embeddings[i] for i in selected]
+
+    def _format_results(self, top_results: List[Dict]) -> str:
+        """Format the top results for the agent."""
+        formatted_output = "**Relevant Coding Information from Database:**\n\n"
+        for i, result in enumerate(top_results, 1):
+            formatted_output += f"**Result {i}:**\n"
+            formatted_output += f"Content: {result['content']}\n"
+            if result['metadata']:
+                formatted_output += f"Source: {result['metadata']}\n"
+            formatted_output += f"Collection: {result['collection']}\n"
+            formatted_output += f"Relevance: {result['relevance_score']:.2f}\n\n"
+
+        return formatted_output
+
     def _is_coding_related(self, document: str, metadata: dict) -> bool:
         """Check if the document contains coding-related content."""
         coding_keywords = [
@@ -152,11 +346,12 @@ class WebSearchTool:
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
         if not self.tavily_api_key:
             logger.warning("Tavily API key is not set. WebSearch tool may have limited functionality.")
+        self.http = get_http_client()
 
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         if self.gemini_api_key:
             try:
-                genai.configure(api_key=self.gemini_api_key)
+                model_factory.configure(self.gemini_api_key)
                 logger.info("Gemini API configured successfully for web search")
             except Exception as e:
                 logger.warning(f"Failed to configure Gemini API: {e}")
@@ -179,7 +374,23 @@ class WebSearchTool:
             if result:
                 return result
 
-        return "Web search is currently unavailable. Please configure API keys for Tavily or Gemini to enable web search functionality."
+        return WEB_SEARCH_UNAVAILABLE
+
+    async def asearch_web(self, query: str) -> str:
+        """Async search_web: awaits Tavily and Gemini without blocking the event loop."""
+        enhanced_query = self._enhance_coding_query(query)
+
+        if self.tavily_api_key:
+            result = await self._asearch_tavily(enhanced_query)
+            if result:
+                return result
+
+        if self.gemini_api_key:
+            result = await self._asearch_gemini(enhanced_query)
+            if result:
+                return result
+
+        return WEB_SEARCH_UNAVAILABLE
 
     def _enhance_coding_query(self, query: str) -> str:
         """Enhance query for better coding-related search results."""
@@ -203,74 +414,99 @@ class WebSearchTool:
     def _search_tavily(self, query: str) -> Optional[str]:
         """Search using Tavily API for real-time coding information."""
         try:
-            url = "https://api.tavily.com/search"
-            headers = {"Content-Type": "application/json"}
-            data = {
-                "api_key": self.tavily_api_key,
-                "query": query,
-                "max_results": 5,
-                "search_depth": "advanced",
-                "include_answer": True,
-                "include_domains": [
-                    "stackoverflow.com", "github.com", "leetcode.com",
-                    "geeksforgeeks.org", "python.org", "developer.mozilla.org",
-                    "docs.python.org", "tutorialspoint.com", "w3schools.com"
-                ]
-            }
-
-            response = requests.post(url, json=data, headers=headers, timeout=15)
-            response.raise_for_status()
-
-            result = response.json()
-
-            # Format results for coding context
-            formatted_results = []
-
-            # Include direct answer if available
-            if result.get("answer"):
-                formatted_results.append({
-                    "title": "Direct Answer",
-                    "content": result.get("answer"),
-                    "source": "Tavily AI",
-                    "type": "answer"
-                })
-
-            # Include search results
-            for item in result.get("results", [])[:4]:
-                formatted_results.append({
-                    "title": item.get("title", "No title available"),
-                    "url": item.get("url", "No URL available"),
-                    "content": item.get("content", "No content available")[:600] + "..." if len(item.get("content", "")) > 600 else item.get("content", ""),
-                    "source": "Web Search",
-                    "type": "result"
-                })
+            return self._format_tavily(self.http.post_json(TAVILY_URL, self._tavily_request(query),
+                                                           timeout=TAVILY_TIMEOUT))
+        except HTTPClientError as e:
+            logger.error(f"Tavily search failed: {e}")
+            return None
 
-            if not formatted_results:
-                return None
+    async def _asearch_tavily(self, query: str) -> Optional[str]:
+        """Async _search_tavily."""
+        try:
+            return self._format_tavily(await self.http.apost_json(TAVILY_URL, self._tavily_request(query),
+                                                                  timeout=TAVILY_TIMEOUT))
+        except HTTPClientError as e:
+            logger.error(f"Tavily search failed: {e}")
+            return None
 
-            # Create formatted output
-            output = "**Web Search Results:**\n\n"
-            for i, result in enumerate(formatted_results, 1):
-                if result["type"] == "answer":
-                    output += f"**🎯 {result['title']}:**\n{result['content']}\n\n"
-                else:
-                    output += f"**{i}. {result['title']}**\n"
-                    output += f"URL: {result['url']}\n"
-                    output += f"Content: {result['content']}\n\n"
+    def _tavily_request(self, query: str) -> Dict[str, Any]:
+        return {
+            "api_key": self.tavily_api_key,
+            "query": query,
+            "max_results": 5,
+            "search_depth": "advanced",
+            "include_answer": True,
+            "include_domains": [
+                "stackoverflow.com", "github.com", "leetcode.com",
+                "geeksforgeeks.org", "python.org", "developer.mozilla.org",
+                "docs.python.org", "tutorialspoint.com", "w3schools.com"
+            ]
+        }
+
+    def _format_tavily(self, result: Dict[str, Any]) -> Optional[str]:
+        """Format Tavily results for coding context."""
+        formatted_results = []
+
+        # Include direct answer if available
+        if result.get("answer"):
+            formatted_results.append({
+                "title": "Direct Answer",
+                "content": result.get("answer"),
+                "source": "Tavily AI",
+                "type": "answer"
+            })
+
+        # Include search results
+        for item in result.get("results", [])[:4]:
+            formatted_results.append({
+                "title": item.get("title", "No title available"),
+                "url": item.get("url", "No URL available"),
+                "content": item.get("content", "No content available")[:600] + "..." if len(item.get("content", "")) > 600 else item.get("content", ""),
+                "source": "Web Search",
+                "type": "result"
+            })
+
+        if not formatted_results:
+            return None
 
-            return output
+        # Create formatted output
+        output = "**Web Search Results:**\n\n"
+        for i, result in enumerate(formatted_results, 1):
+            if result["type"] == "answer":
+                output += f"**🎯 {result['title']}:**\n{result['content']}\n\n"
+            else:
+                output += f"**{i}. {result['title']}**\n"
+                output += f"URL: {result['url']}\n"
+                output += f"Content: {result['content']}\n\n"
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Tavily search failed: {e}")
-            return None
+        return output
 
     def _search_gemini(self, query: str) -> Optional[str]:
         """Generate coding response using Gemini API."""
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = model_factory.get_model('gemini-1.5-flash', api_key=self.gemini_api_key)
+            response = model.generate_content(self._gemini_prompt(query))
+            return self._format_gemini(response)
+
+        except Exception as e:
+            logger.error(f"Gemini API request failed: {e}")
+            return None
+
+    async def _asearch_gemini(self, query: str) -> Optional[str]:
+        """Async _search_gemini."""
+        try:
+            model = model_factory.get_model('gemini-1.5-flash', api_key=self.gemini_api_key)
+            response = await model.generate_content_async(self._gemini_prompt(query))
+            return self._format_gemini(response)
 
-            # Create a coding-focused prompt
-            coding_prompt = f"""
+        except Exception as e:
+            logger.error(f"Gemini API request failed: {e}")
+            return None
+
+    @staticmethod
+    def _gemini_prompt(query: str) -> str:
+        # Create a coding-focused prompt
+        return f"""
 As a coding expert, provide a comprehensive answer for the following programming query: {query}
 
 Please include:
@@ -283,20 +519,16 @@ Please include:
 Make your response practical and educational for a coding chatbot.
 """
 
-            response = model.generate_content(coding_prompt)
-
-            if not response.text:
-                logger.warning("No content returned from Gemini API")
-                return None
-
-            formatted_output = f"**Gemini AI Response:**\n\n{response.text}"
-            return formatted_output
-
-        except Exception as e:
-            logger.error(f"Gemini API request failed: {e}")
+    @staticmethod
+    def _format_gemini(response) -> Optional[str]:
+        if not response.text:
+            logger.warning("No content returned from Gemini API")
             return None
 
-def get_tools(client: Client) -> List[Tool]:
+        formatted_output = f"**Gemini AI Response:**\n\n{response.text}"
+        return formatted_output
+
+def get_tools(client: Client, monitoring: Optional[Any] = None) -> List[Tool]:
     """Initialize and return a list of tools optimized for coding chatbot."""
     try:
         # Validate environment variables
@@ -304,7 +536,7 @@ def get_tools(client: Client) -> List[Tool]:
             logger.warning("GEMINI_API_KEY not set. Some tools may have limited functionality.")
 
         # Initialize tool instances
-        db_tool = DatabaseTool(client)
+        db_tool = DatabaseTool(client, monitoring=monitoring)
         web_tool = WebSearchTool()
 
         # Create LangChain Tool objects with detailed descriptions
@@ -317,6 +549,7 @@ def get_tools(client: Client) -> List[Tool]:
             Tool(
                 name="WebSearch",
                 func=web_tool.search_web,
+                coroutine=web_tool.asearch_web,
                 description="Search the web for the latest coding information, programming tutorials, documentation, Stack Overflow solutions, GitHub repositories, and current programming trends. Use this for: latest framework updates, real-time coding solutions, community discussions, official documentation, new programming concepts."
             )
         ]
@@ -0,0 +1,104 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: One JSONL artifact per source file holding its chunks, instead of one file per chunk
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import json
+
+ARTIFACT_SUFFIX = ".jsonl"
+
+def artifact_path(artifact_dir, name):
+    """Path of the JSONL artifact for a source's chunk base name."""
+    return os.path.join(artifact_dir, f"{name}{ARTIFACT_SUFFIX}")
+
+def write_source_artifact(artifact_dir, name, chunks):
+    """
+    Write a source's chunks to name.jsonl, one JSON object per line, appended as they stream in.
+    The file is written under a temporary name and renamed at the end, so readers never see
+    a half-written artifact.
+    Args:
+        artifact_dir (str): Directory holding the artifacts.
+        name (str): Chunk base name of the source.
+        chunks (iterable): (chunk_id, text, metadata) tuples.
+    Returns:
+        int: Number of chunks written.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    path = artifact_path(artifact_dir, name)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        for chunk_id, text, metadata in chunks:
+            file.write(json.dumps({"id": chunk_id, "text": text, "metadata": metadata}, ensure_ascii=False))
+            file.write("\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+def iter_artifact(path):
+    """
+    Stream the chunks of one JSONL artifact.
+    Args:
+        path (str): Artifact file.
+    Yields:
+        tuple: (chunk_id, text, metadata).
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping malformed line {line_number} in {path}")
+                continue
+            yield record["id"], record["text"], record.get("metadata") or {}
+
+def iter_artifacts(artifact_dir):
+    """
+    Stream the chunks of every JSONL artifact in a directory.
+    Args:
+        artifact_dir (str): Directory holding the artifacts.
+    Yields:
+        tuple: (chunk_id, text, metadata).
+    """
+    with os.scandir(artifact_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(ARTIFACT_SUFFIX):
+                yield from iter_artifact(entry.path)
+
+def remove_source_artifact(artifact_dir, name):
+    """
+    Delete a source's JSONL artifact if it exists.
+    Returns:
+        bool: True if a file was removed.
+    """
+    path = artifact_path(artifact_dir, name)
+    if os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
@@ -27,7 +27,9 @@ Technology Stack:
 """
 
 import os
+import fnmatch
 from dotenv import load_dotenv
+from ingestion_manifest import IngestionManifest, hash_text, STAGE_CLEANED, DEFAULT_MANIFEST_PATH
 
 # Load environment variables
 load_dotenv()
@@ -62,42 +64,156 @@ def load_code_files(data_dir=None):
         print(f"Unexpected error loading files: {str(e)}")
         return {}
 
-def clean_code(lines):
+DEFAULT_INCLUDE = ("*.txt", "*.py")
+DEFAULT_EXCLUDE = (".git/*", "*/.git/*", "__pycache__/*", "*/__pycache__/*", "node_modules/*", "*/node_modules/*",
+                   ".venv/*", "*/.venv/*", "venv/*", "*/venv/*")
+
+def _matches(path, patterns):
+    return any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+
+def iter_code_files(data_dir, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE, recursive=True):
+    """
+    Lazily walk a directory tree and yield the files to ingest.
+    Args:
+        data_dir (str): Root directory.
+        include (tuple): Glob patterns a file's relative path (or name) must match (default: *.txt, *.py).
+        exclude (tuple): Glob patterns of relative paths to skip; matching directories are not descended into.
+        recursive (bool): Walk subdirectories (default: True).
+    Yields:
+        tuple: (relative_path, absolute_path) with '/' separators in relative_path.
+    """
+    if not os.path.exists(data_dir):
+        raise FileNotFoundError(f"Data directory not found: {data_dir}")
+    for root, dirs, files in os.walk(data_dir):
+        rel_root = os.path.relpath(root, data_dir).replace(os.sep, "/")
+        rel_root = "" if rel_root == "." else f"{rel_root}/"
+        if recursive:
+            # Prune excluded directories in place so os.walk never enters them
+            dirs[:] = sorted(d for d in dirs if not _matches(f"{rel_root}{d}/", exclude))
+        else:
+            dirs[:] = []
+        for filename in sorted(files):
+            rel_path = f"{rel_root}{filename}"
+            if _matches(rel_path, exclude):
+                continue
+            if _matches(rel_path, include) or _matches(filename, include):
+                yield rel_path, os.path.join(root, filename)
+
+def iter_file_lines(file_path):
+    """
+    Yield a file's lines one at a time without reading the whole file.
+    Args:
+        file_path (str): File to read.
+    Yields:
+        str: Lines without trailing newline characters.
+    """
+    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            yield line.rstrip("\r\n")
+
+def iter_clean_lines(lines, keep_indentation=False):
+    """
+    Lazy version of clean_code: strip each line and drop blank ones as they stream past.
+    Args:
+        lines (iterable): Lines to clean.
+        keep_indentation (bool): Only strip trailing whitespace and keep blank lines, so line
+            numbers still match the source.
+    Yields:
+        str: Cleaned lines (non-empty unless keep_indentation).
+    """
+    for line in lines:
+        if keep_indentation:
+            yield line.rstrip()
+        elif line.strip():
+            yield line.strip()
+
+def stream_code_files(data_dir=None, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE, keep_indentation=False):
+    """
+    Stream the corpus file by file with lines cleaned lazily; nothing is held beyond the current line.
+    Args:
+        data_dir (str, optional): Root directory (default: DATA_DIR environment variable).
+        include (tuple): Glob patterns of files to ingest.
+        exclude (tuple): Glob patterns of files and directories to skip.
+        keep_indentation (bool): Preserve leading whitespace.
+    Yields:
+        tuple: (relative_path, absolute_path, cleaned line iterator).
+    """
+    if data_dir is None:
+        data_dir = os.getenv("DATA_DIR", r"C:\Users\ursti\Downloads\Code Explainer\data")
+    for rel_path, file_path in iter_code_files(data_dir, include, exclude):
+        yield rel_path, file_path, iter_clean_lines(iter_file_lines(file_path), keep_indentation)
+
+def clean_code(lines, keep_indentation=False):
     """
     Remove extra spaces from the start and end of each line.
     Args:
         lines (list): List of text lines to clean.
+        keep_indentation (bool): Only strip trailing whitespace and keep blank lines, so the code
+            chunker can still parse the structure and report source line numbers (default: False).
     Returns:
         list: Cleaned list of lines.
     """
     try:
         if not lines or not isinstance(lines, list):
             raise ValueError("Input must be a non-empty list of lines.")
+        if keep_indentation:
+            return [line.rstrip() for line in lines]
         return [line.strip() for line in lines if line.strip()]
     except Exception as e:
         print(f"Error cleaning code: {str(e)}")
         return []
 
-def save_cleaned_data(code_data, output_dir=r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\cleaned_data"):
+def save_cleaned_data(code_data, output_dir=r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\cleaned_data", manifest=None,
+                      keep_indentation=False):
     """
     Save cleaned data to a new directory with original filenames.
     Args:
         code_data (dict): Dictionary of filename:lines pairs.
         output_dir (str): Directory to save cleaned files (default: specified path).
+        manifest (IngestionManifest, optional): Skip files whose content hash is unchanged and
+            remove cleaned files whose source disappeared.
+        keep_indentation (bool): Preserve leading whitespace (needed by code-aware chunking).
+    Returns:
+        dict: Lists of "written", "skipped" and "removed" filenames.
     """
+    summary = {"written": [], "skipped": [], "removed": []}
     try:
         if not code_data:
             raise ValueError("No data to save.")
         os.makedirs(output_dir, exist_ok=True)
         for filename, lines in code_data.items():
             cleaned_filename = os.path.join(output_dir, filename)  # Keep original filename
+            content = "\n".join(lines)
+            digest = (hash_text(f"indented-with-blank-lines\0{content}") if keep_indentation else hash_text(content)) if manifest else None
+            if manifest and not manifest.changed(STAGE_CLEANED, filename, digest) and os.path.exists(cleaned_filename):
+                summary["skipped"].append(filename)
+                continue
             with open(cleaned_filename, "w", encoding="utf-8") as file:
-                file.write("\n".join(clean_code(lines)))
+                file.write("\n".join(clean_code(lines, keep_indentation=keep_indentation)))
+            if manifest:
+                manifest.record(STAGE_CLEANED, filename, digest)
+            summary["written"].append(filename)
+
+        if manifest:
+            # Sources that were cleaned before but are gone now
+            for filename in manifest.keys(STAGE_CLEANED) - set(code_data):
+                cleaned_filename = os.path.join(output_dir, filename)
+                if os.path.exists(cleaned_filename):
+                    os.remove(cleaned_filename)
+                manifest.forget(STAGE_CLEANED, filename)
+                summary["removed"].append(filename)
     except Exception as e:
         print(f"Error saving cleaned data: {str(e)}")
+    return summary
 
 if __name__ == "__main__":
+    output_dir = r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\cleaned_data"
+    manifest = IngestionManifest(DEFAULT_MANIFEST_PATH)
     code_data = load_code_files()
-    save_cleaned_data(code_data)
-    for filename in code_data.keys():
+    # Code-aware chunking needs the original indentation
+    keep_indentation = os.getenv("CHUNKING_MODE", "text") == "code"
+    summary = save_cleaned_data(code_data, output_dir, manifest=manifest, keep_indentation=keep_indentation)
+    manifest.save()
+    for filename in summary["written"]:
         print(f"Processed {filename}")
+    print(f"Skipped {len(summary['skipped'])} unchanged, removed {len(summary['removed'])} deleted files")
@@ -0,0 +1,159 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Exact and near-duplicate (SimHash + LSH) chunk detection for the ingestion pipeline
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import re
+import hashlib
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SIMHASH_BITS = 64
+SOURCES_SEPARATOR = ","  # Chroma metadata values must be scalars, so source lists are joined
+
+def normalize_chunk(text):
+    """Collapse whitespace so re-indented or re-wrapped copies hash the same."""
+    return " ".join(text.split())
+
+def simhash(tokens, shingle_size=3):
+    """
+    64-bit SimHash of a token list: every shingle of shingle_size tokens votes on each bit,
+    so texts that share most shingles end up a few bits apart.
+    Args:
+        tokens (list): Tokens of the text.
+        shingle_size (int): Tokens per shingle.
+    Returns:
+        int: The fingerprint.
+    """
+    shingles = {" ".join(tokens[i:i + shingle_size]) for i in range(max(1, len(tokens) - shingle_size + 1))}
+    hashes = np.array([int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+                       for shingle in shingles], dtype=np.uint64)
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+class ChunkDeduplicator:
+    """
+    Drops chunks that repeat one already seen and records which sources each kept
+    (canonical) chunk also appears in.
+
+    - Exact duplicates: same text after whitespace normalization (SHA-256).
+    - Near duplicates: SimHash fingerprints at most max_distance bits apart. Fingerprints are
+      split into max_distance + 1 bands, so any pair within the distance shares at least one
+      band exactly and only chunks in the same band bucket are compared (LSH).
+
+    The first occurrence in stream order is canonical. Chunks shorter than min_tokens are
+    only deduplicated exactly, since short snippets collide too easily.
+    """
+
+    def __init__(self, max_distance=3, min_tokens=20, near_duplicates=True):
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+        self.near_duplicates = near_duplicates
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+        self.exact = {}        # normalized text hash -> canonical chunk ID
+        self.buckets = {}      # (band, band value) -> [(fingerprint, canonical chunk ID)]
+        self.sources = {}      # canonical chunk ID -> sources, for canonicals that have duplicates
+        self.canonical_sources = {}  # canonical chunk ID -> its own source
+        self.stats = {"chunks": 0, "exact_duplicates": 0, "near_duplicates": 0}
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (fingerprint >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def _near_match(self, fingerprint):
+        for key in self._band_keys(fingerprint):
+            for other, canonical_id in self.buckets.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return canonical_id
+        return None
+
+    def check(self, chunk_id, text, source=None):
+        """
+        Register a chunk.
+        Args:
+            chunk_id (str): Chunk ID.
+            text (str): Chunk text.
+            source (str, optional): Source the chunk came from.
+        Returns:
+            str: ID of the canonical chunk it duplicates, or None if it is new (and now canonical).
+        """
+        self.stats["chunks"] += 1
+        normalized = normalize_chunk(text)
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        canonical_id = self.exact.get(digest)
+        if canonical_id is not None:
+            self.stats["exact_duplicates"] += 1
+            return self._add_source(canonical_id, source)
+
+        tokens = TOKEN_PATTERN.findall(normalized)
+        fingerprint = None
+        if self.near_duplicates and len(tokens) >= self.min_tokens:
+            fingerprint = simhash(tokens)
+            canonical_id = self._near_match(fingerprint)
+            if canonical_id is not None:
+                self.stats["near_duplicates"] += 1
+                return self._add_source(canonical_id, source)
+
+        self.exact[digest] = chunk_id
+        self.canonical_sources[chunk_id] = source
+        if fingerprint is not None:
+            for key in self._band_keys(fingerprint):
+                self.buckets.setdefault(key, []).append((fingerprint, chunk_id))
+        return None
+
+    def _add_source(self, canonical_id, source):
+        sources = self.sources.setdefault(canonical_id, [self.canonical_sources.get(canonical_id)])
+        if source not in sources:
+            sources.append(source)
+        return canonical_id
+
+    def filter(self, chunks):
+        """
+        Pass through only canonical chunks of a (chunk_id, text, metadata) stream.
+        Args:
+            chunks (iterable): Chunks with metadata["source"].
+        Yields:
+            tuple: Chunks that are not duplicates of an earlier one.
+        """
+        for chunk_id, text, metadata in chunks:
+            if self.check(chunk_id, text, metadata.get("source")) is None:
+                yield chunk_id, text, metadata
+
+    def source_metadata(self):
+        """
+        Metadata to merge into canonical chunks that have duplicates.
+        Returns:
+            dict: canonical chunk ID -> {"sources": "a,b,c", "source_count": n}.
+        """
+        return {
+            canonical_id: {
+                "sources": SOURCES_SEPARATOR.join(source for source in sources if source),
+                "source_count": len([source for source in sources if source]),
+            }
+            for canonical_id, sources in self.sources.items()
+        }
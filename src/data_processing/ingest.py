@@ -0,0 +1,412 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Pipelined load -> clean -> chunk -> embed ingestion with bounded queues and per-stage stats
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from data_ingestion import iter_code_files, iter_clean_lines, DEFAULT_INCLUDE, DEFAULT_EXCLUDE
+from text_chunker import (chunk_code, chunk_lines_streaming, chunk_base_name, save_chunks, remove_stale_chunks,
+                          prune_deleted_sources, max_rss_mb)
+from ingestion_manifest import IngestionManifest, hash_source, STAGE_CHUNKED, DEFAULT_MANIFEST_PATH
+from chunk_artifacts import write_source_artifact, remove_source_artifact
+from dedup import ChunkDeduplicator
+
+# Add path for the embedding stage
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'embeddings'))
+from embedding_gen import embed_chunk_stream, build_chunk_metadata
+from vector_db import DEFAULT_COLLECTION, initialize_vector_db, export_collection
+from model_registry import DEFAULT_MODEL_NAME
+
+_DONE = object()  # End-of-stream marker passed through the queues
+ARTIFACT_FORMATS = ("none", "jsonl", "files")
+QUEUE_SAMPLE_SECONDS = 0.1
+
+class StageStats:
+    """Thread-safe item counter and busy-time accumulator for one pipeline stage."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.units = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, items=1, units=0, busy_seconds=0.0):
+        with self._lock:
+            self.items += items
+            self.units += units
+            self.busy_seconds += busy_seconds
+
+    def report(self, elapsed, unit_name):
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            unit_name: self.units,
+            "items_per_second": round(self.items / elapsed, 1) if elapsed else 0.0,
+            "busy_seconds": round(self.busy_seconds, 2),
+            # Share of the stage's worker capacity that was in use; the bottleneck is close to 1.0
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 2) if elapsed else 0.0,
+        }
+
+class QueueMonitor(threading.Thread):
+    """Samples queue depths in the background to report their maximum and mean."""
+
+    def __init__(self, queues):
+        super().__init__(daemon=True)
+        self.queues = queues
+        self.samples = {name: [] for name in queues}
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(QUEUE_SAMPLE_SECONDS):
+            for name, q in self.queues.items():
+                self.samples[name].append(q.qsize())
+
+    def report(self):
+        return {
+            name: {
+                "capacity": self.queues[name].maxsize,
+                "max_depth": max(samples) if samples else 0,
+                "mean_depth": round(sum(samples) / len(samples), 1) if samples else 0.0,
+            }
+            for name, samples in self.samples.items()
+        }
+
+def _put(q, item, stop):
+    """Blocking put that gives up once the pipeline is stopping (so threads never hang on a full queue)."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q, stop):
+    """Blocking get that returns _DONE once the pipeline is stopping (the producer may never send it)."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def _chunk_document(name, file_path, text, mode, chunk_size, chunk_overlap, max_chunk_chars,
+                    artifacts, artifact_dir, previous_count):
+    """
+    Process-pool task: clean and chunk one file, optionally write its chunks to artifact_dir.
+    Returns:
+        tuple: (name, chunks as (chunk_id, text, metadata), seconds spent).
+    """
+    start = time.perf_counter()
+    lines = iter_clean_lines(text.splitlines(), keep_indentation=(mode == "code"))
+    if mode == "code":
+        language = "python" if file_path.endswith(".py") else None
+        code_chunks = chunk_code("\n".join(lines), language=language, max_chunk_chars=max_chunk_chars)
+        texts = [chunk["text"] for chunk in code_chunks]
+        extras = [{key: chunk[key] for key in ("symbol", "kind", "start_line", "end_line")} for chunk in code_chunks]
+    else:
+        texts = list(chunk_lines_streaming(lines, chunk_size, chunk_overlap))
+        extras = [None] * len(texts)
+    chunks = [(f"{name}_chunk_{i}", chunk_text, build_chunk_metadata(name, i, chunk_text, extra))
+              for i, (chunk_text, extra) in enumerate(zip(texts, extras)) if chunk_text.strip()]
+    if artifacts == "jsonl":
+        write_source_artifact(artifact_dir, name, chunks)
+        remove_stale_chunks(name, 0, previous_count, artifact_dir)
+    elif artifacts == "files":
+        if texts:
+            save_chunks(texts, name, artifact_dir, chunk_metadata=extras if mode == "code" else None)
+        remove_stale_chunks(name, len(texts), previous_count, artifact_dir)
+        remove_source_artifact(artifact_dir, name)
+    return name, chunks, time.perf_counter() - start
+
+def ingest(data_dir=None, collection_name=DEFAULT_COLLECTION, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE,
+           mode="text", chunk_size=300, chunk_overlap=50, max_chunk_chars=1500, artifacts="none",
+           artifact_dir="chunked_data", io_workers=4, chunk_workers=None, embed_workers=1, batch_size=256,
+           queue_size=64, model_name=DEFAULT_MODEL_NAME, client=None, manifest=None, chunk_store=None,
+           dedup=False):
+    """
+    Ingest a source tree end to end as a pipelined job:
+
+        discover -> [thread pool: read files] -> loaded queue -> [process pool: clean + chunk]
+                 -> chunk queue -> [embed + upsert, optionally across embed_workers processes]
+
+    The queues are bounded, so a slow stage blocks the stages upstream of it instead of
+    buffering the corpus in memory. Chunks go straight from the chunker to the embedder;
+    nothing is written to cleaned_data/ or chunked_data/ unless artifacts asks for it.
+    Args:
+        data_dir (str, optional): Root directory (default: DATA_DIR environment variable).
+        collection_name (str): Target collection.
+        include (tuple): Glob patterns of files to ingest.
+        exclude (tuple): Glob patterns of files and directories to skip.
+        mode (str): 'text' or 'code' chunking.
+        chunk_size (int): Maximum characters per chunk in text mode.
+        chunk_overlap (int): Overlap between chunks in text mode.
+        max_chunk_chars (int): Maximum characters per chunk in code mode.
+        artifacts (str): 'none' keeps chunks in memory only, 'jsonl' also writes one append-only
+            name.jsonl per source, 'files' writes the legacy name_chunk_N.txt files.
+        artifact_dir (str): Directory for the artifacts.
+        io_workers (int): Threads reading files.
+        chunk_workers (int, optional): Chunking processes (default: cores - 1).
+        embed_workers (int): Embedding processes (1 encodes in this process).
+        batch_size (int): Chunks per encode/upsert batch.
+        queue_size (int): Capacity of each queue (files in the loaded queue, chunks x 16 in the chunk queue).
+        model_name (str): Embedding model name.
+        client (optional): Vector database client.
+        manifest (IngestionManifest, optional): Skip unchanged files and chunks, prune deleted ones.
+        chunk_store (str, optional): After the run, snapshot the whole collection (text, metadata and
+            embeddings) to this .parquet/.arrow file (see chunk_store).
+        dedup (bool): Drop exact and near-duplicate chunks before embedding. Unchanged files are
+            then re-chunked (not re-embedded) so every chunk takes part in choosing canonicals.
+    Returns:
+        dict: Totals, per-stage throughput and utilization, queue depths and peak memory.
+    """
+    if data_dir is None:
+        data_dir = os.getenv("DATA_DIR", r"C:\Users\ursti\Downloads\Code Explainer\data")
+    if artifacts not in ARTIFACT_FORMATS:
+        raise ValueError(f"Unknown artifact format: {artifacts} (expected one of {', '.join(ARTIFACT_FORMATS)})")
+    chunk_workers = chunk_workers or max(1, (os.cpu_count() or 2) - 1)
+    client = client or initialize_vector_db()
+    start = time.perf_counter()
+
+    loaded_q = queue.Queue(maxsize=queue_size)
+    chunk_q = queue.Queue(maxsize=queue_size * 16)
+    stop = threading.Event()
+    manifest_lock = threading.Lock()
+    seen_ids = set()  # Chunk IDs that still exist, including those of unchanged files
+    names = set()
+    stages = {
+        "load": StageStats("load", io_workers),
+        "chunk": StageStats("chunk", chunk_workers),
+        "embed": StageStats("embed", embed_workers),
+    }
+    totals = {"files": 0, "skipped_files": 0, "failed_files": 0}
+    totals_lock = threading.Lock()
+    errors = []
+    # name -> [digest, chunks not yet stored]; the chunk-stage entry is recorded when this reaches 0
+    unsettled = {}
+
+    def count(key):
+        with totals_lock:
+            totals[key] += 1
+    monitor = QueueMonitor({"loaded": loaded_q, "chunks": chunk_q})
+
+    def load(name, file_path):
+        load_start = time.perf_counter()
+        try:
+            with open(file_path, "rb") as file:
+                data = file.read()
+            digest = hash_source(file_path, mode, data=data)
+            text = data.decode("utf-8", errors="replace")
+            with manifest_lock:
+                entry = manifest.get(STAGE_CHUNKED, name) if manifest else None
+            stages["load"].add(items=0, units=len(text), busy_seconds=time.perf_counter() - load_start)
+            if entry and entry.get("hash") == digest and not dedup:
+                # Unchanged: its chunks (and vectors) stay as they are
+                seen_ids.update(f"{name}_chunk_{i}" for i in range(entry.get("chunk_count", 0)))
+                count("skipped_files")
+                return
+            _put(loaded_q, (name, file_path, text, digest, (entry or {}).get("chunk_count", 0)), stop)
+        except Exception as e:
+            print(f"Error loading {file_path}: {str(e)}")
+            errors.append(file_path)
+            count("failed_files")
+
+    def discover():
+        in_flight = threading.BoundedSemaphore(queue_size)
+        try:
+            with ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="ingest-io") as io_pool:
+                for rel_path, file_path in iter_code_files(data_dir, include, exclude):
+                    if stop.is_set():
+                        break
+                    name = chunk_base_name(rel_path)
+                    names.add(name)
+                    stages["load"].add()
+                    in_flight.acquire()
+                    future = io_pool.submit(load, name, file_path)
+                    future.add_done_callback(lambda _: in_flight.release())
+        except Exception as e:
+            print(f"Error discovering files: {str(e)}")
+            errors.append(str(e))
+        finally:
+            _put(loaded_q, _DONE, stop)
+
+    def finish_chunk(digest, future):
+        try:
+            name, chunks, seconds = future.result()
+        except Exception as e:
+            print(f"Error chunking file: {str(e)}")
+            errors.append(str(e))
+            count("failed_files")
+            return
+        stages["chunk"].add(units=len(chunks), busy_seconds=seconds)
+        count("files")
+        if manifest:
+            # Registered before the chunks are queued, since the embedder may store them right away
+            with manifest_lock:
+                if chunks:
+                    unsettled[name] = [digest, len(chunks), len(chunks)]
+                else:
+                    manifest.record(STAGE_CHUNKED, name, digest, chunk_count=0)
+        for chunk in chunks:
+            if not _put(chunk_q, chunk, stop):
+                return
+
+    def dispatch():
+        pending = deque()
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=chunk_workers, mp_context=context) as chunk_pool:
+                while True:
+                    item = _get(loaded_q, stop)
+                    if item is _DONE:
+                        break
+                    name, file_path, text, digest, previous_count = item
+                    future = chunk_pool.submit(_chunk_document, name, file_path, text, mode, chunk_size,
+                                               chunk_overlap, max_chunk_chars, artifacts, artifact_dir,
+                                               previous_count)
+                    pending.append((digest, future))
+                    # Results are forwarded in submission order; this window bounds the work in flight
+                    while len(pending) >= 2 * chunk_workers or (pending and pending[0][1].done()):
+                        finish_chunk(*pending.popleft())
+                while pending:
+                    finish_chunk(*pending.popleft())
+        except Exception as e:
+            print(f"Error in chunking stage: {str(e)}")
+            errors.append(str(e))
+        finally:
+            _put(chunk_q, _DONE, stop)
+
+    def settle(chunk_ids):
+        """Embedder callback: a file's chunk-stage entry is recorded only once all its chunks are stored."""
+        with manifest_lock:
+            for chunk_id in chunk_ids:
+                name = chunk_id.rsplit("_chunk_", 1)[0]
+                entry = unsettled.get(name)
+                if entry is None:
+                    continue
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del unsettled[name]
+                    manifest.record(STAGE_CHUNKED, name, entry[0], chunk_count=entry[2])
+
+    def chunk_stream():
+        while True:
+            wait_start = time.perf_counter()
+            item = chunk_q.get()
+            stages["embed"].busy_seconds -= time.perf_counter() - wait_start
+            if item is _DONE:
+                return
+            stages["embed"].add()
+            yield item
+
+    threads = [threading.Thread(target=discover, name="ingest-discover", daemon=True),
+               threading.Thread(target=dispatch, name="ingest-chunk", daemon=True)]
+    monitor.start()
+    for thread in threads:
+        thread.start()
+    embed_start = time.perf_counter()
+    try:
+        embed_stats = embed_chunk_stream(chunk_stream(), client=client, collection_name=collection_name,
+                                         batch_size=batch_size, model_name=model_name, manifest=manifest,
+                                         num_workers=embed_workers, seen_ids=seen_ids,
+                                         prune_stale=lambda: not errors,
+                                         deduplicator=ChunkDeduplicator() if dedup else None,
+                                         on_stored=settle if manifest else None)
+    finally:
+        stages["embed"].busy_seconds += time.perf_counter() - embed_start
+        stop.set()
+        for thread in threads:
+            thread.join()
+        monitor.stop_event.set()
+
+    # A failed embedding run or batch leaves chunks unstored: keep the old manifest so they are retried
+    if embed_stats.get("error"):
+        errors.append(embed_stats["error"])
+    if embed_stats.get("failed_batches"):
+        errors.append(f"{embed_stats['failed_batches']} embedding batches failed")
+
+    removed = []
+    if manifest and not errors:
+        if artifacts != "none":
+            removed = prune_deleted_sources([], manifest, artifact_dir, current_names=names)
+        else:
+            removed = sorted(manifest.keys(STAGE_CHUNKED) - names)
+            for name in removed:
+                manifest.forget(STAGE_CHUNKED, name)
+        manifest.save()
+    exported = export_collection(client, collection_name, chunk_store, model_name=model_name) if chunk_store else 0
+
+    elapsed = time.perf_counter() - start
+    stages["embed"].units = embed_stats.get("chunks", 0)
+    return {
+        **totals,
+        "removed_sources": len(removed),
+        "chunks_embedded": embed_stats.get("chunks", 0),
+        "chunks_unchanged": embed_stats.get("unchanged", 0),
+        "vectors_deleted": embed_stats.get("deleted", 0),
+        "duplicates_dropped": embed_stats.get("duplicates", 0),
+        "chunks_exported": exported,
+        "errors": len(errors),
+        "elapsed_seconds": round(elapsed, 2),
+        "stages": {
+            "load": stages["load"].report(elapsed, "characters"),
+            "chunk": stages["chunk"].report(elapsed, "chunks"),
+            "embed": stages["embed"].report(elapsed, "chunks_stored"),
+        },
+        "queues": monitor.report(),
+        "max_rss_mb": max_rss_mb(),
+    }
+
+def print_ingest_report(stats):
+    """Print the per-stage summary of an ingest run."""
+    print(f"Ingested {stats['files']} files ({stats['skipped_files']} unchanged, {stats['failed_files']} failed), "
+          f"embedded {stats['chunks_embedded']} chunks in {stats['elapsed_seconds']}s")
+    for name, stage in stats["stages"].items():
+        print(f"  {name:<6} {stage['items_per_second']:>9} items/s  utilization {stage['utilization']:.0%}  "
+              f"({stage['workers']} workers)")
+    for name, depth in stats["queues"].items():
+        print(f"  queue {name:<7} max {depth['max_depth']}/{depth['capacity']}  mean {depth['mean_depth']}")
+    print(f"  peak RSS {stats['max_rss_mb']} MB")
+
+if __name__ == "__main__":
+    manifest = IngestionManifest(DEFAULT_MANIFEST_PATH)
+    stats = ingest(mode=os.getenv("CHUNKING_MODE", "text"),
+                   embed_workers=int(os.getenv("EMBEDDING_WORKERS", "1")),
+                   artifacts=os.getenv("INGEST_ARTIFACTS", "none").lower(),
+                   chunk_store=os.getenv("CHUNK_STORE_PATH") or None,
+                   dedup=os.getenv("INGEST_DEDUP", "false").lower() == "true",
+                   manifest=manifest)
+    print_ingest_report(stats)
@@ -0,0 +1,150 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Content-hash manifest that lets ingestion re-process only what changed
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, UTC
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = "ingestion_manifest.json"
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), MANIFEST_FILENAME)
+
+# Stage names used by the ingestion modules
+STAGE_CLEANED = "cleaned"
+STAGE_CHUNKED = "chunked"
+STAGE_EMBEDDED = "embedded"
+
+def hash_text(text):
+    """
+    Return the SHA-256 hex digest of a string.
+    Args:
+        text (str): Text to hash.
+    Returns:
+        str: Hex digest.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(file_path, block_size=1 << 20):
+    """
+    Return the SHA-256 hex digest of a file, read in blocks.
+    Args:
+        file_path (str): File to hash.
+        block_size (int): Bytes read per block (default: 1 MiB).
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def hash_source(file_path, mode="text", data=None, block_size=1 << 20):
+    """
+    Chunk-stage hash of a source file, shared by every entry point that records STAGE_CHUNKED
+    (process_file, process_stream, ingest) so switching between them never re-chunks or skips
+    a file by mistake. Covers the chunking mode and the raw bytes of the file.
+    Args:
+        file_path (str): Source file (read in blocks unless data is given).
+        mode (str): Chunking mode ('text' or 'code'); switching modes must re-chunk.
+        data (bytes, optional): The file's bytes, when the caller has already read them.
+        block_size (int): Bytes read per block.
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256(f"{mode}\0".encode("utf-8"))
+    if data is not None:
+        digest.update(data)
+    else:
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+class IngestionManifest:
+    """
+    Records a content hash per source file and per chunk for each ingestion stage,
+    so a re-run can skip unchanged inputs and find outputs that disappeared.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {"version": MANIFEST_VERSION, "updated_at": None, "stages": {}}
+        self._load()
+
+    def _load(self):
+        """Load the manifest from disk, starting empty if it is missing or unreadable."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.data = data
+                else:
+                    print(f"Ignoring manifest with unsupported version: {self.path}")
+        except Exception as e:
+            print(f"Error loading manifest {self.path}: {str(e)}")
+
+    def _stage(self, stage):
+        return self.data["stages"].setdefault(stage, {})
+
+    def get(self, stage, key):
+        """Return the recorded entry for key in stage, or None."""
+        return self._stage(stage).get(key)
+
+    def changed(self, stage, key, digest):
+        """Return True if key is new in stage or its recorded hash differs from digest."""
+        entry = self.get(stage, key)
+        return entry is None or entry.get("hash") != digest
+
+    def record(self, stage, key, digest, **extra):
+        """Record the hash (and any extra fields, e.g. chunk_count) for key in stage."""
+        self._stage(stage)[key] = {"hash": digest, **extra}
+
+    def forget(self, stage, key):
+        """Remove key from stage."""
+        self._stage(stage).pop(key, None)
+
+    def keys(self, stage):
+        """Return the set of keys recorded for stage."""
+        return set(self._stage(stage).keys())
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename) so a crash never leaves it half-written."""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.data["updated_at"] = datetime.now(UTC).isoformat()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.data, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving manifest {self.path}: {str(e)}")
@@ -27,7 +27,18 @@ Technology Stack:
 """
 
 import os
+import re
+import ast
+import sys
+import json
+import time
+import hashlib
+import tracemalloc
+from collections import deque
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from ingestion_manifest import IngestionManifest, hash_source, STAGE_CHUNKED, DEFAULT_MANIFEST_PATH
+from data_ingestion import stream_code_files, DEFAULT_INCLUDE, DEFAULT_EXCLUDE
+from chunk_artifacts import write_source_artifact, remove_source_artifact
 
 def chunk_text(text_lines, chunk_size=300, chunk_overlap=50):
     """
@@ -53,13 +64,233 @@ def chunk_text(text_lines, chunk_size=300, chunk_overlap=50):
         print(f"Error chunking text: {str(e)}")
         return []
 
-def save_chunks(chunks, base_filename, output_dir="chunked_data"):
+def chunk_lines_streaming(lines, chunk_size=300, chunk_overlap=50):
+    """
+    Line-based chunker over an iterator, for files too large to hold in memory.
+    Packs whole lines up to chunk_size characters, splits longer lines, and starts each
+    chunk with trailing lines of the previous one (up to chunk_overlap characters).
+    Args:
+        lines (iterable): Lines to chunk (consumed lazily).
+        chunk_size (int): Maximum characters per chunk (default: 300).
+        chunk_overlap (int): Characters carried over between chunks (default: 50).
+    Yields:
+        str: Chunk text.
+    """
+    window = deque()
+    size = 0  # Characters in "\n".join(window)
+    pending = False  # Window holds lines not yet emitted
+    for line in lines:
+        pieces = [line[i:i + chunk_size] for i in range(0, len(line), chunk_size)] or [""]
+        for piece in pieces:
+            if window and size + 1 + len(piece) > chunk_size:
+                if pending:
+                    yield "\n".join(window)
+                    pending = False
+                # Keep only the overlap, and only as much of it as still fits with the new piece
+                while window and (size > chunk_overlap or size + 1 + len(piece) > chunk_size):
+                    removed = window.popleft()
+                    size -= len(removed) + (1 if window else 0)
+            size += len(piece) + (1 if window else 0)
+            window.append(piece)
+            pending = True
+    if pending:
+        yield "\n".join(window)
+
+# Top-level definitions for the regex fallback (JS/TS, Java, C#, Go, Rust, C/C++, Ruby, PHP, ...)
+CODE_BOUNDARY_PATTERN = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:(?:public|private|protected|internal|static|"
+    r"abstract|final|async|virtual|override|unsafe)\s+)*"
+    r"(?P<kind>def|class|function|func|fn|interface|struct|enum|trait|impl|module|type)\s+"
+    r"(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_$][\w$]*)"
+)
+CLASS_KEYWORDS = ("class", "struct", "interface", "trait", "impl", "enum")
+# Python statements that open an indented block
+PYTHON_BLOCK_PATTERN = re.compile(r"^\s*(?:async\s+)?(?:def|class|if|elif|else|for|while|with|try|except|finally)\b.*:\s*$")
+CHUNK_METADATA_SUFFIX = "_chunks.json"
+
+def _code_chunk(lines, start, end, symbol, kind):
+    """Build a chunk dict for source lines[start:end] (0-based, end exclusive)."""
+    return {"text": "\n".join(lines[start:end]), "symbol": symbol, "kind": kind,
+            "start_line": start + 1, "end_line": end}
+
+def _span_chars(lines, start, end):
+    """Characters in the chunk text for lines[start:end]."""
+    return max(0, sum(len(line) + 1 for line in lines[start:end]) - 1)
+
+def _split_lines(lines, start, end, symbol, kind, max_chunk_chars):
+    """Split an oversized line range into parts, preferring blank lines as cut points."""
+    parts = []
+    part_start = start
+    size = 0
+    last_blank = None
+    for i in range(start, end):
+        size += len(lines[i]) + 1
+        if not lines[i].strip():
+            last_blank = i
+        if size > max_chunk_chars and i > part_start:
+            cut = last_blank + 1 if last_blank is not None and last_blank > part_start else i
+            parts.append((part_start, cut))
+            part_start = cut
+            size = sum(len(line) + 1 for line in lines[part_start:i + 1])
+            last_blank = None
+    parts.append((part_start, end))
+    if (len(parts) > 1 and _span_chars(lines, part_start, end) < max_chunk_chars // 4
+            and _span_chars(lines, parts[-2][0], end) <= max_chunk_chars):
+        # Fold a short tail into the previous part rather than emitting a two-line chunk
+        parts[-2:] = [(parts[-2][0], end)]
+    if len(parts) == 1:
+        return [_code_chunk(lines, start, end, symbol, kind)]
+    return [_code_chunk(lines, a, b, f"{symbol} (part {n + 1})", kind) for n, (a, b) in enumerate(parts) if a < b]
+
+def _merge_small(chunks, lines, min_chunk_chars, max_chunk_chars):
+    """Pack runs of small adjacent chunks (imports, one-line helpers) together up to max_chunk_chars."""
+    merged = []
+    for chunk in chunks:
+        previous = merged[-1] if merged else None
+        # Only pack siblings (or a class header with its first method), never across classes
+        previous_last = previous["symbol"].split(", ")[-1].split(" (part")[0] if previous else ""
+        parent = chunk["symbol"].rpartition(".")[0]
+        same_scope = previous_last.rpartition(".")[0] == parent or previous_last == parent
+        # The merged chunk spans every line in between (blank lines, comments), so measure the span
+        if (previous and same_scope and min(len(previous["text"]), len(chunk["text"])) < min_chunk_chars
+                and _span_chars(lines, previous["start_line"] - 1, chunk["end_line"]) <= max_chunk_chars):
+            kind = previous["kind"] if previous["kind"] in (chunk["kind"], "class") else "module"
+            merged[-1] = _code_chunk(lines, previous["start_line"] - 1, chunk["end_line"],
+                                     f"{previous['symbol']}, {chunk['symbol']}", kind)
+        else:
+            merged.append(chunk)
+    return merged
+
+def _class_header_end(node):
+    """Last line of a class statement's header, including its docstring if it has one."""
+    first = node.body[0]
+    if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+        return first.end_lineno
+    return max(node.lineno, first.lineno - 1)
+
+def _python_definitions(lines, body, max_chunk_chars, prefix="", body_start=None, body_end=None):
+    """
+    Chunks for a list of ast statements, recursing into oversized classes. Lines between
+    statements (comments, which ast drops) belong to the module-level gap next to them.
+    Args:
+        body_start (int): First line index the statements cover (default: the first statement).
+        body_end (int): One past the last line they cover (default: the end of the last statement).
+    """
+    gap_symbol = prefix.rstrip(".") or "<module>"
+    chunks = []
+    gap_start = None
+    cursor = body_start if body_start is not None else body[0].lineno - 1  # First line not yet in a chunk
+
+    def emit_gap(gap_end):
+        if any(line.strip() for line in lines[gap_start:gap_end]):
+            chunks.extend(_split_lines(lines, gap_start, gap_end, gap_symbol, "module", max_chunk_chars))
+
+    for node in body:
+        start = min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])]) - 1
+        end = node.end_lineno
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if gap_start is None:
+                gap_start = cursor
+            cursor = end
+            continue
+        if gap_start is None and any(line.strip() for line in lines[cursor:start]):
+            gap_start = cursor  # Comments before a definition
+        if gap_start is not None:
+            emit_gap(start)
+            gap_start = None
+        symbol = f"{prefix}{node.name}"
+        kind = "class" if isinstance(node, ast.ClassDef) else "function"
+        if _span_chars(lines, start, end) <= max_chunk_chars:
+            chunks.append(_code_chunk(lines, start, end, symbol, kind))
+        elif kind == "class":
+            # Header (and docstring) as its own chunk, then one chunk per method
+            header_end = _class_header_end(node)
+            chunks.extend(_split_lines(lines, start, header_end, symbol, "class", max_chunk_chars))
+            members = [child for child in node.body if child.lineno > header_end]
+            if members:
+                chunks.extend(_python_definitions(lines, members, max_chunk_chars, prefix=f"{symbol}.",
+                                                  body_start=header_end, body_end=end))
+        else:
+            chunks.extend(_split_lines(lines, start, end, symbol, kind, max_chunk_chars))
+        cursor = end
+    body_end = body_end if body_end is not None else body[-1].end_lineno
+    if gap_start is None and any(line.strip() for line in lines[cursor:body_end]):
+        gap_start = cursor  # Trailing comments
+    if gap_start is not None:
+        emit_gap(body_end)
+    return chunks
+
+def _regex_definitions(lines):
+    """Split at lines that start a top-level definition; returns (start, end, symbol, kind) ranges."""
+    boundaries = []
+    for i, line in enumerate(lines):
+        match = CODE_BOUNDARY_PATTERN.match(line)
+        if match:
+            kind = "class" if match.group("kind") in CLASS_KEYWORDS else "function"
+            boundaries.append((i, match.group("name"), kind))
+    ranges = []
+    if not boundaries or boundaries[0][0] > 0:
+        ranges.append((0, boundaries[0][0] if boundaries else len(lines), "<module>", "module"))
+    for n, (start, name, kind) in enumerate(boundaries):
+        end = boundaries[n + 1][0] if n + 1 < len(boundaries) else len(lines)
+        ranges.append((start, end, name, kind))
+    return ranges
+
+def indentation_stripped(source):
+    """
+    True if Python source has lost its leading whitespace (e.g. cleaned with clean_code's
+    default), so ast cannot parse it: it opens blocks, but no line is indented.
+    """
+    lines = [line for line in source.splitlines() if line.strip()]
+    return (any(PYTHON_BLOCK_PATTERN.match(line) for line in lines)
+            and not any(line[:1] in (" ", "\t") for line in lines))
+
+def chunk_code(source, language=None, max_chunk_chars=1500, min_chunk_chars=200):
+    """
+    Split source code at function and class boundaries.
+    Python is parsed with ast; other languages (or Python that doesn't parse, e.g. with
+    indentation already stripped) use a regex over definition keywords. Oversized
+    definitions are split into parts at blank lines.
+    Args:
+        source (str): Source code text.
+        language (str, optional): 'python' forces ast; other values skip straight to the regex.
+        max_chunk_chars (int): Maximum characters per chunk (default: 1500).
+        min_chunk_chars (int): Module-level fragments smaller than this are merged (default: 200).
+    Returns:
+        list: Chunk dicts with text, symbol, kind ('function', 'class' or 'module'),
+            start_line and end_line (1-based, inclusive).
+    """
+    try:
+        lines = source.splitlines()
+        if not lines:
+            return []
+        chunks = None
+        if language in (None, "python"):
+            try:
+                tree = ast.parse(source)
+                chunks = _python_definitions(lines, tree.body, max_chunk_chars, body_start=0,
+                                             body_end=len(lines)) if tree.body else []
+            except SyntaxError:
+                chunks = None
+        if chunks is None:
+            chunks = []
+            for start, end, symbol, kind in _regex_definitions(lines):
+                chunks.extend(_split_lines(lines, start, end, symbol, kind, max_chunk_chars))
+        chunks = _merge_small(chunks, lines, min_chunk_chars, max_chunk_chars)
+        return [chunk for chunk in chunks if chunk["text"].strip()]
+    except Exception as e:
+        print(f"Error chunking code: {str(e)}")
+        return []
+
+def save_chunks(chunks, base_filename, output_dir="chunked_data", chunk_metadata=None):
     """
     Save chunks to individual files in a specified directory.
     Args:
         chunks (list): List of text chunks to save.
         base_filename (str): Base name for output files (e.g., 'project1').
         output_dir (str): Directory to save chunks (default: 'chunked_data').
+        chunk_metadata (list, optional): Per-chunk metadata (symbol, line range) written to
+            base_filename_chunks.json and merged into each chunk's vector metadata at embedding time.
     """
     try:
         if not chunks:
@@ -69,10 +300,64 @@ def save_chunks(chunks, base_filename, output_dir="chunked_data"):
             chunk_file = os.path.join(output_dir, f"{base_filename}_chunk_{i}.txt")
             with open(chunk_file, "w", encoding="utf-8") as file:
                 file.write(chunk)
+        metadata_file = os.path.join(output_dir, f"{base_filename}{CHUNK_METADATA_SUFFIX}")
+        if chunk_metadata:
+            with open(metadata_file, "w", encoding="utf-8") as file:
+                json.dump(chunk_metadata, file)
+        elif os.path.exists(metadata_file):
+            os.remove(metadata_file)
     except Exception as e:
         print(f"Error saving chunks: {str(e)}")
 
-def process_file(file_path, chunk_size=300, chunk_overlap=50, output_dir="chunked_data"):
+def remove_stale_chunks(base_filename, start_idx, end_idx, output_dir="chunked_data"):
+    """
+    Delete chunk files base_filename_chunk_{start_idx..end_idx-1} left over from a longer previous run.
+    Args:
+        base_filename (str): Base name used when the chunks were saved.
+        start_idx (int): First stale chunk index.
+        end_idx (int): One past the last stale chunk index.
+        output_dir (str): Directory holding the chunks.
+    Returns:
+        int: Number of files removed.
+    """
+    removed = 0
+    for i in range(start_idx, end_idx):
+        chunk_file = os.path.join(output_dir, f"{base_filename}_chunk_{i}.txt")
+        if os.path.exists(chunk_file):
+            os.remove(chunk_file)
+            removed += 1
+    return removed
+
+def prune_deleted_sources(current_files, manifest, output_dir="chunked_data", current_names=None):
+    """
+    Remove the chunks of sources recorded in the manifest that are no longer in current_files.
+    Args:
+        current_files (list): Paths of the files processed in this run.
+        manifest (IngestionManifest): Manifest from previous runs.
+        output_dir (str): Directory holding the chunks.
+        current_names (iterable, optional): Chunk base names seen this run, used instead of
+            deriving them from current_files (see chunk_base_name).
+    Returns:
+        list: Base names whose chunks were removed.
+    """
+    if current_names is not None:
+        current = set(current_names)
+    else:
+        current = {os.path.splitext(os.path.basename(path))[0] for path in current_files}
+    removed = []
+    for base_name in manifest.keys(STAGE_CHUNKED) - current:
+        entry = manifest.get(STAGE_CHUNKED, base_name) or {}
+        remove_stale_chunks(base_name, 0, entry.get("chunk_count", 0), output_dir)
+        metadata_file = os.path.join(output_dir, f"{base_name}{CHUNK_METADATA_SUFFIX}")
+        if os.path.exists(metadata_file):
+            os.remove(metadata_file)
+        remove_source_artifact(output_dir, base_name)
+        manifest.forget(STAGE_CHUNKED, base_name)
+        removed.append(base_name)
+    return removed
+
+def process_file(file_path, chunk_size=300, chunk_overlap=50, output_dir="chunked_data", manifest=None,
+                 mode="text", max_chunk_chars=1500):
     """
     Process a single file by loading, chunking, and saving its content.
     Args:
@@ -80,18 +365,210 @@ def process_file(file_path, chunk_size=300, chunk_overlap=50, output_dir="chunke
         chunk_size (int): Maximum characters per chunk.
         chunk_overlap (int): Overlap between chunks.
         output_dir (str): Directory to save chunks.
+        manifest (IngestionManifest, optional): Skip the file if its content hash is unchanged.
+        mode (str): 'text' for fixed-size character chunks, 'code' to split at function and
+            class boundaries (see chunk_code). Code mode needs indentation-preserving input:
+            the original source, or a cleaned file written with keep_indentation.
+        max_chunk_chars (int): Maximum characters per chunk in code mode.
+    Returns:
+        int: Number of chunks written (0 if skipped or failed).
     """
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         with open(file_path, "r", encoding="utf-8") as file:
-            lines = file.read().splitlines()
-        chunks = chunk_text(lines, chunk_size, chunk_overlap)
+            content = file.read()
         base_name = os.path.splitext(os.path.basename(file_path))[0]  # Use full filename
-        save_chunks(chunks, base_name, output_dir)
+
+        digest = hash_source(file_path, mode) if manifest else None
+        if manifest and not manifest.changed(STAGE_CHUNKED, base_name, digest):
+            print(f"Skipped unchanged {file_path}")
+            return 0
+
+        chunk_metadata = None
+        if mode == "code":
+            language = "python" if file_path.endswith(".py") else None
+            if language in (None, "python") and indentation_stripped(content):
+                # Chunking it anyway would silently fall back to the regex splitter
+                raise ValueError("indentation was stripped when this file was cleaned; re-run data_ingestion "
+                                 "with CHUNKING_MODE=code (keep_indentation) or chunk the original source")
+            code_chunks = chunk_code(content, language=language, max_chunk_chars=max_chunk_chars)
+            chunks = [chunk["text"] for chunk in code_chunks]
+            chunk_metadata = [{key: chunk[key] for key in ("symbol", "kind", "start_line", "end_line")}
+                              for chunk in code_chunks]
+        else:
+            chunks = chunk_text(content.splitlines(), chunk_size, chunk_overlap)
+        save_chunks(chunks, base_name, output_dir, chunk_metadata=chunk_metadata)
+        if manifest:
+            # A shorter file leaves trailing chunks from the previous run behind
+            previous = manifest.get(STAGE_CHUNKED, base_name) or {}
+            remove_stale_chunks(base_name, len(chunks), previous.get("chunk_count", 0), output_dir)
+            manifest.record(STAGE_CHUNKED, base_name, digest, chunk_count=len(chunks))
         print(f"Processed {file_path} into {len(chunks)} chunks")
+        return len(chunks)
     except Exception as e:
         print(f"Error processing file {file_path}: {str(e)}")
+        return 0
+
+def chunk_base_name(rel_path):
+    """
+    Chunk file base name for a path relative to the data root: 'pkg/utils.py' -> 'pkg__utils.py'.
+    The extension is kept so 'utils.py' and 'utils.txt' stay apart. A path whose own names already
+    contain '__' gets a short hash of the path before the extension ('a__b.py' -> 'a__b.1f3c2e9a.py'),
+    so it can't collide with the flattened 'a/b.py'.
+    """
+    parts = rel_path.replace("\\", "/").split("/")
+    name = "__".join(parts)
+    if any("__" in part for part in parts):
+        root, extension = os.path.splitext(name)
+        name = f"{root}.{hashlib.sha1('/'.join(parts).encode('utf-8')).hexdigest()[:8]}{extension}"
+    return name
+
+def max_rss_mb():
+    """Peak resident set size of this process in MB, or None where the platform can't report it."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process(os.getpid()).memory_info()
+            return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+        except Exception:
+            return None
+
+def process_stream(name, file_path, lines, output_dir="chunked_data", chunk_size=300, chunk_overlap=50,
+                   manifest=None, mode="text", max_chunk_chars=1500, max_code_file_bytes=5 * 1024 * 1024,
+                   artifact_format="files"):
+    """
+    Chunk one file from a line iterator, writing each chunk as soon as it is produced.
+    Args:
+        name (str): Chunk base name (see chunk_base_name).
+        file_path (str): Source path, hashed for the manifest check and used for its size.
+        lines (iterable): Cleaned lines of the file (consumed lazily).
+        output_dir (str): Directory to save chunks.
+        chunk_size (int): Maximum characters per chunk in text mode.
+        chunk_overlap (int): Overlap between chunks in text mode.
+        manifest (IngestionManifest, optional): Skip the file if its content hash is unchanged.
+        mode (str): 'text' or 'code'. Code mode needs the whole file for ast, so files larger than
+            max_code_file_bytes are chunked as text instead.
+        max_chunk_chars (int): Maximum characters per chunk in code mode.
+        max_code_file_bytes (int): Largest file read whole for code-aware chunking.
+        artifact_format (str): 'files' writes one name_chunk_N.txt per chunk; 'jsonl' appends
+            every chunk of the file to a single name.jsonl (see chunk_artifacts).
+    Returns:
+        int: Number of chunks written, or None if the file was skipped as unchanged.
+    """
+    digest = None
+    if manifest:
+        digest = hash_source(file_path, mode)
+        if not manifest.changed(STAGE_CHUNKED, name, digest):
+            return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    chunk_metadata = None
+    if mode == "code" and os.path.getsize(file_path) <= max_code_file_bytes:
+        language = "python" if file_path.endswith(".py") else None
+        code_chunks = chunk_code("\n".join(lines), language=language, max_chunk_chars=max_chunk_chars)
+        chunks = (chunk["text"] for chunk in code_chunks)
+        chunk_metadata = [{key: chunk[key] for key in ("symbol", "kind", "start_line", "end_line")}
+                          for chunk in code_chunks]
+    else:
+        chunks = chunk_lines_streaming(lines, chunk_size, chunk_overlap)
+
+    previous = (manifest.get(STAGE_CHUNKED, name) if manifest else None) or {}
+    metadata_file = os.path.join(output_dir, f"{name}{CHUNK_METADATA_SUFFIX}")
+    if artifact_format == "jsonl":
+        records = ((f"{name}_chunk_{i}", chunk,
+                    {"source": name, "chunk_idx": i, **(chunk_metadata[i] if chunk_metadata else {})})
+                   for i, chunk in enumerate(chunks))
+        count = write_source_artifact(output_dir, name, records)
+        # Drop per-chunk files left over from an earlier 'files' run
+        remove_stale_chunks(name, 0, previous.get("chunk_count", 0), output_dir)
+        if os.path.exists(metadata_file):
+            os.remove(metadata_file)
+        if manifest:
+            manifest.record(STAGE_CHUNKED, name, digest, chunk_count=count)
+        return count
+
+    count = 0
+    for chunk in chunks:
+        with open(os.path.join(output_dir, f"{name}_chunk_{count}.txt"), "w", encoding="utf-8") as file:
+            file.write(chunk)
+        count += 1
+    remove_source_artifact(output_dir, name)
+    if chunk_metadata:
+        with open(metadata_file, "w", encoding="utf-8") as file:
+            json.dump(chunk_metadata, file)
+    elif os.path.exists(metadata_file):
+        os.remove(metadata_file)
+
+    remove_stale_chunks(name, count, previous.get("chunk_count", 0), output_dir)
+    if manifest:
+        manifest.record(STAGE_CHUNKED, name, digest, chunk_count=count)
+    return count
+
+def stream_directory(data_dir=None, output_dir="chunked_data", include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE,
+                     chunk_size=300, chunk_overlap=50, manifest=None, mode="text", trace_memory=False,
+                     artifact_format="files"):
+    """
+    Stream a source tree straight into chunk files: files are walked lazily, lines are
+    cleaned as they are read, and chunks are written as they are produced, so memory use
+    is bounded by one file (code mode) or one chunk (text mode) rather than the corpus.
+    Args:
+        data_dir (str, optional): Root directory (default: DATA_DIR environment variable).
+        output_dir (str): Directory to save chunks.
+        include (tuple): Glob patterns of files to ingest.
+        exclude (tuple): Glob patterns of files and directories to skip.
+        chunk_size (int): Maximum characters per chunk in text mode.
+        chunk_overlap (int): Overlap between chunks in text mode.
+        manifest (IngestionManifest, optional): Skip unchanged files and prune deleted ones.
+        mode (str): 'text' or 'code' (see process_stream).
+        trace_memory (bool): Also measure peak Python allocations with tracemalloc (slower).
+        artifact_format (str): 'files' or 'jsonl' (see process_stream).
+    Returns:
+        dict: Run statistics (files, skipped, failed, chunks, removed, elapsed seconds, peak memory).
+    """
+    stats = {"files": 0, "skipped": 0, "failed": 0, "chunks": 0, "removed": 0}
+    start = time.perf_counter()
+    if trace_memory:
+        tracemalloc.start()
+    names = set()
+    complete = False
+    try:
+        for rel_path, file_path, lines in stream_code_files(data_dir, include, exclude,
+                                                            keep_indentation=(mode == "code")):
+            name = chunk_base_name(rel_path)
+            names.add(name)
+            try:
+                count = process_stream(name, file_path, lines, output_dir, chunk_size, chunk_overlap,
+                                       manifest=manifest, mode=mode, artifact_format=artifact_format)
+            except Exception as e:
+                print(f"Error processing file {file_path}: {str(e)}")
+                stats["failed"] += 1
+                continue
+            if count is None:
+                stats["skipped"] += 1
+            else:
+                stats["files"] += 1
+                stats["chunks"] += count
+        complete = True
+    except Exception as e:
+        print(f"Error streaming directory: {str(e)}")
+        stats["error"] = str(e)
+    finally:
+        if trace_memory:
+            stats["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+    # Only a complete walk tells us which sources are really gone
+    if manifest and complete:
+        stats["removed"] = len(prune_deleted_sources([], manifest, output_dir, current_names=names))
+        manifest.save()
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 2)
+    stats["max_rss_mb"] = max_rss_mb()
+    return stats
 
 if __name__ == "__main__":
     # Updated file paths to match your cleaned data location
@@ -101,5 +578,18 @@ if __name__ == "__main__":
         r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\cleaned_data\cleaned_3.txt",
         r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\cleaned_data\cleaned_4.txt"
     ]
-    for file_path in input_files:
-        process_file(file_path, chunk_size=300, chunk_overlap=50)
+    manifest = IngestionManifest(DEFAULT_MANIFEST_PATH)
+    mode = os.getenv("CHUNKING_MODE", "text")
+    if os.getenv("INGEST_STREAMING", "false").lower() == "true":
+        # Walk DATA_DIR directly instead of the cleaned files listed above
+        artifact_format = "jsonl" if os.getenv("INGEST_ARTIFACTS", "files").lower() == "jsonl" else "files"
+        stats = stream_directory(output_dir="chunked_data", manifest=manifest, mode=mode, trace_memory=True,
+                                 artifact_format=artifact_format)
+        print(f"Chunked {stats['files']} files into {stats['chunks']} chunks, skipped {stats['skipped']}, "
+              f"removed {stats['removed']} (peak {stats.get('peak_traced_mb')} MB traced, "
+              f"{stats['max_rss_mb']} MB RSS)")
+    else:
+        for file_path in input_files:
+            process_file(file_path, chunk_size=300, chunk_overlap=50, manifest=manifest, mode=mode)
+        prune_deleted_sources(input_files, manifest)
+        manifest.save()
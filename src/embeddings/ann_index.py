@@ -0,0 +1,271 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Approximate nearest-neighbour indexes (NumPy IVF, optional hnswlib) for the vector index
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ASSIGN_BLOCK_ROWS = 65536  # Rows assigned to centroids per matmul
+
+
+def _as_float32(vectors) -> np.ndarray:
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every row, computed in blocks to bound memory."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = _as_float32(vectors[start:start + ASSIGN_BLOCK_ROWS])
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 20,
+                     sample_size: int = 100000, seed: int = 0) -> np.ndarray:
+    """
+    Cosine k-means on normalized vectors. Trains on a random sample of at most sample_size
+    rows and returns L2-normalized centroids of shape (n_clusters, dim).
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(vectors)
+    if n_rows > sample_size:
+        sample = _as_float32(vectors[np.sort(rng.choice(n_rows, sample_size, replace=False))])
+    else:
+        sample = _as_float32(vectors[:])
+    n_clusters = min(n_clusters, len(sample))
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = assign_to_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are bucketed by nearest k-means centroid and a query scans only
+    the nprobe closest buckets, scoring those rows exactly against the full vectors.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_rows: np.ndarray, nprobe: int = 8):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: Optional[int] = None, n_iter: int = 20,
+              sample_size: int = 100000, nprobe: int = 8, seed: int = 0) -> "IVFIndex":
+        """Train centroids and bucket every row. Default n_lists is about 4 * sqrt(rows)."""
+        n_rows = len(vectors)
+        if n_rows == 0:
+            raise ValueError("Cannot build an IVF index over zero rows")
+        n_lists = n_lists or max(1, min(int(4 * np.sqrt(n_rows)), n_rows))
+        centroids = spherical_kmeans(vectors, n_lists, n_iter=n_iter, sample_size=sample_size, seed=seed)
+        assignments = assign_to_centroids(vectors, centroids)
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids, list_offsets, list_rows, nprobe=nprobe)
+
+    def add(self, vectors: np.ndarray, start: int) -> "IVFIndex":
+        """New index with rows start..len(vectors) appended to the lists of the existing centroids."""
+        old_assignments = np.repeat(np.arange(self.n_lists), np.diff(self.list_offsets))  # In list_rows order
+        assignments = np.concatenate([old_assignments, assign_to_centroids(vectors[start:], self.centroids)])
+        rows = np.concatenate([np.asarray(self.list_rows), np.arange(start, len(vectors), dtype=np.int64)])
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return IVFIndex(self.centroids, list_offsets, rows[order], nprobe=self.nprobe)
+
+    def set_search_params(self, nprobe: Optional[int] = None, **kwargs) -> None:
+        if nprobe is not None:
+            self.nprobe = max(1, int(nprobe))
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """Row numbers in the nprobe buckets closest to the query."""
+        nprobe = min(self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in probe])
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        """Return (scores, rows) of the best k candidates, best first."""
+        rows = self.candidates(query)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float32), rows
+        rows = np.sort(rows)  # Sequential access pattern on the mmapped vectors
+        scores = _as_float32(vectors[rows]) @ query
+        top_k = min(k, len(rows))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = top[np.argsort(-scores[top])]
+        return scores[order], rows[order]
+
+    def save(self, prefix: str) -> None:
+        for suffix, array in (("centroids", self.centroids), ("offsets", self.list_offsets), ("rows", self.list_rows)):
+            tmp_path = f"{prefix}.ivf_{suffix}.npy.tmp"
+            with open(tmp_path, "wb") as file:
+                np.save(file, array)
+            os.replace(tmp_path, f"{prefix}.ivf_{suffix}.npy")
+
+    @classmethod
+    def load(cls, prefix: str, nprobe: int = 8) -> "IVFIndex":
+        return cls(np.load(f"{prefix}.ivf_centroids.npy"),
+                   np.load(f"{prefix}.ivf_offsets.npy", mmap_mode="r"),
+                   np.load(f"{prefix}.ivf_rows.npy", mmap_mode="r"),
+                   nprobe=nprobe)
+
+    @staticmethod
+    def files(prefix: str):
+        return [f"{prefix}.ivf_{suffix}.npy" for suffix in ("centroids", "offsets", "rows")]
+
+
+class HNSWIndex:
+    """Adapter around hnswlib (optional dependency) with the same interface as IVFIndex."""
+
+    kind = "hnsw"
+
+    def __init__(self, index, ef_search: int = 64):
+        self.index = index
+        self.ef_search = ef_search
+        self.index.set_ef(ef_search)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, M: int = 16, ef_construction: int = 200,
+              ef_search: int = 64, **kwargs) -> "HNSWIndex":
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed; use the 'ivf' ANN index instead")
+        index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        index.init_index(max_elements=len(vectors), M=M, ef_construction=ef_construction)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = _as_float32(vectors[start:start + ASSIGN_BLOCK_ROWS])
+            index.add_items(block, np.arange(start, start + len(block)))
+        return cls(index, ef_search=ef_search)
+
+    def add(self, vectors: np.ndarray, start: int) -> "HNSWIndex":
+        """Insert rows start..len(vectors) into the graph (resizes in place, so use a handle no query shares)."""
+        self.index.resize_index(len(vectors))
+        for block_start in range(start, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = _as_float32(vectors[block_start:block_start + ASSIGN_BLOCK_ROWS])
+            self.index.add_items(block, np.arange(block_start, block_start + len(block)))
+        return self
+
+    def set_search_params(self, ef_search: Optional[int] = None, **kwargs) -> None:
+        if ef_search is not None:
+            self.ef_search = max(1, int(ef_search))
+            self.index.set_ef(self.ef_search)
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None):
+        k = min(k, self.index.get_current_count())
+        if k == 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        kwargs = {}
+        if mask is not None:
+            kwargs["filter"] = lambda row: bool(mask[row])
+        try:
+            labels, distances = self.index.knn_query(query.reshape(1, -1), k=k, **kwargs)
+        except RuntimeError:
+            # hnswlib raises when the filter leaves fewer than k reachable rows
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        return (1.0 - distances[0]).astype(np.float32), labels[0].astype(np.int64)
+
+    def save(self, prefix: str) -> None:
+        self.index.save_index(f"{prefix}.hnsw.bin")
+
+    @classmethod
+    def load(cls, prefix: str, dim: int, ef_search: int = 64) -> "HNSWIndex":
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed")
+        index = hnswlib.Index(space="ip", dim=dim)
+        index.load_index(f"{prefix}.hnsw.bin")
+        return cls(index, ef_search=ef_search)
+
+    @staticmethod
+    def files(prefix: str):
+        return [f"{prefix}.hnsw.bin"]
+
+
+ANN_KINDS = {"ivf": IVFIndex, "hnsw": HNSWIndex}
+
+
+def build_ann(kind: str, vectors: np.ndarray, **params):
+    """Build an ANN index of the given kind ('ivf' or 'hnsw') over normalized vectors."""
+    if kind not in ANN_KINDS:
+        raise ValueError(f"Unknown ANN index kind: {kind}")
+    return ANN_KINDS[kind].build(vectors, **params)
+
+
+def load_ann(kind: str, prefix: str, dim: int, search_params: Optional[Dict[str, Any]] = None):
+    """Load a persisted ANN index and apply search-time parameters (nprobe / ef_search)."""
+    search_params = search_params or {}
+    if kind == "ivf":
+        index = IVFIndex.load(prefix)
+    elif kind == "hnsw":
+        index = HNSWIndex.load(prefix, dim)
+    else:
+        raise ValueError(f"Unknown ANN index kind: {kind}")
+    index.set_search_params(**search_params)
+    return index
+
+
+def remove_ann_files(kind: str, prefix: str) -> None:
+    if kind not in ANN_KINDS:
+        return
+    for path in ANN_KINDS[kind].files(prefix):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,278 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Benchmarks for the vector index backends (latency percentiles and recall@k)
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows
+from ann_index import hnswlib
+
+
+def synthetic_embeddings(n_rows: int, dim: int = 384, n_clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, closer to real sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n_rows)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((n_rows, dim)).astype(np.float32)
+    return normalize_rows(vectors)
+
+
+def recall_at_k(approximate: Sequence[Sequence[Any]], exact: Sequence[Sequence[Any]], k: int) -> float:
+    """Mean fraction of the exact top-k ids that the approximate search also returned."""
+    if not exact:
+        return 0.0
+    total = 0.0
+    for approx_ids, exact_ids in zip(approximate, exact):
+        truth = set(list(exact_ids)[:k])
+        if truth:
+            total += len(truth & set(list(approx_ids)[:k])) / len(truth)
+    return total / len(exact)
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, float]:
+    """p50/p99/mean of per-query latencies, in milliseconds."""
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+    }
+
+
+def _timed_search(index: VectorIndex, queries: np.ndarray, k: int):
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results = index.search(query, k=k)
+        latencies.append(time.perf_counter() - start)
+        ids.append([index._segments[seg_idx]["ids"][row] for _, seg_idx, row in results])
+    return ids, latencies
+
+
+def run_ann_benchmark(n_rows: int = 50000, dim: int = 384, n_queries: int = 200, k: int = 10,
+                      nprobe_values: Sequence[int] = (1, 4, 8, 16, 32),
+                      ef_search_values: Sequence[int] = (16, 64, 128)) -> List[Dict[str, Any]]:
+    """
+    Compare ANN search against the brute-force baseline on synthetic data.
+    Args:
+        n_rows (int): Vectors in the index.
+        dim (int): Embedding dimension (384 for MiniLM).
+        n_queries (int): Queries timed per configuration.
+        k (int): Neighbours per query.
+        nprobe_values: IVF nprobe settings to sweep.
+        ef_search_values: HNSW ef_search settings to sweep (only if hnswlib is installed).
+    Returns:
+        list: One result dict per configuration with latency percentiles and recall@k.
+    """
+    # Held-out rows from the same distribution serve as queries
+    vectors = synthetic_embeddings(n_rows + n_queries, dim)
+    vectors, queries = vectors[:n_rows], vectors[n_rows:]
+    ids = [f"chunk_{i}" for i in range(n_rows)]
+    workdir = tempfile.mkdtemp(prefix="kraken_ann_bench_")
+    results = []
+    try:
+        exact_index = VectorIndex(os.path.join(workdir, "exact"), "exact")
+        exact_index.add(ids, vectors)
+        exact_ids, latencies = _timed_search(exact_index, queries, k)
+        results.append({"index": "exact", "param": None, "recall_at_k": 1.0, **latency_percentiles(latencies)})
+
+        kinds = [("ivf", "nprobe", nprobe_values)]
+        if hnswlib is not None:
+            kinds.append(("hnsw", "ef_search", ef_search_values))
+        for kind, param_name, values in kinds:
+            ann_index = VectorIndex(os.path.join(workdir, kind), kind, ann=kind)
+            ann_index.add(ids, vectors)
+            start = time.perf_counter()
+            ann_index.finalize()
+            build_seconds = round(time.perf_counter() - start, 2)
+            for value in values:
+                ann_index.set_search_params(**{param_name: value})
+                ann_ids, latencies = _timed_search(ann_index, queries, k)
+                results.append({
+                    "index": kind,
+                    "param": f"{param_name}={value}",
+                    "recall_at_k": round(recall_at_k(ann_ids, exact_ids, k), 4),
+                    "build_seconds": build_seconds,
+                    **latency_percentiles(latencies),
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def list_embedding_bytes(vectors: np.ndarray) -> int:
+    """Approximate memory of embeddings held as nested Python lists of floats (the tolist() form)."""
+    n_rows, dim = vectors.shape
+    row = vectors[0].tolist()
+    per_row = sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return n_rows * per_row + sys.getsizeof([None] * n_rows)
+
+
+def run_quantization_benchmark(n_rows: int = 50000, dim: int = 384, n_queries: int = 200, k: int = 10,
+                               rerank_factors: Sequence[int] = (1, 4, 16),
+                               pq_subvectors: int = 48) -> List[Dict[str, Any]]:
+    """
+    Measure memory and recall@k of int8 and product-quantized search (with full-precision
+    re-ranking) against exact float32 search.
+    Args:
+        n_rows (int): Vectors in the index.
+        dim (int): Embedding dimension.
+        n_queries (int): Queries timed per configuration.
+        k (int): Neighbours per query.
+        rerank_factors: Shortlist sizes (k * factor) re-ranked at full precision.
+        pq_subvectors (int): PQ code bytes per vector.
+    Returns:
+        list: One result dict per configuration with bytes per vector, compression and recall@k.
+    """
+    vectors = synthetic_embeddings(n_rows + n_queries, dim)
+    vectors, queries = vectors[:n_rows], vectors[n_rows:]
+    ids = [f"chunk_{i}" for i in range(n_rows)]
+    float32_bytes = vectors.nbytes
+    results = [{
+        "index": "python lists",
+        "param": None,
+        "bytes_per_vector": round(list_embedding_bytes(vectors) / n_rows, 1),
+        "compression": round(float32_bytes / list_embedding_bytes(vectors), 3),
+    }]
+    workdir = tempfile.mkdtemp(prefix="kraken_quant_bench_")
+    try:
+        exact_index = VectorIndex(os.path.join(workdir, "exact"), "exact")
+        exact_index.add(ids, vectors)
+        exact_ids, latencies = _timed_search(exact_index, queries, k)
+        results.append({"index": "float32", "param": None, "bytes_per_vector": dim * 4.0, "compression": 1.0,
+                        "recall_at_k": 1.0, **latency_percentiles(latencies)})
+
+        configs = [("int8", {}), ("pq", {"n_subvectors": pq_subvectors})]
+        for kind, params in configs:
+            index = VectorIndex(os.path.join(workdir, kind), kind, quantization=kind, quantization_params=params)
+            index.add(ids, vectors)
+            code_bytes = index.memory_usage()["code_bytes"]
+            for factor in rerank_factors:
+                index.rerank_factor = factor
+                quantized_ids, latencies = _timed_search(index, queries, k)
+                results.append({
+                    "index": kind,
+                    "param": f"rerank={factor}x",
+                    "bytes_per_vector": round(code_bytes / n_rows, 1),
+                    "compression": round(float32_bytes / code_bytes, 1),
+                    "recall_at_k": round(recall_at_k(quantized_ids, exact_ids, k), 4),
+                    **latency_percentiles(latencies),
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def synthetic_code_chunks(n_chunks: int, seed: int = 0) -> List[str]:
+    """Short code-like snippets with realistic length for throughput runs."""
+    rng = np.random.default_rng(seed)
+    names = ["parse", "load", "index", "embed", "query", "chunk", "clean", "merge", "score", "cache"]
+    chunks = []
+    for i in range(n_chunks):
+        name = f"{rng.choice(names)}_{rng.choice(names)}_{i}"
+        body = "\n".join(f"    value_{j} = helper_{j}(items[{j}]) + {int(rng.integers(100))}" for j in range(12))
+        chunks.append(f"def {name}(items):\n    \"\"\"Process items for {name}.\"\"\"\n{body}\n    return value_0\n")
+    return chunks
+
+
+def run_embedding_throughput_benchmark(n_chunks: int = 4096, worker_counts: Sequence[int] = None,
+                                       batch_size: int = 256) -> List[Dict[str, Any]]:
+    """
+    Chunks/second of bulk embedding for each worker count (requires sentence-transformers).
+    Args:
+        n_chunks (int): Synthetic code chunks to encode per run.
+        worker_counts: Worker process counts to try (default: 1, 2, 4, ... up to the core count).
+        batch_size (int): Chunks per batch handed to a worker.
+    Returns:
+        list: One result dict per worker count with end-to-end and steady-state chunks/second.
+    """
+    cores = os.cpu_count() or 1
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cores:
+            worker_counts.append(worker_counts[-1] * 2)
+    chunks = [(f"bench_chunk_{i}", text, {}) for i, text in enumerate(synthetic_code_chunks(n_chunks))]
+    # Measure the encoder, not the embedding cache (workers inherit this at spawn)
+    previous_cache_path = os.environ.get("EMBEDDING_CACHE_PATH")
+    os.environ["EMBEDDING_CACHE_PATH"] = "off"
+    try:
+        return _measure_throughput(chunks, worker_counts, batch_size)
+    finally:
+        if previous_cache_path is None:
+            os.environ.pop("EMBEDDING_CACHE_PATH", None)
+        else:
+            os.environ["EMBEDDING_CACHE_PATH"] = previous_cache_path
+
+
+def _measure_throughput(chunks, worker_counts: Sequence[int], batch_size: int) -> List[Dict[str, Any]]:
+    from embedding_gen import encode_chunk_batches
+    from parallel_embedding import default_threads_per_worker
+
+    results = []
+    for num_workers in worker_counts:
+        start = time.perf_counter()
+        first_result = None
+        encoded = 0
+        for batch, _ in encode_chunk_batches(chunks, batch_size, num_workers=num_workers):
+            if first_result is None:
+                first_result = time.perf_counter()
+            encoded += len(batch)
+        elapsed = time.perf_counter() - start
+        steady = elapsed - (first_result - start)
+        results.append({
+            "workers": num_workers,
+            "threads_per_worker": default_threads_per_worker(num_workers) if num_workers > 1 else None,
+            "chunks": encoded,
+            "startup_seconds": round(first_result - start, 2),
+            "chunks_per_second": round(encoded / elapsed, 1),
+            "steady_chunks_per_second": round((encoded - batch_size) / steady, 1) if steady > 0 and encoded > batch_size else None,
+        })
+    return results
+
+
+def print_results(title: str, results: List[Dict[str, Any]]) -> None:
+    print(f"\n📊 {title}")
+    print("-" * 60)
+    for result in results:
+        print("  " + " | ".join(f"{key}={value}" for key, value in result.items() if value is not None))
+
+
+if __name__ == "__main__":
+    print("🚀 Running KRAKEN vector index benchmarks...")
+    print_results("ANN vs brute force (recall@10, latency)", run_ann_benchmark())
+    print_results("Quantized storage vs float32 (memory, recall@10)", run_quantization_benchmark())
+    try:
+        print_results("Bulk embedding throughput per worker count", run_embedding_throughput_benchmark())
+    except ImportError as e:
+        print(f"\n⚠️ Skipping embedding throughput benchmark: {e}")
@@ -0,0 +1,227 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Columnar (Parquet / Arrow IPC) store of chunk text, metadata and embeddings
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ARROW_SUFFIX = ".arrow"  # Uncompressed Arrow IPC, memory-mapped; every other suffix is Parquet
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is not installed; it is required for the chunk store")
+
+
+def chunk_store_schema(dim: int, model_name: Optional[str] = None) -> "pa.Schema":
+    """Columns of a chunk store; the embedding is a fixed-size float32 list of length dim."""
+    _require_pyarrow()
+    metadata = {"dim": str(dim)}
+    if model_name:
+        metadata["model_name"] = model_name
+    return pa.schema([
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("source", pa.string()),
+        pa.field("symbol", pa.string()),
+        pa.field("text", pa.large_string()),
+        pa.field("metadata", pa.string()),  # Full metadata dict as JSON
+        pa.field("embedding", pa.list_(pa.float32(), dim)),
+    ], metadata=metadata)
+
+
+class ChunkStoreWriter:
+    """
+    Streams batches of chunks into a single store file. Rows go to a temporary file that
+    replaces the target only when the writer is closed without error, so readers never
+    see a partial store.
+
+    Usage:
+        with ChunkStoreWriter("chunks.parquet", model_name=model_name) as writer:
+            writer.write(ids, texts, metadatas, embeddings)
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, model_name: Optional[str] = None):
+        _require_pyarrow()
+        self.path = path
+        self.dim = dim
+        self.model_name = model_name
+        self.rows = 0
+        self._tmp_path = f"{path}.tmp"
+        self._sink = None
+        self._writer = None
+
+    def _open(self, dim: int) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.schema = chunk_store_schema(dim, self.model_name)
+        if self.path.endswith(ARROW_SUFFIX):
+            self._sink = pa.OSFile(self._tmp_path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        else:
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema, compression="zstd")
+
+    def write(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[Dict[str, Any]],
+              embeddings=None) -> None:
+        """Append one batch; each call becomes one Parquet row group / IPC record batch."""
+        if not ids:
+            return
+        vectors = None if embeddings is None else np.ascontiguousarray(embeddings, dtype=np.float32)
+        if self._writer is None:
+            if vectors is None and self.dim is None:
+                raise ValueError("dim is required when the first batch has no embeddings")
+            self._open(vectors.shape[1] if vectors is not None else self.dim)
+        if vectors is None:
+            embedding_column = pa.nulls(len(ids), type=self.schema.field("embedding").type)
+        else:
+            if vectors.shape != (len(ids), self.dim):
+                raise ValueError(f"Expected embeddings of shape ({len(ids)}, {self.dim}), got {vectors.shape}")
+            embedding_column = pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), self.dim)
+        metadatas = [metadata or {} for metadata in metadatas]
+        batch = pa.record_batch([
+            pa.array(ids, pa.string()),
+            pa.array([metadata.get("source") for metadata in metadatas], pa.string()),
+            pa.array([metadata.get("symbol") for metadata in metadatas], pa.string()),
+            pa.array(texts, pa.large_string()),
+            pa.array([json.dumps(metadata) for metadata in metadatas], pa.string()),
+            embedding_column,
+        ], schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows += len(ids)
+
+    def close(self, discard: bool = False) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            if self._sink is not None:
+                self._sink.close()
+            self._writer = self._sink = None
+            if discard:
+                os.remove(self._tmp_path)
+            else:
+                os.replace(self._tmp_path, self.path)
+                logger.info(f"Wrote {self.rows} chunks to {self.path}")
+
+    def __enter__(self) -> "ChunkStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(discard=exc_type is not None)
+
+
+class ChunkStore:
+    """
+    Read side of a chunk store. The file is memory-mapped, and embeddings() returns a NumPy
+    view of the Arrow buffer, so no per-row Python objects are created. With an .arrow (IPC)
+    file the view points straight into the mapped file; Parquet pages are decompressed once.
+    """
+
+    def __init__(self, path: str):
+        _require_pyarrow()
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Chunk store not found: {path}")
+        self.path = path
+
+    @property
+    def is_arrow(self) -> bool:
+        return self.path.endswith(ARROW_SUFFIX)
+
+    @property
+    def schema(self) -> "pa.Schema":
+        if self.is_arrow:
+            with pa.memory_map(self.path) as source:
+                return pa.ipc.open_file(source).schema
+        return pq.read_schema(self.path)
+
+    @property
+    def dim(self) -> int:
+        return int(self.schema.metadata[b"dim"])
+
+    @property
+    def model_name(self) -> Optional[str]:
+        value = (self.schema.metadata or {}).get(b"model_name")
+        return value.decode("utf-8") if value else None
+
+    def __len__(self) -> int:
+        if self.is_arrow:
+            with pa.memory_map(self.path) as source:
+                reader = pa.ipc.open_file(source)
+                return sum(reader.get_record_batch(i).num_rows for i in range(reader.num_record_batches))
+        return pq.ParquetFile(self.path).metadata.num_rows
+
+    def read_table(self, columns: Optional[List[str]] = None) -> "pa.Table":
+        """The store (or some of its columns) as an Arrow table backed by the mapped file."""
+        if self.is_arrow:
+            table = pa.ipc.open_file(pa.memory_map(self.path)).read_all()
+            return table.select(columns) if columns else table
+        return pq.read_table(self.path, columns=columns, memory_map=True)
+
+    def iter_batches(self, batch_size: int = 1024, columns: Optional[List[str]] = None) -> Iterator["pa.RecordBatch"]:
+        """Stream the store in record batches without loading it whole."""
+        if self.is_arrow:
+            for batch in self.read_table(columns).to_batches(max_chunksize=batch_size):
+                yield batch
+            return
+        yield from pq.ParquetFile(self.path, memory_map=True).iter_batches(batch_size=batch_size, columns=columns)
+
+    def ids(self) -> List[str]:
+        return self.read_table(["id"]).column("id").to_pylist()
+
+    def embeddings(self) -> np.ndarray:
+        """All embeddings as a read-only (rows, dim) float32 array, without copying when possible."""
+        return embedding_matrix(self.read_table(["embedding"]).column("embedding"), self.dim)
+
+    def iter_chunks(self, batch_size: int = 1024) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (chunk_id, text, metadata), the same tuples the ingestion pipeline produces."""
+        for batch in self.iter_batches(batch_size, columns=["id", "text", "metadata"]):
+            for chunk_id, text, metadata in zip(*(batch.column(i).to_pylist() for i in range(3))):
+                yield chunk_id, text, json.loads(metadata) if metadata else {}
+
+
+def embedding_matrix(column, dim: int) -> np.ndarray:
+    """
+    View a fixed-size-list embedding column (Array or ChunkedArray) as a (rows, dim) array.
+    A single-chunk column without nulls is returned zero-copy; several chunks are concatenated once.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    if column.null_count:
+        raise ValueError("Chunk store has rows without embeddings")
+    return column.flatten().to_numpy(zero_copy_only=True).reshape(-1, dim)
@@ -0,0 +1,229 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Persistent SQLite embedding cache keyed by model name and chunk text hash
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from model_registry import normalize_model_name
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+SQLITE_MAX_VARIABLES = 900  # Stay under SQLite's bound-parameter limit on older builds
+ACCESS_FLUSH_ENTRIES = 4096  # Buffered last_access updates written in one transaction
+
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of float32 embeddings keyed by SHA-256(model name + chunk text).
+
+    Uses SQLite in WAL mode so several ingestion processes can share one cache file.
+    When the stored vectors exceed max_bytes, the least recently used entries are evicted.
+    The stored size is tracked as a running total (re-measured only when it crosses
+    max_bytes), and reads buffer their last_access updates, writing them with the next
+    put, eviction or close rather than committing on every lookup.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, "
+            "vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self._bytes = self._stored_bytes()
+        self._pending_access: Dict[str, float] = {}
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def _flush_access(self) -> None:
+        """Write buffered last_access times (the caller commits)."""
+        if self._pending_access:
+            self._conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._pending_access.items()])
+            self._pending_access.clear()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{normalize_model_name(model_name)}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached embedding for each text, or None where it is missing."""
+        keys = [self.key(model_name, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                block = list(set(keys[start:start + SQLITE_MAX_VARIABLES]))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(block))})", block
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._pending_access.update((key, now) for key in found)
+                if len(self._pending_access) >= ACCESS_FLUSH_ENTRIES:
+                    self._flush_access()
+                    self._conn.commit()
+            results = [found.get(key) for key in keys]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model_name: str, texts: List[str], embeddings) -> None:
+        """Store embeddings for texts, then evict least recently used entries if over max_bytes."""
+        if not texts:
+            return
+        model = normalize_model_name(model_name)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        now = time.time()
+        rows = [(self.key(model_name, text), model, int(vector.shape[0]), vector.tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._flush_access()
+            self._conn.commit()
+            # Replaced keys are counted twice; the re-measure below corrects any overestimate
+            self._bytes += sum(len(row[3]) for row in rows)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Other processes sharing the file also add entries, so measure before evicting
+        total = self._bytes = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so we don't run this on every insert once full
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self._conn.commit()
+        self._bytes -= freed
+        self.evictions += len(victims)
+        logger.info(f"Evicted {len(victims)} cached embeddings ({freed / (1024 * 1024):.1f} MB)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._bytes = 0
+            self._pending_access.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
+
+
+def encode_with_cache(texts: List[str], model_name: str, encode: Callable[[List[str]], Any],
+                      cache: Optional[EmbeddingCache]) -> np.ndarray:
+    """
+    Return float32 embeddings for texts, calling encode() only for texts missing from the cache.
+    Duplicate texts within one call are encoded once.
+    """
+    if cache is None:
+        return np.asarray(encode(texts), dtype=np.float32)
+    cached = cache.get_many(model_name, texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    computed = {}
+    if missing:
+        vectors = np.asarray(encode(missing), dtype=np.float32)
+        cache.put_many(model_name, missing, vectors)
+        computed = dict(zip(missing, vectors))
+    return np.stack([vector if vector is not None else computed[text] for text, vector in zip(texts, cached)])
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Process-wide cache at EMBEDDING_CACHE_PATH (default: next to this module), bounded by
+    EMBEDDING_CACHE_MAX_MB. Set EMBEDDING_CACHE_PATH=off to disable caching.
+    """
+    global _cache
+    path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if path.lower() in ("", "off", "none", "false"):
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            try:
+                max_bytes = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+                _cache = EmbeddingCache(path, max_bytes=max_bytes)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache unavailable at {path}: {e}")
+                return None
+        return _cache
@@ -27,37 +27,405 @@ Technology Stack:
 """
 
 import os
-from sentence_transformers import SentenceTransformer
+import sys
+import json
+import time
+from itertools import islice
 import numpy as np
-from vector_db import store_embeddings, initialize_vector_db  # Import vector DB functions
+from vector_db import store_embeddings, initialize_vector_db, create_client, delete_embeddings, merge_metadata, finalize_collection, infer_language, infer_topic, DEFAULT_COLLECTION, CHUNK_FILE_PATTERN  # Import vector DB functions
+from model_registry import get_model, DEFAULT_MODEL_NAME  # Shared, lazily loaded models
+from parallel_embedding import ParallelEmbedder  # Multi-process encoding for bulk loads
+from embedding_cache import encode_with_cache, get_embedding_cache  # Skip re-encoding repeated chunks
+from chunk_store import ChunkStore, ChunkStoreWriter  # Columnar copy of chunks and embeddings
+from index_versions import IndexVersionManager  # Blue/green index rebuilds
+from lexical_index import get_lexical_index  # BM25 index for hybrid retrieval
 
-def generate_embeddings(chunks, model_name="all-MiniLM-L6-v2"):
+# Add path for the ingestion manifest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data_processing'))
+from ingestion_manifest import IngestionManifest, hash_text, STAGE_EMBEDDED, DEFAULT_MANIFEST_PATH
+from chunk_artifacts import iter_artifact, ARTIFACT_SUFFIX
+from dedup import ChunkDeduplicator
+
+def generate_embeddings(chunks, model_name=DEFAULT_MODEL_NAME, as_numpy=False):
     """
     Generate embeddings for a list of text chunks using a pre-trained model.
     Args:
         chunks (list): List of text chunks to embed.
         model_name (str): Name of the pre-trained model (default: 'all-MiniLM-L6-v2').
+        as_numpy (bool): Return a float32 (n, dim) array instead of nested lists. Python lists
+            of floats take roughly 10x the memory, so prefer this for anything large.
     Returns:
-        list: List of numpy arrays representing embeddings.
+        list or numpy.ndarray: Embeddings, one row per chunk.
     """
     try:
         if not chunks or not isinstance(chunks, list):
             raise ValueError("Input must be a non-empty list of chunks.")
-        model = SentenceTransformer(model_name)
-        embeddings = model.encode(chunks, convert_to_numpy=True)
+        # Cached chunks never reach the model; it is loaded once per process, see model_registry
+        embeddings = encode_with_cache(chunks, model_name,
+                                       lambda texts: get_model(model_name).encode(texts, convert_to_numpy=True),
+                                       get_embedding_cache())
+        if as_numpy:
+            return np.asarray(embeddings, dtype=np.float32)
         return embeddings.tolist()  # Convert to list for storage
     except Exception as e:
         print(f"Error generating embeddings: {str(e)}")
+        return np.empty((0, 0), dtype=np.float32) if as_numpy else []
+
+CHUNK_METADATA_SUFFIX = "_chunks.json"  # Written by text_chunker.save_chunks in code mode
+
+def load_chunk_metadata(chunk_dir, source):
+    """
+    Load the per-chunk metadata (symbol, kind, line range) the code chunker saved for a source.
+    Args:
+        chunk_dir (str): Directory containing the chunks.
+        source (str): Source base name.
+    Returns:
+        list: Metadata dict per chunk index, or an empty list if there is none.
+    """
+    metadata_file = os.path.join(chunk_dir, f"{source}{CHUNK_METADATA_SUFFIX}")
+    if not os.path.exists(metadata_file):
+        return []
+    try:
+        with open(metadata_file, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except Exception as e:
+        print(f"Error loading chunk metadata {metadata_file}: {str(e)}")
         return []
 
-def process_chunks_directory(chunk_dir):
+def build_chunk_metadata(source, chunk_idx, text, extra=None):
+    """
+    Vector metadata for one chunk.
+    Args:
+        source (str): Chunk base name of the source file.
+        chunk_idx (int): Position of the chunk in its source.
+        text (str): Chunk text.
+        extra (dict, optional): Chunker metadata (symbol, kind, line range) to merge in.
+    Returns:
+        dict: Metadata with source, chunk_file, chunk_idx, language, topic and content_hash.
+    """
+    metadata = {
+        "source": source,
+        "chunk_file": f"{source}_chunk_{chunk_idx}",
+        "chunk_idx": chunk_idx,
+        "language": infer_language(source, text),
+        "topic": infer_topic(text),
+        "content_hash": hash_text(text),
+    }
+    if extra:
+        metadata.update(extra)
+    return metadata
+
+def iter_chunk_files(chunk_dir):
+    """
+    Lazily yield chunks from a directory, one at a time.
+    Args:
+        chunk_dir (str): Directory containing *_chunk_N.txt files and/or per-source *.jsonl artifacts.
+    Yields:
+        tuple: (chunk_id, text, metadata) for each non-empty chunk.
+    """
+    chunk_metadata = {}  # source -> per-chunk symbol metadata, loaded on first use
+    with os.scandir(chunk_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(ARTIFACT_SUFFIX):
+                for chunk_id, text, metadata in iter_artifact(entry.path):
+                    if text.strip():
+                        source = metadata.get("source", entry.name[:-len(ARTIFACT_SUFFIX)])
+                        yield chunk_id, text, build_chunk_metadata(source, metadata.get("chunk_idx", 0), text, metadata)
+                continue
+            if not entry.is_file() or not entry.name.endswith(".txt"):
+                continue
+            with open(entry.path, "r", encoding="utf-8") as file:
+                text = file.read()
+            if not text.strip():
+                continue
+            chunk_id = os.path.splitext(entry.name)[0]
+            match = CHUNK_FILE_PATTERN.match(chunk_id)
+            source = match.group("source") if match else chunk_id
+            chunk_idx = int(match.group("idx")) if match else 0
+            if source not in chunk_metadata:
+                chunk_metadata[source] = load_chunk_metadata(chunk_dir, source)
+            extra = chunk_metadata[source][chunk_idx] if chunk_idx < len(chunk_metadata[source]) else None
+            yield chunk_id, text, build_chunk_metadata(source, chunk_idx, text, extra)
+
+def batched(iterable, batch_size):
+    """
+    Group an iterable into lists of at most batch_size items without materializing it.
+    Args:
+        iterable (iterable): Items to group.
+        batch_size (int): Maximum items per batch.
+    Yields:
+        list: Consecutive batches of items.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def skip_unchanged_chunks(chunks, manifest, stage, seen_ids, stats, on_skipped=None):
+    """
+    Filter a chunk stream down to chunks whose content hash differs from the manifest.
+    Args:
+        chunks (iterable): (chunk_id, text, metadata) tuples with metadata["content_hash"].
+        manifest (IngestionManifest): Manifest from previous runs.
+        stage (str): Manifest stage for the target collection.
+        seen_ids (set): Receives every chunk ID in the stream, changed or not.
+        stats (dict): Its "unchanged" counter is incremented for skipped chunks.
+        on_skipped (callable, optional): Called with the ID of each skipped chunk.
+    Yields:
+        tuple: Changed or new chunks.
+    """
+    for chunk_id, text, metadata in chunks:
+        seen_ids.add(chunk_id)
+        if manifest.changed(stage, chunk_id, metadata["content_hash"]):
+            yield chunk_id, text, metadata
+        else:
+            stats["unchanged"] += 1
+            if on_skipped:
+                on_skipped(chunk_id)
+
+def _drop_duplicates(chunks, deduplicator, duplicate_ids):
+    """deduplicator.filter that also collects the IDs of the dropped chunks."""
+    for chunk_id, text, metadata in chunks:
+        if deduplicator.check(chunk_id, text, metadata.get("source")) is None:
+            yield chunk_id, text, metadata
+        else:
+            duplicate_ids.append(chunk_id)
+
+def batch_texts(batch):
+    """Texts of a batch of (chunk_id, text, metadata) tuples."""
+    return [text for _, text, _ in batch]
+
+def encode_chunk_batches(chunks, batch_size=256, model_name=DEFAULT_MODEL_NAME, num_workers=1):
+    """
+    Group a chunk stream into batches and encode them, in order.
+    Args:
+        chunks (iterable): (chunk_id, text, metadata) tuples.
+        batch_size (int): Chunks per batch.
+        model_name (str): Embedding model name.
+        num_workers (int): Worker processes; 1 encodes in this process with the shared model.
+    Yields:
+        tuple: (batch, embeddings) with embeddings as a float32 array, in input order.
+    """
+    batches = batched(chunks, batch_size)
+    encode_batch_size = min(batch_size, 64)
+    if num_workers > 1:
+        with ParallelEmbedder(model_name, num_workers=num_workers, encode_batch_size=encode_batch_size) as embedder:
+            yield from embedder.map(batches, key=batch_texts)
+        return
+    cache = get_embedding_cache()
+    encode = lambda texts: get_model(model_name).encode(texts, batch_size=encode_batch_size, convert_to_numpy=True)
+    for batch in batches:
+        yield batch, encode_with_cache(batch_texts(batch), model_name, encode, cache)
+
+def embed_chunk_stream(chunks, client=None, collection_name=DEFAULT_COLLECTION, batch_size=256,
+                       model_name=DEFAULT_MODEL_NAME, manifest=None, num_workers=1, seen_ids=None,
+                       prune_stale=True, chunk_store=None, deduplicator=None, on_stored=None):
+    """
+    Encode a stream of chunks and upsert them into one collection, one batch at a time.
+    Args:
+        chunks (iterable): (chunk_id, text, metadata) tuples, e.g. from iter_chunk_files or the
+            ingest pipeline; metadata must include content_hash.
+        client (chromadb.Client, optional): Existing database client.
+        collection_name (str): Collection that receives every chunk (default: DEFAULT_COLLECTION).
+        batch_size (int): Number of texts per encode call and per upsert (default: 256).
+        model_name (str): Embedding model name.
+        manifest (IngestionManifest, optional): Only embed chunks whose content hash changed and
+            delete vectors of chunks that disappeared since the last run.
+        num_workers (int): Encode in this many worker processes (default: 1, in-process). Batches
+            are still written to the store in their original order.
+        seen_ids (set, optional): IDs known to still exist although they are not in the stream
+            (e.g. chunks of files skipped upstream as unchanged); the set is extended in place.
+        prune_stale (bool or callable): Whether stale vectors may be deleted, evaluated after the
+            stream is exhausted (pass a callable when upstream failures are only known then).
+        chunk_store (ChunkStoreWriter, optional): Also append every stored batch to this store.
+        deduplicator (ChunkDeduplicator, optional): Drop exact and near-duplicate chunks before
+            encoding; each kept chunk gets "sources"/"source_count" metadata listing where it appears.
+        on_stored (callable, optional): Called with a list of chunk IDs once they are settled:
+            upserted, skipped because their vector is current, or dropped as a duplicate of a
+            stored canonical. Chunks of a failed batch are never reported.
+    Returns:
+        dict: Ingestion statistics (chunks, unchanged, deleted, batches, elapsed seconds, chunks per second).
+    """
+    stats = {"collection": collection_name, "chunks": 0, "unchanged": 0, "deleted": 0, "batches": 0,
+             "failed_batches": 0, "workers": num_workers, "elapsed_seconds": 0.0}
+    start = time.perf_counter()
+    stage = f"{STAGE_EMBEDDED}:{collection_name}"
+    seen_ids = seen_ids if seen_ids is not None else set()
+    try:
+        client = client or initialize_vector_db()
+        if not client:
+            raise ValueError("Failed to initialize vector database.")
+        lexical_index = get_lexical_index(client)
+
+        # Deduplicate before the manifest check so a duplicate's canonical is chosen from every chunk
+        duplicate_ids = []
+        if deduplicator is not None:
+            chunks = _drop_duplicates(chunks, deduplicator, duplicate_ids)
+        if manifest:
+            chunks = skip_unchanged_chunks(chunks, manifest, stage, seen_ids, stats,
+                                           on_skipped=(lambda chunk_id: on_stored([chunk_id])) if on_stored else None)
+
+        for batch, embeddings in encode_chunk_batches(chunks, batch_size, model_name, num_workers):
+            ids = [chunk_id for chunk_id, _, _ in batch]
+            texts = batch_texts(batch)
+            metadatas = [metadata for _, _, metadata in batch]
+            stored = store_embeddings(client, collection_name, embeddings, metadatas=metadatas,
+                                      ids=ids, documents=texts, upsert=True)
+            if stored:
+                stats["chunks"] += stored
+                if chunk_store is not None:
+                    chunk_store.write(ids, texts, metadatas, embeddings)
+                if lexical_index is not None:
+                    lexical_index.add(collection_name, ids, texts)
+                if manifest:
+                    for chunk_id, _, metadata in batch:
+                        manifest.record(stage, chunk_id, metadata["content_hash"])
+                if on_stored:
+                    on_stored(ids)
+            else:
+                stats["failed_batches"] += 1
+            stats["batches"] += 1
+
+        if deduplicator is not None:
+            stats["duplicates"] = deduplicator.stats["exact_duplicates"] + deduplicator.stats["near_duplicates"]
+            merge_metadata(client, collection_name, deduplicator.source_metadata())
+            # A duplicate is settled once its canonical is stored, which a failed batch may not be
+            if on_stored and duplicate_ids and not stats["failed_batches"]:
+                on_stored(duplicate_ids)
+        # Only a complete pass tells us which chunks are really gone
+        complete = prune_stale() if callable(prune_stale) else prune_stale
+        if manifest and complete and not stats["failed_batches"]:
+            stale_ids = manifest.keys(stage) - seen_ids
+            if stale_ids:
+                stats["deleted"] = delete_embeddings(client, collection_name, stale_ids)
+                if lexical_index is not None:
+                    lexical_index.delete(collection_name, stale_ids)
+                for chunk_id in stale_ids:
+                    manifest.forget(stage, chunk_id)
+        if manifest:
+            manifest.save()
+        if stats["chunks"] or stats["deleted"]:
+            finalize_collection(client, collection_name)
+        cache = get_embedding_cache()
+        if cache and num_workers <= 1:
+            stats["embedding_cache"] = cache.get_stats()
+    except Exception as e:
+        print(f"Error streaming chunks: {str(e)}")
+        stats["error"] = str(e)
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 2)
+    stats["chunks_per_second"] = round(stats["chunks"] / stats["elapsed_seconds"], 1) if stats["elapsed_seconds"] else 0.0
+    return stats
+
+def reembed_chunk_store(store_path, output_path=None, client=None, collection_name=DEFAULT_COLLECTION,
+                        batch_size=256, model_name=DEFAULT_MODEL_NAME, num_workers=1):
+    """
+    Re-encode the chunks of a chunk store (e.g. with a new model) without re-parsing source files.
+    Args:
+        store_path (str): Chunk store to read texts and metadata from.
+        output_path (str, optional): Write the chunks with their new embeddings to this store.
+        client (chromadb.Client, optional): Existing database client.
+        collection_name (str): Collection that receives the new vectors.
+        batch_size (int): Chunks per encode call and per upsert.
+        model_name (str): Embedding model name.
+        num_workers (int): Embedding worker processes.
+    Returns:
+        dict: Ingestion statistics (see embed_chunk_stream).
+    """
+    try:
+        chunks = ChunkStore(store_path).iter_chunks(batch_size)
+        writer = ChunkStoreWriter(output_path, model_name=model_name) if output_path else None
+    except Exception as e:
+        print(f"Error opening chunk store: {str(e)}")
+        return {"collection": collection_name, "chunks": 0, "error": str(e)}
+    stats = embed_chunk_stream(chunks, client=client, collection_name=collection_name, batch_size=batch_size,
+                               model_name=model_name, num_workers=num_workers, chunk_store=writer)
+    if writer is not None:
+        # A failed pass leaves any previous output store in place
+        writer.close(discard="error" in stats)
+    return stats
+
+def build_lexical_index(client=None, collection_name=DEFAULT_COLLECTION, batch_size=1000):
+    """
+    (Re)build the BM25 index of a collection from the documents already stored in it, e.g. for
+    a collection ingested before lexical indexing existed. No encoding is needed.
+    Args:
+        client (chromadb.Client, optional): Existing database client.
+        collection_name (str): Collection to index.
+        batch_size (int): Rows read per call.
+    Returns:
+        int: Number of documents indexed.
+    """
+    indexed = 0
+    try:
+        client = client or initialize_vector_db()
+        lexical_index = get_lexical_index(client)
+        if lexical_index is None:
+            raise ValueError("Lexical index is disabled (LEXICAL_INDEX=off) or the database is not on disk.")
+        collection = client.get_collection(name=collection_name)
+        lexical_index.clear(collection_name)
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=batch_size, offset=offset)
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            lexical_index.add(collection_name, ids, page.get("documents") or [""] * len(ids))
+            indexed += len(ids)
+            offset += len(ids)
+        print(f"Indexed {indexed} documents of {collection_name} for BM25 search")
+    except Exception as e:
+        print(f"Error building lexical index: {str(e)}")
+    return indexed
+
+def stream_chunks_directory(chunk_dir, collection_name=DEFAULT_COLLECTION, batch_size=256,
+                            model_name=DEFAULT_MODEL_NAME, client=None, manifest=None, num_workers=1,
+                            dedup=False):
+    """
+    Stream chunk files into a single collection, encoding and writing one batch at a time.
+    Only one batch of texts and vectors is held in memory, whatever the corpus size.
+    Args:
+        chunk_dir (str): Directory containing chunked text files.
+        collection_name (str): Collection that receives every chunk (default: DEFAULT_COLLECTION).
+        batch_size (int): Number of texts per encode call and per upsert (default: 256).
+        model_name (str): Embedding model name.
+        client (chromadb.Client, optional): Existing database client.
+        manifest (IngestionManifest, optional): Only embed chunks whose content hash changed and
+            delete vectors of chunks that disappeared since the last run.
+        num_workers (int): Encode in this many worker processes (default: 1, in-process).
+        dedup (bool): Skip exact and near-duplicate chunks (see dedup.ChunkDeduplicator).
+    Returns:
+        dict: Ingestion statistics (see embed_chunk_stream).
+    """
+    if not os.path.exists(chunk_dir):
+        print(f"Error streaming chunks: Chunk directory not found: {chunk_dir}")
+        return {"collection": collection_name, "chunks": 0, "unchanged": 0, "deleted": 0, "batches": 0,
+                "failed_batches": 0, "workers": num_workers, "elapsed_seconds": 0.0, "chunks_per_second": 0.0,
+                "error": f"Chunk directory not found: {chunk_dir}"}
+    return embed_chunk_stream(iter_chunk_files(chunk_dir), client=client, collection_name=collection_name,
+                              batch_size=batch_size, model_name=model_name, manifest=manifest,
+                              num_workers=num_workers, deduplicator=ChunkDeduplicator() if dedup else None)
+
+def process_chunks_directory(chunk_dir, streaming=False, batch_size=256, collection_name=DEFAULT_COLLECTION,
+                             manifest=None, num_workers=1):
     """
     Process all chunk files in a directory and generate/store embeddings.
     Args:
         chunk_dir (str): Directory containing chunked text files.
+        streaming (bool): Use batched single-collection ingestion (see stream_chunks_directory).
+        batch_size (int): Texts per encode/upsert call in streaming mode.
+        collection_name (str): Target collection in streaming mode.
+        manifest (IngestionManifest, optional): Incremental re-ingestion in streaming mode.
+        num_workers (int): Embedding worker processes in streaming mode.
     Returns:
-        dict: Mapping of filenames to their embeddings.
+        dict: Mapping of filenames to their embeddings, or ingestion statistics in streaming mode.
     """
+    if streaming:
+        return stream_chunks_directory(chunk_dir, collection_name=collection_name, batch_size=batch_size,
+                                       manifest=manifest, num_workers=num_workers)
     try:
         if not os.path.exists(chunk_dir):
             raise FileNotFoundError(f"Chunk directory not found: {chunk_dir}")
@@ -68,7 +436,6 @@ def process_chunks_directory(chunk_dir):
             raise ValueError("Failed to initialize vector database.")
 
         chunk_files = [f for f in os.listdir(chunk_dir) if f.endswith(".txt")]
-        model = SentenceTransformer("all-MiniLM-L6-v2")  # Load once for efficiency
         for chunk_file in chunk_files:
             file_path = os.path.join(chunk_dir, chunk_file)
             with open(file_path, "r", encoding="utf-8") as file:
@@ -86,10 +453,82 @@ def process_chunks_directory(chunk_dir):
         print(f"Error processing chunks: {str(e)}")
         return {}
 
+def build_index_version(chunk_dir, root, collection_name=DEFAULT_COLLECTION, batch_size=256,
+                        model_name=DEFAULT_MODEL_NAME, num_workers=1, sample_queries=None, keep_versions=2,
+                        backend=None, dedup=False):
+    """
+    Rebuild the index without touching the live one: embed every chunk into a new version
+    directory under root, validate it, then atomically promote it and garbage-collect old versions.
+    Pipelines whose client was opened on root (see create_client) switch to it on their next query.
+    Args:
+        chunk_dir (str): Directory containing chunk files or JSONL artifacts.
+        root (str): Versioned index root (created on first use).
+        collection_name (str): Collection to build.
+        batch_size (int): Texts per encode/upsert call.
+        model_name (str): Embedding model name.
+        num_workers (int): Embedding worker processes.
+        sample_queries (list, optional): Query texts that must return results from the new version.
+        keep_versions (int): Previous versions kept after promotion (for readers still on them and rollback).
+        backend (str, optional): Vector store backend, see create_client.
+        dedup (bool): Skip exact and near-duplicate chunks.
+    Returns:
+        dict: Version ID, ingestion stats, validation report, whether it was promoted and removed versions.
+    """
+    manager = IndexVersionManager(root)
+    version = manager.create_version()
+    result = {"version": version, "promoted": False, "removed_versions": []}
+    try:
+        client = create_client(manager.version_path(version), backend)
+        stats = stream_chunks_directory(chunk_dir, collection_name=collection_name, batch_size=batch_size,
+                                        model_name=model_name, client=client, num_workers=num_workers,
+                                        dedup=dedup)
+        result["stats"] = stats
+
+        live_count = None
+        live_path = manager.current_path()
+        if live_path:
+            try:
+                live_count = create_client(live_path, backend).get_collection(name=collection_name).count()
+            except Exception:
+                live_count = None
+        sample_embeddings = generate_embeddings(sample_queries, model_name, as_numpy=True) if sample_queries else None
+        validation = manager.validate(client, collection_name, live_count=live_count,
+                                      sample_embeddings=sample_embeddings)
+        result["validation"] = validation
+        if "error" in stats or stats.get("failed_batches") or not validation["valid"]:
+            print(f"Index version {version} failed validation, live index left unchanged: {validation}")
+            manager.discard(version)
+            return result
+
+        manager.promote(version)
+        result["promoted"] = True
+        result["removed_versions"] = manager.gc(keep_versions)
+    except Exception as e:
+        print(f"Error building index version {version}: {str(e)}")
+        result["error"] = str(e)
+        manager.discard(version)
+    return result
+
 if __name__ == "__main__":
     # Suppress Chroma telemetry
     os.environ["CHROMA_TELEMETRY"] = "false"
     chunk_dir = r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\chunked_data"
-    embeddings_data = process_chunks_directory(chunk_dir)
-    if embeddings_data:
-        print(f"Total embeddings generated: {sum(len(v) for v in embeddings_data.values())}")
+    num_workers = int(os.getenv("EMBEDDING_WORKERS", "1"))
+    dedup = os.getenv("INGEST_DEDUP", "false").lower() == "true"
+    if os.getenv("INDEX_BUILD_MODE", "inplace").lower() == "versioned":
+        # Full rebuild into a new version; the live index keeps serving until it is promoted
+        result = build_index_version(chunk_dir, root=r"C:\Users\ursti\Downloads\Code Explainer\src\embeddings\vector_db",
+                                     num_workers=num_workers, dedup=dedup)
+        print(f"Index version {result['version']}: promoted={result['promoted']}, "
+              f"removed old versions {result['removed_versions']}")
+    else:
+        manifest = IngestionManifest(DEFAULT_MANIFEST_PATH)
+        stats = stream_chunks_directory(chunk_dir, batch_size=256, manifest=manifest, num_workers=num_workers,
+                                        dedup=dedup)
+        print(f"Streamed {stats['chunks']} chunks in {stats['batches']} batches with {num_workers} worker(s) "
+              f"({stats['chunks_per_second']} chunks/s)")
+        print(f"Skipped {stats['unchanged']} unchanged chunks, deleted {stats['deleted']} stale vectors")
+        if "embedding_cache" in stats:
+            print(f"Embedding cache hit rate: {stats['embedding_cache']['hit_rate']:.1%}")
+        if "duplicates" in stats:
+            print(f"Dropped {stats['duplicates']} duplicate chunks")
@@ -0,0 +1,227 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Blue/green vector index versions with validation, atomic promotion and garbage collection
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
+
+from lexical_index import release_lexical_index
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+SELF_HIT_DISTANCE = 1e-3
+
+
+def is_versioned_root(db_path: str) -> bool:
+    """True if db_path holds versioned indexes (a CURRENT pointer) rather than one live database."""
+    return os.path.isfile(os.path.join(db_path, CURRENT_FILE))
+
+
+class IndexVersionManager:
+    """
+    Keeps each full index build in its own directory and a CURRENT file naming the live one:
+
+        <root>/CURRENT              -> "20261018T120000Z"
+        <root>/versions/20261018T120000Z/
+        <root>/versions/20261018T093000Z/
+
+    A build writes into a fresh version, is validated, and only then becomes live by
+    atomically replacing CURRENT, so readers never see a half-built index.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+    @property
+    def current_file(self) -> str:
+        return os.path.join(self.root, CURRENT_FILE)
+
+    def version_path(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self) -> List[str]:
+        """Version IDs, oldest first (IDs are UTC timestamps, so they sort by age)."""
+        return sorted(entry.name for entry in os.scandir(self.versions_dir) if entry.is_dir())
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self.current_file, "r", encoding="utf-8") as file:
+                version = file.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def current_path(self) -> Optional[str]:
+        version = self.current_version()
+        return self.version_path(version) if version else None
+
+    def create_version(self) -> str:
+        """Allocate an empty directory for a new build and return its version ID."""
+        version = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        os.makedirs(self.version_path(version))
+        logger.info(f"Created index version {version}")
+        return version
+
+    def validate(self, client, collection_name: str, min_count: int = 1, min_count_ratio: float = 0.5,
+                 live_count: Optional[int] = None, sample_size: int = 5, sample_embeddings=None,
+                 min_self_hit_rate: float = 0.8) -> Dict[str, Any]:
+        """
+        Check a freshly built version before it goes live.
+
+        - count: at least min_count rows, and at least min_count_ratio of the live version's rows
+          (catches a build that silently lost most of the corpus).
+        - sample queries: each of sample_embeddings must return results; with none given, the
+          first sample_size stored vectors are queried and must mostly find themselves first.
+        Args:
+            client: Client opened on the new version.
+            collection_name (str): Collection to check.
+            min_count (int): Minimum number of rows.
+            min_count_ratio (float): Minimum size relative to live_count.
+            live_count (int, optional): Row count of the live version, if any.
+            sample_size (int): Stored vectors used as self-retrieval probes.
+            sample_embeddings (list, optional): Query embeddings that must return results.
+            min_self_hit_rate (float): Share of probes that must return themselves as the top hit.
+        Returns:
+            dict: {"valid": bool, "count": int, "checks": {...}, "errors": [...]}.
+        """
+        report = {"valid": False, "count": 0, "checks": {}, "errors": []}
+        try:
+            collection = client.get_collection(name=collection_name)
+            count = collection.count()
+            report["count"] = count
+            report["checks"]["min_count"] = count >= min_count
+            if live_count:
+                report["checks"]["count_ratio"] = count >= live_count * min_count_ratio
+
+            if sample_embeddings is not None:
+                results = collection.query(query_embeddings=[list(map(float, e)) for e in sample_embeddings],
+                                           n_results=1)
+                report["checks"]["sample_queries"] = all(ids for ids in results.get("ids") or [])
+            elif count:
+                probes = collection.get(include=["embeddings"], limit=sample_size)
+                probe_ids = probes.get("ids") or []
+                results = collection.query(query_embeddings=[list(map(float, e)) for e in probes["embeddings"]],
+                                           n_results=1, include=["distances"])
+                # A hit is the probe itself, or an identical vector stored under another ID (duplicate chunk)
+                hits = sum(1 for probe_id, ids, distances in zip(probe_ids, results.get("ids") or [],
+                                                                 results.get("distances") or [])
+                           if ids and (ids[0] == probe_id or distances[0] <= SELF_HIT_DISTANCE))
+                report["self_hit_rate"] = hits / len(probe_ids) if probe_ids else 0.0
+                report["checks"]["sample_queries"] = report["self_hit_rate"] >= min_self_hit_rate
+        except Exception as e:
+            report["errors"].append(str(e))
+        report["valid"] = not report["errors"] and all(report["checks"].values())
+        return report
+
+    def promote(self, version: str) -> None:
+        """Make version live by atomically replacing the CURRENT pointer."""
+        if not os.path.isdir(self.version_path(version)):
+            raise FileNotFoundError(f"Index version not found: {version}")
+        tmp_path = f"{self.current_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(version)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.current_file)
+        logger.info(f"Promoted index version {version}")
+
+    def discard(self, version: str) -> None:
+        """Delete a version that failed validation (never the live one)."""
+        if version != self.current_version():
+            release_lexical_index(self.version_path(version))
+            shutil.rmtree(self.version_path(version), ignore_errors=True)
+
+    def gc(self, keep: int = 2) -> List[str]:
+        """
+        Delete old versions, keeping the live one plus the `keep` newest others so that
+        readers which have not yet switched (and rollbacks) still have their directory.
+        Returns:
+            list: Removed version IDs.
+        """
+        current = self.current_version()
+        others = [version for version in self.list_versions() if version != current]
+        removed = others[:max(0, len(others) - keep)]
+        for version in removed:
+            release_lexical_index(self.version_path(version))
+            shutil.rmtree(self.version_path(version), ignore_errors=True)
+        if removed:
+            logger.info(f"Removed {len(removed)} old index versions")
+        return removed
+
+
+class VersionedClient:
+    """
+    Client proxy for a versioned root. Every attribute access goes to a client opened on the
+    live version; the CURRENT pointer is re-read at most every check_interval seconds and a
+    changed pointer reopens the client, so running pipelines pick up a promoted build
+    without a restart.
+    """
+
+    def __init__(self, root: str, backend: Optional[str] = None, check_interval: float = 5.0):
+        self._manager = IndexVersionManager(root)
+        self._backend = backend
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._client = None
+        self._checked_at = 0.0
+        self._refresh()
+
+    @property
+    def version(self) -> Optional[str]:
+        self._refresh()
+        return self._version
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._client is not None and now - self._checked_at < self._check_interval:
+            return self._client
+        with self._lock:
+            self._checked_at = now
+            version = self._manager.current_version()
+            if version and version != self._version:
+                from vector_db import create_client
+                self._client = create_client(self._manager.version_path(version), self._backend)
+                if self._version:
+                    logger.info(f"Switched vector index from version {self._version} to {version}")
+                self._version = version
+            if self._client is None:
+                raise RuntimeError(f"No live index version under {self._manager.root}")
+            return self._client
+
+    def __getattr__(self, name: str):
+        return getattr(self._refresh(), name)
@@ -0,0 +1,291 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Persisted BM25 inverted index with an identifier-aware tokenizer, and rank fusion helpers
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import re
+import math
+import logging
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "lexical.sqlite3"  # Kept inside the vector database directory it indexes
+SQLITE_MAX_VARIABLES = 900
+RRF_K = 60  # Standard reciprocal rank fusion constant
+
+# Dotted identifiers (heapq.nsmallest, os.path.join) are kept whole as well as split
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*|\d+")
+WORD_PART_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+BACKTICK_PATTERN = re.compile(r"`([^`]+)`")
+ABBREVIATION_PATTERN = re.compile(r"^(?:[A-Za-z]\.)+[A-Za-z]$")  # e.g, i.e, a.k.a, U.S
+PRODUCT_NAME_PATTERN = re.compile(r"^[A-Z][A-Za-z0-9]*\.js$")  # Node.js, Vue.js
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased terms for BM25. Each identifier contributes itself plus its dotted, snake_case
+    and camelCase parts, so "heapq.nsmallest", "nsmallest" and "smallest" style queries all match:
+
+        "self.maxHeap_size" -> self.maxheap_size, self, maxheap_size, max, heap, size
+    """
+    tokens = []
+    for match in IDENTIFIER_PATTERN.finditer(text):
+        word = match.group()
+        tokens.append(word.lower())
+        parts = word.split(".")
+        for part in parts:
+            if len(parts) > 1:
+                tokens.append(part.lower())
+            pieces = [piece.lower() for chunk in part.split("_") for piece in WORD_PART_PATTERN.findall(chunk)]
+            if len(pieces) > 1:
+                tokens.extend(pieces)
+    return tokens
+
+
+def _is_prose_dotted(word: str) -> bool:
+    """Dotted words that are prose rather than code: abbreviations (e.g, i.e, a.k.a) and Node.js-style names."""
+    return bool(ABBREVIATION_PATTERN.match(word) or PRODUCT_NAME_PATTERN.match(word))
+
+
+def query_identifiers(query: str) -> List[str]:
+    """
+    Code identifiers named in the query, lowercased as tokenize() indexes them: backticked
+    words, plus dotted, snake_case and camelCase words outside backticks.
+    """
+    identifiers = [word.lower() for quoted in BACKTICK_PATTERN.findall(query)
+                   for word in IDENTIFIER_PATTERN.findall(quoted)]
+    for word in IDENTIFIER_PATTERN.findall(BACKTICK_PATTERN.sub(" ", query)):
+        if ("." in word and not _is_prose_dotted(word)) or "_" in word.strip("_") or re.search(r"[a-z][A-Z]", word):
+            identifiers.append(word.lower())
+    return list(dict.fromkeys(identifiers))
+
+
+def is_identifier_query(query: str) -> bool:
+    """True if the query names a code identifier (backticks, dotted, snake_case or camelCase)."""
+    return bool(query_identifiers(query))
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Merge several ranked ID lists: score(id) = sum over lists of 1 / (k + rank).
+    Returns:
+        list: (id, fused score), best first.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    BM25 inverted index stored in SQLite, one posting list per (collection, term).
+
+    Documents are added and deleted alongside the vector store during ingestion, so lexical
+    search needs no model and no scan of the chunk texts at query time.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "collection TEXT NOT NULL, id TEXT NOT NULL, length INTEGER NOT NULL, PRIMARY KEY (collection, id));"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "collection TEXT NOT NULL, term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL, "
+            "PRIMARY KEY (collection, term, doc_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings(collection, doc_id);"
+            "CREATE TABLE IF NOT EXISTS collections ("
+            "collection TEXT PRIMARY KEY, documents INTEGER NOT NULL, total_length INTEGER NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _remove(self, collection: str, ids: List[str]) -> int:
+        removed = total_length = 0
+        for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+            block = ids[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(block))
+            row = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents WHERE collection = ? AND id IN ({placeholders})",
+                [collection, *block]).fetchone()
+            if not row[0]:
+                continue
+            removed += row[0]
+            total_length += row[1]
+            self._conn.execute(f"DELETE FROM postings WHERE collection = ? AND doc_id IN ({placeholders})", [collection, *block])
+            self._conn.execute(f"DELETE FROM documents WHERE collection = ? AND id IN ({placeholders})", [collection, *block])
+        if removed:
+            self._conn.execute("UPDATE collections SET documents = documents - ?, total_length = total_length - ? "
+                               "WHERE collection = ?", (removed, total_length, collection))
+        return removed
+
+    def add(self, collection: str, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """Index (or re-index) documents."""
+        ids = list(ids)
+        if not ids:
+            return
+        documents, postings, total_length = [], [], 0
+        for doc_id, text in zip(ids, texts):
+            counts = Counter(tokenize(text or ""))
+            length = sum(counts.values())
+            documents.append((collection, doc_id, length))
+            postings.extend((collection, term, doc_id, tf) for term, tf in counts.items())
+            total_length += length
+        with self._lock:
+            self._remove(collection, ids)
+            self._conn.executemany("INSERT INTO documents VALUES (?, ?, ?)", documents)
+            self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+            self._conn.execute("INSERT INTO collections VALUES (?, ?, ?) ON CONFLICT(collection) DO UPDATE SET "
+                               "documents = documents + excluded.documents, "
+                               "total_length = total_length + excluded.total_length",
+                               (collection, len(documents), total_length))
+            self._conn.commit()
+
+    def delete(self, collection: str, ids: Iterable[str]) -> int:
+        with self._lock:
+            removed = self._remove(collection, list(ids))
+            self._conn.commit()
+        return removed
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT documents FROM collections WHERE collection = ?", (collection,)).fetchone()
+        return row[0] if row else 0
+
+    def search(self, collection: str, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25 search.
+        Args:
+            collection (str): Collection to search.
+            query (str): Free text; tokenized like the documents.
+            k (int): Number of results.
+        Returns:
+            list: (document ID, BM25 score), best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            stats = self._conn.execute("SELECT documents, total_length FROM collections WHERE collection = ?",
+                                       (collection,)).fetchone()
+            if not stats or not stats[0]:
+                return []
+            n_docs, total_length = stats
+            rows = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                f"JOIN documents d ON d.collection = p.collection AND d.id = p.doc_id "
+                f"WHERE p.collection = ? AND p.term IN ({','.join('?' * len(terms))})",
+                [collection, *terms]).fetchall()
+        average_length = total_length / n_docs
+        postings: Dict[str, List[Tuple[str, int, int]]] = defaultdict(list)
+        for term, doc_id, tf, length in rows:
+            postings[term].append((doc_id, tf, length))
+        scores: Dict[str, float] = defaultdict(float)
+        for term, entries in postings.items():
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc_id, tf, length in entries:
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def clear(self, collection: Optional[str] = None) -> None:
+        with self._lock:
+            for table in ("postings", "documents", "collections"):
+                if collection is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE collection = ?", (collection,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_indexes: Dict[str, BM25Index] = {}
+_index_lock = threading.Lock()
+
+
+def client_db_path(client) -> Optional[str]:
+    """Directory a vector store client persists to (the live version's, for a versioned root)."""
+    path = getattr(client, "path", None)  # NumpyVectorClient (also through VersionedClient)
+    if isinstance(path, str):
+        return path
+    try:
+        settings = client.get_settings()  # Chroma
+    except Exception:
+        return None
+    return getattr(settings, "persist_directory", None) or None
+
+
+def get_lexical_index(client) -> Optional[BM25Index]:
+    """
+    BM25 index stored alongside the client's vector database (<db_path>/lexical.sqlite3), so each
+    database and each index version has its own, and deleting a version deletes its postings.
+    Set LEXICAL_INDEX=off to disable lexical indexing and hybrid retrieval.
+    Args:
+        client: Vector store client from vector_db.create_client.
+    Returns:
+        BM25Index or None: None if disabled, or if the client is not persisted to a directory.
+    """
+    if os.getenv("LEXICAL_INDEX", "on").lower() in ("", "off", "none", "false", "0"):
+        return None
+    db_path = client_db_path(client)
+    if not db_path:
+        return None
+    path = os.path.join(os.path.abspath(db_path), INDEX_FILENAME)
+    with _index_lock:
+        if path not in _indexes:
+            try:
+                _indexes[path] = BM25Index(path)
+            except sqlite3.Error as e:
+                logger.warning(f"Lexical index unavailable at {path}: {e}")
+                return None
+        return _indexes[path]
+
+
+def release_lexical_index(db_path: str) -> None:
+    """Close the cached index of a vector database directory (before that directory is deleted)."""
+    path = os.path.join(os.path.abspath(db_path), INDEX_FILENAME)
+    with _index_lock:
+        index = _indexes.pop(path, None)
+    if index is not None:
+        index.close()
@@ -0,0 +1,84 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Maximal marginal relevance (MMR) selection of diverse search results
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+DEFAULT_LAMBDA = 0.5
+DEFAULT_DUPLICATE_THRESHOLD = 0.95
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(query_embedding, candidate_embeddings, k: int = 3, lambda_mult: float = DEFAULT_LAMBDA,
+               duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Pick k diverse candidates by maximal marginal relevance:
+
+        score(c) = lambda * sim(c, query) - (1 - lambda) * max sim(c, already selected)
+
+    Candidates at least duplicate_threshold cosine-similar to a selected one are never picked.
+    Works on the embeddings returned with the search results, so it needs no second query.
+    Args:
+        query_embedding: Query vector.
+        candidate_embeddings: (n, dim) candidate vectors (e.g. the fetch_k nearest neighbours).
+        k (int): Number of results to select.
+        lambda_mult (float): 1.0 ranks by relevance only, 0.0 by diversity only.
+        duplicate_threshold (float): Cosine similarity above which a candidate counts as a duplicate.
+    Returns:
+        tuple: (selected candidate indices in selection order,
+                {"candidates", "selected", "duplicates_dropped"}).
+    """
+    candidates = _normalize(np.asarray(candidate_embeddings, dtype=np.float32))
+    n = len(candidates)
+    if n == 0 or k <= 0:
+        return [], {"candidates": n, "selected": 0, "duplicates_dropped": 0}
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(-1))
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    max_similarity = np.zeros(n, dtype=np.float32)  # To the selected set; 0 until something is picked
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+    while len(selected) < k and available.any():
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        max_similarity = np.maximum(max_similarity, similarity[pick])
+        available &= max_similarity < duplicate_threshold
+
+    unselected = np.ones(n, dtype=bool)
+    unselected[selected] = False
+    duplicates = int((unselected & (max_similarity >= duplicate_threshold)).sum())
+    return selected, {"candidates": n, "selected": len(selected), "duplicates_dropped": duplicates}
@@ -0,0 +1,248 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Process-wide registry of embedding models shared by ingestion, tools and the pipeline
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+HF_MODEL_PREFIX = "sentence-transformers/"
+
+
+def normalize_model_name(model_name: Optional[str]) -> str:
+    """Map 'sentence-transformers/all-MiniLM-L6-v2' and 'all-MiniLM-L6-v2' to the same key."""
+    name = (model_name or DEFAULT_MODEL_NAME).strip()
+    if name.startswith(HF_MODEL_PREFIX):
+        name = name[len(HF_MODEL_PREFIX):]
+    return name
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    """Return the resident set size of this process, or None if psutil is unavailable."""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """
+    Lazily loads SentenceTransformer models once per (model name, device) and hands the
+    same instance to every caller in the process.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _key(self, model_name: Optional[str], device: Optional[str]) -> Tuple[str, str]:
+        return normalize_model_name(model_name), device or os.getenv("EMBEDDING_DEVICE", "auto")
+
+    def get_model(self, model_name: Optional[str] = None, device: Optional[str] = None):
+        """Return the shared model for (model_name, device), loading it on first use."""
+        key = self._key(model_name, device)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # One lock per key so loading MiniLM does not block callers of an already loaded model
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key)
+        return model
+
+    def _load(self, key: Tuple[str, str]):
+        """Load a model and record how long it took and how much memory it added."""
+        from sentence_transformers import SentenceTransformer
+
+        model_name, device = key
+        rss_before = _resident_memory_bytes()
+        start = time.perf_counter()
+        model = SentenceTransformer(model_name, device=None if device == "auto" else device)
+        load_time = time.perf_counter() - start
+        rss_after = _resident_memory_bytes()
+
+        self._models[key] = model
+        self._stats[key] = {
+            "model_name": model_name,
+            "device": str(getattr(model, "device", device)),
+            "load_time_seconds": round(load_time, 3),
+            "resident_memory_delta_mb": round((rss_after - rss_before) / (1024 * 1024), 1)
+            if rss_before is not None and rss_after is not None else None,
+            "resident_memory_mb": round(rss_after / (1024 * 1024), 1) if rss_after is not None else None,
+            "loaded_at": time.time(),
+            "warmed_up": False,
+        }
+        logger.info(f"Loaded embedding model {model_name} on {self._stats[key]['device']} in {load_time:.2f}s")
+        return model
+
+    def warm_up(self, model_name: Optional[str] = None, device: Optional[str] = None) -> Dict[str, Any]:
+        """Load the model and run one encode so the first user query doesn't pay for it."""
+        key = self._key(model_name, device)
+        model = self.get_model(model_name, device)
+        start = time.perf_counter()
+        model.encode(["warm up"], convert_to_numpy=True)
+        self._stats[key]["warmed_up"] = True
+        self._stats[key]["warm_up_seconds"] = round(time.perf_counter() - start, 3)
+        return dict(self._stats[key])
+
+    def is_loaded(self, model_name: Optional[str] = None, device: Optional[str] = None) -> bool:
+        return self._key(model_name, device) in self._models
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Load time and memory figures for every model loaded so far."""
+        return [dict(stats) for stats in self._stats.values()]
+
+    def clear(self) -> None:
+        """Drop all cached models (mainly useful for tests and forked workers)."""
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+            self._key_locks.clear()
+
+
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide registry."""
+    return _registry
+
+
+def get_model(model_name: Optional[str] = None, device: Optional[str] = None):
+    """Shortcut for get_registry().get_model()."""
+    return _registry.get_model(model_name, device)
+
+
+def warm_up_models(model_names: Optional[List[str]] = None, device: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Warm up each model in model_names (default: the MiniLM model), logging rather than raising."""
+    results = []
+    for model_name in model_names or [DEFAULT_MODEL_NAME]:
+        try:
+            results.append(_registry.warm_up(model_name, device))
+        except Exception as e:
+            logger.warning(f"Failed to warm up embedding model {model_name}: {e}")
+    return results
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings keyed by (model name, normalized query text),
+    so repeated questions skip the encoder entirely.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """Collapse whitespace and case; MiniLM is uncased so the embedding is unaffected by case."""
+        return " ".join(text.lower().split())
+
+    def get_or_compute(self, text: str, model_name: str,
+                       compute: Callable[[str], List[float]]) -> Tuple[List[float], bool]:
+        """Return (embedding, hit), calling compute(text) and caching the result on a miss."""
+        key = (normalize_model_name(model_name), self.normalize_query(text))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding, True
+            self.misses += 1
+
+        # Encode outside the lock so concurrent misses don't serialize on the model
+        embedding = compute(text)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return embedding, False
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_query_cache = QueryEmbeddingCache(max_size=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "256")))
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache."""
+    return _query_cache
+
+
+class RegistryEmbeddings:
+    """
+    Minimal LangChain-style embeddings (embed_query / embed_documents) backed by the
+    shared registry model instead of a private HuggingFaceEmbeddings copy.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, device: Optional[str] = None):
+        self.model_name = normalize_model_name(model_name)
+        self.device = device
+
+    @property
+    def model(self):
+        return _registry.get_model(self.model_name, self.device)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(list(texts), convert_to_numpy=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.encode([text], convert_to_numpy=True)[0].tolist()
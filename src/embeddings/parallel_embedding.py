@@ -0,0 +1,142 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Multi-process embedding driver for bulk ingestion on CPU-only hosts
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Any
+
+import numpy as np
+
+from model_registry import get_model, DEFAULT_MODEL_NAME
+from embedding_cache import encode_with_cache, get_embedding_cache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "TOKENIZERS_PARALLELISM")
+
+# Set in each worker by _init_worker
+_worker_model_name: Optional[str] = None
+
+
+def default_threads_per_worker(num_workers: int) -> int:
+    """Split the host's cores evenly so workers * threads never exceeds the core count."""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    """Pool initializer: pin the thread count, then load the model once for this worker."""
+    global _worker_model_name
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = "false" if name == "TOKENIZERS_PARALLELISM" else str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model_name = model_name
+    get_model(model_name)
+
+
+def _encode_batch(texts: List[str], encode_batch_size: int) -> np.ndarray:
+    model = get_model(_worker_model_name)
+    # Workers share the SQLite cache file; WAL mode lets them read while one writes
+    return encode_with_cache(texts, _worker_model_name,
+                             lambda missing: model.encode(missing, batch_size=encode_batch_size, convert_to_numpy=True),
+                             get_embedding_cache())
+
+
+class ParallelEmbedder:
+    """
+    Pool of worker processes that each hold one copy of the embedding model.
+
+    map() shards a stream of batches across the workers and yields the results in input
+    order. At most max_in_flight batches are queued at once, so memory stays bounded
+    however long the stream is.
+
+    Usage:
+        with ParallelEmbedder(num_workers=4) as embedder:
+            for batch, embeddings in embedder.map(batches, key=lambda batch: [text for _, text, _ in batch]):
+                ...
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, num_workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, encode_batch_size: int = 64,
+                 max_in_flight: Optional[int] = None):
+        self.model_name = model_name
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(self.num_workers)
+        self.encode_batch_size = encode_batch_size
+        self.max_in_flight = max_in_flight or 2 * self.num_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParallelEmbedder":
+        # spawn, not fork: forking a parent that already initialised torch can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker),
+        )
+        logger.info(f"Started {self.num_workers} embedding workers with {self.threads_per_worker} threads each")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def map(self, batches: Iterable[Any], key=None) -> Iterator[Tuple[Any, np.ndarray]]:
+        """
+        Encode each batch in a worker and yield (batch, embeddings) in input order.
+        key(batch) extracts the list of texts; by default the batch itself is the text list.
+        """
+        if self._executor is None:
+            raise RuntimeError("ParallelEmbedder must be used as a context manager")
+        pending = deque()
+        for batch in batches:
+            texts = key(batch) if key else batch
+            pending.append((batch, self._executor.submit(_encode_batch, texts, self.encode_batch_size)))
+            if len(pending) >= self.max_in_flight:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+def embed_texts_parallel(texts: List[str], model_name: str = DEFAULT_MODEL_NAME, num_workers: Optional[int] = None,
+                         batch_size: int = 256) -> np.ndarray:
+    """Encode a list of texts across worker processes and return one float32 array in input order."""
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    with ParallelEmbedder(model_name, num_workers=num_workers) as embedder:
+        parts = [embeddings for _, embeddings in embedder.map(batches)]
+    return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
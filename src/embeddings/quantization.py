@@ -0,0 +1,195 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Compressed vector codes (int8 scalar and product quantization) for the vector index
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import logging
+from typing import Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCORE_BLOCK_ROWS = 65536  # Codes decoded per matmul, bounds the float32 temp
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+
+class ScalarQuantizer:
+    """
+    Symmetric int8 quantization with one scale per dimension: x ~= code * scale.
+    A 384-dim float32 vector (1536 bytes) becomes 384 bytes.
+    """
+
+    kind = "int8"
+
+    def __init__(self, scale: np.ndarray, codes: np.ndarray):
+        self.scale = scale
+        self.codes = codes
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, **kwargs) -> "ScalarQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scale = np.abs(vectors).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+        return cls(scale.astype(np.float32), codes)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate dot products of every code with the query."""
+        # (code * scale) . q == code . (scale * q), so fold the scale into the query once
+        scaled_query = self.scale * query
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = np.asarray(self.codes[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ scaled_query
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scale.nbytes)
+
+    def save(self, prefix: str) -> None:
+        _save_npy(f"{prefix}.int8_scale.npy", self.scale)
+        _save_npy(f"{prefix}.int8_codes.npy", self.codes)
+
+    @classmethod
+    def load(cls, prefix: str) -> "ScalarQuantizer":
+        return cls(np.load(f"{prefix}.int8_scale.npy"), np.load(f"{prefix}.int8_codes.npy", mmap_mode="r"))
+
+    @staticmethod
+    def files(prefix: str):
+        return [f"{prefix}.int8_scale.npy", f"{prefix}.int8_codes.npy"]
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int, rng: np.random.Generator) -> np.ndarray:
+    """Plain (Euclidean) k-means used to train each PQ sub-codebook."""
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        distances = (vectors ** 2).sum(1)[:, None] - 2 * vectors @ centroids.T + (centroids ** 2).sum(1)[None, :]
+        assignments = np.argmin(distances, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class ProductQuantizer:
+    """
+    Product quantization: the vector is split into n_subvectors pieces and each piece is
+    replaced by the index of its nearest sub-centroid, so 384 float32 dims become
+    n_subvectors bytes. Scores use a per-query lookup table (asymmetric distance).
+    """
+
+    kind = "pq"
+
+    def __init__(self, codebooks: np.ndarray, codes: np.ndarray):
+        self.codebooks = codebooks  # (n_subvectors, n_centroids, sub_dim)
+        self.codes = codes          # (rows, n_subvectors) uint8
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_subvectors: int = 48, n_centroids: int = 256, n_iter: int = 15,
+              sample_size: int = 50000, seed: int = 0, **kwargs) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_rows, dim = vectors.shape
+        if dim % n_subvectors:
+            raise ValueError(f"Dimension {dim} is not divisible by n_subvectors={n_subvectors}")
+        sub_dim = dim // n_subvectors
+        n_centroids = min(n_centroids, 256, n_rows)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n_rows, sample_size, replace=False)] if n_rows > sample_size else vectors
+
+        codebooks = np.empty((n_subvectors, n_centroids, sub_dim), dtype=np.float32)
+        codes = np.empty((n_rows, n_subvectors), dtype=np.uint8)
+        for m in range(n_subvectors):
+            columns = slice(m * sub_dim, (m + 1) * sub_dim)
+            codebooks[m] = _kmeans(sample[:, columns], n_centroids, n_iter, rng)
+            for start in range(0, n_rows, SCORE_BLOCK_ROWS):
+                block = vectors[start:start + SCORE_BLOCK_ROWS, columns]
+                distances = -2 * block @ codebooks[m].T + (codebooks[m] ** 2).sum(1)[None, :]
+                codes[start:start + len(block), m] = np.argmin(distances, axis=1)
+        return cls(codebooks, codes)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        n_subvectors, _, sub_dim = self.codebooks.shape
+        table = np.einsum("mkd,md->mk", self.codebooks, query.reshape(n_subvectors, sub_dim))
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        subspaces = np.arange(n_subvectors)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = np.asarray(self.codes[start:start + SCORE_BLOCK_ROWS])
+            scores[start:start + len(block)] = table[subspaces, block].sum(axis=1)
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.codebooks.nbytes)
+
+    def save(self, prefix: str) -> None:
+        _save_npy(f"{prefix}.pq_codebooks.npy", self.codebooks)
+        _save_npy(f"{prefix}.pq_codes.npy", self.codes)
+
+    @classmethod
+    def load(cls, prefix: str) -> "ProductQuantizer":
+        return cls(np.load(f"{prefix}.pq_codebooks.npy"), np.load(f"{prefix}.pq_codes.npy", mmap_mode="r"))
+
+    @staticmethod
+    def files(prefix: str):
+        return [f"{prefix}.pq_codebooks.npy", f"{prefix}.pq_codes.npy"]
+
+
+QUANTIZERS = {"int8": ScalarQuantizer, "pq": ProductQuantizer}
+
+
+def build_quantizer(kind: str, vectors: np.ndarray, **params):
+    """Train and encode vectors with the given quantizer ('int8' or 'pq')."""
+    if kind not in QUANTIZERS:
+        raise ValueError(f"Unknown quantization kind: {kind}")
+    return QUANTIZERS[kind].build(vectors, **params)
+
+
+def load_quantizer(kind: str, prefix: str) -> Optional[object]:
+    """Load persisted codes, or None if this segment was written without them."""
+    if kind not in QUANTIZERS or not all(os.path.exists(path) for path in QUANTIZERS[kind].files(prefix)):
+        return None
+    return QUANTIZERS[kind].load(prefix)
+
+
+def remove_quantizer_files(prefix: str) -> None:
+    for quantizer in QUANTIZERS.values():
+        for path in quantizer.files(prefix):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
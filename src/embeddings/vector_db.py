@@ -27,20 +27,123 @@ Technology Stack:
 """
 
 import os
-import chromadb
-from chromadb.config import Settings
+import re
+import json
+from chunk_store import ChunkStore, ChunkStoreWriter, embedding_matrix
+from index_versions import VersionedClient, is_versioned_root
 
-def initialize_vector_db(db_path=r"C:\Users\ursti\Downloads\Code Explainer\src\embeddings\vector_db"):
+# Single collection that streaming ingestion writes every chunk into
+DEFAULT_COLLECTION = "kraken_knowledge"
+
+# Chunk IDs are "<source>_chunk_<idx>"; legacy per-file collections added "_id_<row>"
+CHUNK_FILE_PATTERN = re.compile(r"^(?P<source>.+)_chunk_(?P<idx>\d+)$")
+LEGACY_ID_PATTERN = re.compile(r"^(?P<chunk_id>.+)_id_(?P<row>\d+)$")
+
+# Metadata used for Chroma `where` filtering in the consolidated collection
+LANGUAGE_EXTENSIONS = {
+    ".py": "python", ".js": "javascript", ".ts": "javascript", ".java": "java",
+    ".cpp": "cpp", ".cc": "cpp", ".c": "cpp", ".h": "cpp", ".hpp": "cpp",
+    ".go": "go", ".rs": "rust", ".sql": "sql",
+}
+LANGUAGE_MARKERS = {
+    "python": ["def ", "import ", "self.", "elif ", "print("],
+    "javascript": ["function ", "const ", "let ", "=> ", "console.log"],
+    "java": ["public class", "public static void", "System.out", "private "],
+    "cpp": ["#include", "std::", "cout <<", "vector<", "nullptr"],
+    "go": ["func ", "package main", ":= ", "fmt."],
+    "rust": ["fn ", "let mut", "impl ", "println!"],
+    "sql": ["SELECT ", "INSERT INTO", "CREATE TABLE", "WHERE "],
+}
+TOPIC_KEYWORDS = {
+    "sorting": ["sort", "quicksort", "mergesort", "heapsort"],
+    "searching": ["binary search", "search", "find"],
+    "trees": ["tree", "bst", "node.left", "inorder", "preorder"],
+    "graphs": ["graph", "bfs", "dfs", "dijkstra", "adjacency"],
+    "dynamic_programming": ["dynamic programming", "memo", "dp[", "knapsack"],
+    "linked_lists": ["linked list", "node.next", "head"],
+    "strings": ["string", "substring", "palindrome", "anagram"],
+    "arrays": ["array", "subarray", "two pointer", "sliding window"],
+    "hashing": ["hash", "dictionary", "hashmap"],
+    "stacks_queues": ["stack", "queue", "deque"],
+    "recursion": ["recursion", "recursive", "backtrack"],
+}
+
+def infer_language(source, text=""):
+    """
+    Guess the programming language of a chunk from its source name, then its content.
+    Args:
+        source (str): Source file name or path.
+        text (str): Chunk text.
+    Returns:
+        str: Language key (e.g. 'python') or 'text' if nothing matches.
+    """
+    extension = os.path.splitext(source or "")[1].lower()
+    if extension in LANGUAGE_EXTENSIONS:
+        return LANGUAGE_EXTENSIONS[extension]
+    scores = {lang: sum(text.count(marker) for marker in markers) for lang, markers in LANGUAGE_MARKERS.items()}
+    best = max(scores, key=scores.get) if text else None
+    return best if best and scores[best] > 0 else "text"
+
+def infer_topic(text):
+    """
+    Guess the DSA/programming topic of a chunk by keyword counts.
+    Args:
+        text (str): Chunk text.
+    Returns:
+        str: Topic key (e.g. 'sorting') or 'general'.
+    """
+    text_lower = (text or "").lower()
+    scores = {topic: sum(text_lower.count(keyword) for keyword in keywords) for topic, keywords in TOPIC_KEYWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "general"
+
+def create_client(db_path, backend=None):
+    """
+    Open the configured vector store backend at db_path. If db_path is a versioned root (see
+    index_versions), the returned client follows its live version and switches on promotion.
+    Args:
+        db_path (str): Directory holding the database, or a versioned root.
+        backend (str, optional): 'chroma', 'numpy', or 'ivf'/'hnsw' for the numpy index with an
+            approximate nearest-neighbour index (default: VECTOR_DB_BACKEND env var, else 'chroma').
+    Returns:
+        Client exposing the Chroma collection API (get_or_create_collection, list_collections, ...).
+    """
+    if is_versioned_root(db_path):
+        return VersionedClient(db_path, backend)
+    backend = (backend or os.getenv("VECTOR_DB_BACKEND", "chroma")).lower()
+    if backend in ("numpy", "ivf", "hnsw"):
+        from vector_index import NumpyVectorClient
+        quantization = os.getenv("VECTOR_INDEX_QUANTIZATION", "none").lower()
+        return NumpyVectorClient(
+            db_path,
+            dtype=os.getenv("VECTOR_INDEX_DTYPE", "float32"),
+            ann=None if backend == "numpy" else backend,
+            search_params={
+                "nprobe": int(os.getenv("VECTOR_INDEX_NPROBE", "8")),
+                "ef_search": int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64")),
+            },
+            quantization=None if quantization == "none" else quantization,
+            rerank_factor=int(os.getenv("VECTOR_INDEX_RERANK_FACTOR", "4")),
+        )
+    if backend != "chroma":
+        raise ValueError(f"Unknown vector DB backend: {backend}")
+    # Imported here so the numpy backends run without chromadb installed
+    import chromadb
+    from chromadb.config import Settings
+    return chromadb.Client(Settings(persist_directory=db_path, is_persistent=True))
+
+def initialize_vector_db(db_path=r"C:\Users\ursti\Downloads\Code Explainer\src\embeddings\vector_db", backend=None):
     """
     Initialize or connect to a Chroma vector database.
     Args:
         db_path (str): Directory to store the database (default: absolute path).
+        backend (str, optional): Vector store backend, see create_client.
     Returns:
-        chromadb.Client: Chroma database client.
+        chromadb.Client: Chroma database client (or NumpyVectorClient for the numpy backend).
     """
     try:
         os.makedirs(db_path, exist_ok=True)  # Ensure directory exists
-        client = chromadb.Client(Settings(persist_directory=db_path, is_persistent=True))
+        client = create_client(db_path, backend)
         print(f"Database initialized at: {db_path}")  # Debug print to confirm path
         with open(os.path.join(db_path, "test_write.txt"), "w") as f:
             f.write("Test write successful")
@@ -49,7 +152,7 @@ def initialize_vector_db(db_path=r"C:\Users\ursti\Downloads\Code Explainer\src\e
         print(f"Error initializing vector database: {str(e)}")
         return None
 
-def store_embeddings(client, collection_name, embeddings, metadatas=None, ids=None):
+def store_embeddings(client, collection_name, embeddings, metadatas=None, ids=None, documents=None, upsert=False):
     """
     Store embeddings in a Chroma collection.
     Args:
@@ -58,6 +161,10 @@ def store_embeddings(client, collection_name, embeddings, metadatas=None, ids=No
         embeddings (list): List of embedding vectors.
         metadatas (list, optional): Metadata for each embedding.
         ids (list, optional): Unique IDs for each embedding.
+        documents (list, optional): Source text for each embedding.
+        upsert (bool): Overwrite existing IDs instead of failing on them (default: False).
+    Returns:
+        int: Number of embeddings written (0 on failure).
     """
     try:
         if client is None:
@@ -69,10 +176,154 @@ def store_embeddings(client, collection_name, embeddings, metadatas=None, ids=No
             ids = [f"{collection_name}_id_{i}" for i in range(len(embeddings))]
         if not metadatas:
             metadatas = [{} for _ in range(len(embeddings))]  # Default to empty dicts
-        collection.add(embeddings=embeddings, metadatas=metadatas, ids=ids)
+        write = collection.upsert if upsert else collection.add
+        if documents is not None:
+            write(embeddings=embeddings, metadatas=metadatas, ids=ids, documents=documents)
+        else:
+            write(embeddings=embeddings, metadatas=metadatas, ids=ids)
         print(f"Stored {len(embeddings)} embeddings in {collection_name}")
+        return len(embeddings)
     except Exception as e:
         print(f"Error storing embeddings: {str(e)}")
+        return 0
+
+def delete_embeddings(client, collection_name, ids, batch_size=1000):
+    """
+    Delete embeddings by ID from a Chroma collection.
+    Args:
+        client (chromadb.Client): Chroma database client.
+        collection_name (str): Name of the collection.
+        ids (list): IDs to delete.
+        batch_size (int): IDs per delete call.
+    Returns:
+        int: Number of IDs submitted for deletion.
+    """
+    try:
+        if not client:
+            raise ValueError("Database client is not initialized.")
+        collection = client.get_or_create_collection(name=collection_name)
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            collection.delete(ids=ids[start:start + batch_size])
+        if ids:
+            print(f"Deleted {len(ids)} embeddings from {collection_name}")
+        return len(ids)
+    except Exception as e:
+        print(f"Error deleting embeddings: {str(e)}")
+        return 0
+
+def merge_metadata(client, collection_name, updates, batch_size=500):
+    """
+    Merge extra keys into the metadata of existing rows, leaving their vectors untouched.
+    Args:
+        client (chromadb.Client): Chroma database client.
+        collection_name (str): Name of the collection.
+        updates (dict): Row ID -> metadata keys to set.
+        batch_size (int): Rows per get/update call.
+    Returns:
+        int: Number of rows updated.
+    """
+    try:
+        if not client:
+            raise ValueError("Database client is not initialized.")
+        collection = client.get_or_create_collection(name=collection_name)
+        ids = list(updates)
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            page = collection.get(ids=ids[start:start + batch_size], include=["metadatas"])
+            found = page.get("ids") or []
+            if not found:
+                continue
+            metadatas = [{**(metadata or {}), **updates[row_id]} for row_id, metadata in zip(found, page["metadatas"])]
+            collection.update(ids=found, metadatas=metadatas)
+            updated += len(found)
+        return updated
+    except Exception as e:
+        print(f"Error updating metadata in {collection_name}: {str(e)}")
+        return 0
+
+def finalize_collection(client, collection_name):
+    """
+    Run post-ingestion maintenance on a collection (numpy backend: compaction, and appending new
+    rows to the ANN index, which is only retrained once enough changed). Chroma maintains its own
+    index, so this is a no-op there.
+    Args:
+        client: Vector database client.
+        collection_name (str): Name of the collection.
+    Returns:
+        bool: True if the collection was finalized.
+    """
+    try:
+        collection = client.get_or_create_collection(name=collection_name)
+        if not hasattr(collection, "finalize"):
+            return False
+        collection.finalize()
+        print(f"Finalized index for {collection_name}")
+        return True
+    except Exception as e:
+        print(f"Error finalizing collection {collection_name}: {str(e)}")
+        return False
+
+def export_collection(client, collection_name, store_path, batch_size=1000, model_name=None):
+    """
+    Write every row of a collection (ID, document, metadata, embedding) to a chunk store file.
+    Args:
+        client (chromadb.Client): Chroma database client.
+        collection_name (str): Name of the collection.
+        store_path (str): Target .parquet or .arrow file (see chunk_store).
+        batch_size (int): Rows read per call.
+        model_name (str, optional): Embedding model recorded in the store's schema.
+    Returns:
+        int: Number of rows exported (0 on failure).
+    """
+    try:
+        if not client:
+            raise ValueError("Database client is not initialized.")
+        collection = client.get_collection(name=collection_name)
+        with ChunkStoreWriter(store_path, model_name=model_name) as writer:
+            offset = 0
+            while True:
+                page = collection.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+                documents = [doc or "" for doc in (page.get("documents") or [None] * len(ids))]
+                writer.write(ids, documents, page.get("metadatas") or [{}] * len(ids), page["embeddings"])
+                offset += len(ids)
+        print(f"Exported {writer.rows} rows from {collection_name} to {store_path}")
+        return writer.rows
+    except Exception as e:
+        print(f"Error exporting collection {collection_name}: {str(e)}")
+        return 0
+
+def import_chunk_store(client, collection_name, store_path, batch_size=1000):
+    """
+    Load a chunk store's stored embeddings into a collection (e.g. to rebuild an index) without
+    re-reading source files or re-encoding anything.
+    Args:
+        client (chromadb.Client): Chroma database client.
+        collection_name (str): Target collection.
+        store_path (str): Chunk store file written by export_collection or the ingestion pipeline.
+        batch_size (int): Rows per upsert.
+    Returns:
+        int: Number of rows imported (0 on failure).
+    """
+    try:
+        if not client:
+            raise ValueError("Database client is not initialized.")
+        store = ChunkStore(store_path)
+        imported = 0
+        for batch in store.iter_batches(batch_size, columns=["id", "text", "metadata", "embedding"]):
+            embeddings = embedding_matrix(batch.column(3), store.dim)
+            metadatas = [json.loads(metadata) if metadata else {} for metadata in batch.column(2).to_pylist()]
+            imported += store_embeddings(client, collection_name, embeddings, metadatas=metadatas,
+                                         ids=batch.column(0).to_pylist(), documents=batch.column(1).to_pylist(),
+                                         upsert=True)
+        finalize_collection(client, collection_name)
+        return imported
+    except Exception as e:
+        print(f"Error importing chunk store {store_path}: {str(e)}")
+        return 0
 
 def query_vector_db(client, collection_name, query_embedding, n_results=5):
     """
@@ -95,5 +346,101 @@ def query_vector_db(client, collection_name, query_embedding, n_results=5):
         print(f"Error querying vector database: {str(e)}")
         return None
 
+def _read_legacy_document(chunk_dir, source):
+    """Text of a legacy per-file collection: the whole chunk file it was embedded from, or None."""
+    if not chunk_dir:
+        return None
+    path = os.path.join(chunk_dir, f"{source}.txt")
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+def _streaming_chunk_id(legacy_id):
+    """Chunk ID streaming ingestion would write for a legacy row: "<chunk file>_id_0" -> "<chunk file>"."""
+    match = LEGACY_ID_PATTERN.match(legacy_id)
+    # A legacy collection holds one chunk file, embedded as a single row; any extra rows keep their ID
+    return match.group("chunk_id") if match and match.group("row") == "0" else legacy_id
+
+def migrate_to_consolidated(client, target_collection=DEFAULT_COLLECTION, batch_size=500, delete_source=False,
+                            chunk_dir=None):
+    """
+    Fold legacy per-file collections into the consolidated collection, adding
+    source/language/topic metadata so retrieval can narrow with `where` filters.
+    Legacy collections were stored without documents, so their text is read back from the chunk
+    file each one was embedded from (<chunk_dir>/<source>.txt). Rows whose text cannot be found
+    are not copied (retrieval skips empty documents) and their collection is kept for re-ingestion.
+    Rows are rewritten to the streaming ingestion format (ID "<source>_chunk_<idx>" with
+    source/chunk_file/chunk_idx metadata) so a later re-ingest updates them instead of duplicating them.
+    Args:
+        client (chromadb.Client): Chroma database client.
+        target_collection (str): Consolidated collection name (default: DEFAULT_COLLECTION).
+        batch_size (int): Rows read and upserted per call.
+        delete_source (bool): Drop each legacy collection once all of its rows have been copied.
+        chunk_dir (str, optional): Directory of the chunk files the legacy collections came from.
+    Returns:
+        dict: Migration statistics (collections, rows, rows skipped without a document, failed collections).
+    """
+    stats = {"collections": 0, "rows": 0, "missing_documents": 0, "failed": []}
+    try:
+        if not client:
+            raise ValueError("Database client is not initialized.")
+        target = client.get_or_create_collection(name=target_collection)
+        for collection_info in client.list_collections():
+            name = getattr(collection_info, "name", collection_info)
+            if name == target_collection:
+                continue
+            try:
+                source = client.get_collection(name=name)
+                legacy_documents = {}  # source -> chunk file text
+                missing = 0
+                offset = 0
+                while True:
+                    page = source.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+                    ids = page.get("ids") or []
+                    if not ids:
+                        break
+                    offset += len(ids)
+                    rows = []
+                    page_metadatas = page.get("metadatas") or [None] * len(ids)
+                    for i, document in enumerate(page.get("documents") or [None] * len(ids)):
+                        metadata = dict(page_metadatas[i] or {})
+                        metadata.setdefault("source", name)
+                        if not document:
+                            if metadata["source"] not in legacy_documents:
+                                legacy_documents[metadata["source"]] = _read_legacy_document(chunk_dir, metadata["source"])
+                            document = legacy_documents[metadata["source"]]
+                        if not document:
+                            missing += 1
+                            continue
+                        chunk_id = _streaming_chunk_id(ids[i])
+                        match = CHUNK_FILE_PATTERN.match(metadata["source"])
+                        if match:
+                            metadata.update(source=match.group("source"), chunk_file=metadata["source"],
+                                            chunk_idx=int(match.group("idx")))
+                        metadata.setdefault("language", infer_language(metadata["source"], document))
+                        metadata.setdefault("topic", infer_topic(document))
+                        metadata["migrated_from"] = name
+                        rows.append((chunk_id, page["embeddings"][i], document, metadata))
+                    if rows:
+                        target.upsert(ids=[row[0] for row in rows], embeddings=[row[1] for row in rows],
+                                      documents=[row[2] for row in rows], metadatas=[row[3] for row in rows])
+                        stats["rows"] += len(rows)
+                stats["collections"] += 1
+                if missing:
+                    stats["missing_documents"] += missing
+                    print(f"Skipped {missing} rows of {name} with no document text; re-ingest it from its source file")
+                elif delete_source:
+                    client.delete_collection(name=name)
+            except Exception as e:
+                print(f"Error migrating collection {name}: {str(e)}")
+                stats["failed"].append(name)
+        print(f"Migrated {stats['rows']} rows from {stats['collections']} collections into {target_collection}")
+    except Exception as e:
+        print(f"Error migrating to consolidated collection: {str(e)}")
+    return stats
+
 if __name__ == "__main__":
-    pass
+    # One-off migration of per-file collections into the consolidated collection
+    migrate_to_consolidated(initialize_vector_db(),
+                            chunk_dir=r"C:\Users\ursti\Downloads\Code Explainer\src\data_processing\chunked_data")
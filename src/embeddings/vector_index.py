@@ -0,0 +1,712 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: In-process NumPy vector index on memory-mapped .npy files (Chroma alternative)
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ann_index import build_ann, load_ann, remove_ann_files
+from quantization import build_quantizer, load_quantizer, remove_quantizer_files
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = "index.json"
+SUPPORTED_DTYPES = ("float32", "float16")
+SCORE_BLOCK_ROWS = 65536  # Rows scored per matmul, bounds the float32 temp for float16 segments
+QUANTIZE_MIN_ROWS = 1024  # Smaller segments are cheap to scan exactly and too small to train codes on
+ANN_REBUILD_FRACTION = 0.2  # finalize() retrains the ANN index once this share of rows changed since training
+MERGE_SIZE_RATIO = 4  # A segment joins a merge only if it is at most this many times the largest one in it
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def _write_npy_atomic(path: str, array: np.ndarray) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, array)
+    os.replace(tmp_path, path)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so a dot product is the cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style `where` filter ($eq/$ne/$gt/$gte/$lt/$lte/$in/$nin/$and/$or) on metadata."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if operator == "$eq" and value != operand:
+                    return False
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$nin" and value in operand:
+                    return False
+                if operator in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is None:
+                        return False
+                    if operator == "$gt" and not value > operand:
+                        return False
+                    if operator == "$gte" and not value >= operand:
+                        return False
+                    if operator == "$lt" and not value < operand:
+                        return False
+                    if operator == "$lte" and not value <= operand:
+                        return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class VectorIndex:
+    """
+    One collection stored as normalized vectors in append-only, memory-mapped .npy segments.
+
+    Search is one matrix-vector product per segment plus argpartition. Segments are opened
+    read-only with mmap, so worker processes on the same host share one copy through the
+    page cache. A single process should write a given index at a time; readers pick up new
+    segments when index.json changes.
+
+    Every write appends a segment. Past max_segments, the newest segments are merged by size
+    tier: an older segment only joins the merge if it is at most MERGE_SIZE_RATIO times the
+    size of the largest segment already in the merge. Segments of a similar size merge
+    together, so large segments (and their codes) are rarely rewritten.
+
+    With ann='ivf' or 'hnsw', finalize() compacts the index and builds an approximate
+    nearest-neighbour index over the merged segment; rows written afterwards are still
+    searched exactly until the next finalize(), which appends them to that index (IVF
+    lists of the trained centroids, or the HNSW graph). The index is only trained from
+    scratch again once more than ANN_REBUILD_FRACTION of its rows were added or deleted.
+
+    With quantization='int8' or 'pq', each segment also stores compressed codes. Exact
+    (non-ANN) search scores the codes, then re-ranks the best k * rerank_factor rows
+    against the full-precision vectors, which stay on disk and are only paged in for
+    those rows.
+    """
+
+    def __init__(self, path: str, name: str, dtype: str = "float32", max_segments: int = 8,
+                 ann: Optional[str] = None, ann_params: Optional[Dict[str, Any]] = None,
+                 search_params: Optional[Dict[str, Any]] = None, quantization: Optional[str] = None,
+                 quantization_params: Optional[Dict[str, Any]] = None, rerank_factor: int = 4):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype}, expected one of {SUPPORTED_DTYPES}")
+        self.path = path
+        self.name = name
+        self.dtype = dtype
+        self.max_segments = max_segments
+        self.ann = ann
+        self.ann_params = ann_params or {}
+        self.search_params = search_params or {}
+        self.quantization = quantization
+        self._requested_quantization = quantization  # None: follow whatever the index was built with
+        self.quantization_params = quantization_params or {}
+        self.rerank_factor = max(1, rerank_factor)
+        self.dim: Optional[int] = None
+        self._ann_state: Optional[Dict[str, Any]] = None
+        self._segments: List[Dict[str, Any]] = []
+        self._locations: Dict[str, tuple] = {}
+        self._state_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------ state
+
+    @property
+    def _state_path(self) -> str:
+        return os.path.join(self.path, STATE_FILENAME)
+
+    def _load(self) -> None:
+        """(Re)load segment list, mmaps and id locations from index.json."""
+        with self._lock:
+            self._segments = []
+            self._locations = {}
+            if not os.path.exists(self._state_path):
+                self._state_mtime = None
+                return
+            with open(self._state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            self.dim = state.get("dim")
+            self.dtype = state.get("dtype", self.dtype)
+            self._ann_state = state.get("ann")
+            persisted = state.get("quantization")
+            if self._requested_quantization is None:
+                self.quantization = persisted
+            elif persisted != self._requested_quantization and self._state_mtime is None:
+                # Segments without matching codes are searched exactly until compaction re-encodes them
+                logger.warning(f"Index {self.name} was built with quantization={persisted}, "
+                               f"using {self._requested_quantization} for new and compacted segments")
+            deleted = state.get("deleted", {})
+            for segment_name in state.get("segments", []):
+                vectors = np.load(os.path.join(self.path, f"{segment_name}.npy"), mmap_mode="r")
+                with open(os.path.join(self.path, f"{segment_name}.json"), "r", encoding="utf-8") as file:
+                    rows = json.load(file)
+                live = np.ones(len(rows["ids"]), dtype=bool)
+                live[deleted.get(segment_name, [])] = False
+                self._segments.append({
+                    "name": segment_name,
+                    "vectors": vectors,
+                    "ids": rows["ids"],
+                    "metadatas": rows["metadatas"],
+                    "documents": rows["documents"],
+                    "live": live,
+                    "ann": self._load_ann(segment_name),
+                    "codes": load_quantizer(self.quantization, os.path.join(self.path, segment_name))
+                    if self.quantization else None,
+                })
+            self._rebuild_locations()
+            self._state_mtime = os.stat(self._state_path).st_mtime_ns
+
+    def _load_ann(self, segment_name: str):
+        if not self._ann_state or self._ann_state.get("segment") != segment_name:
+            return None
+        try:
+            return load_ann(self._ann_state["kind"], os.path.join(self.path, segment_name), self.dim, self.search_params)
+        except Exception as e:
+            logger.warning(f"Could not load {self._ann_state['kind']} index for {self.name}, using exact search: {e}")
+            return None
+
+    def _rebuild_locations(self) -> None:
+        self._locations = {}
+        for seg_idx, segment in enumerate(self._segments):
+            for row in np.flatnonzero(segment["live"]):
+                self._locations[segment["ids"][row]] = (seg_idx, int(row))
+
+    def _maybe_reload(self) -> None:
+        """Pick up segments written by another process."""
+        try:
+            mtime = os.stat(self._state_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._state_mtime:
+            self._load()
+
+    def _save_state(self) -> None:
+        state = {
+            "name": self.name,
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "segments": [segment["name"] for segment in self._segments],
+            "deleted": {
+                segment["name"]: np.flatnonzero(~segment["live"]).tolist()
+                for segment in self._segments if not segment["live"].all()
+            },
+            "ann": self._ann_state,
+            "quantization": self.quantization,
+        }
+        _write_json_atomic(self._state_path, state)
+        self._state_mtime = os.stat(self._state_path).st_mtime_ns
+
+    def _write_segment(self, vectors: np.ndarray, ids: List[str], metadatas: List[Dict],
+                       documents: List[Optional[str]]) -> Dict[str, Any]:
+        segment_name = f"seg_{uuid.uuid4().hex[:12]}"
+        _write_npy_atomic(os.path.join(self.path, f"{segment_name}.npy"), vectors.astype(self.dtype))
+        codes = None
+        if self.quantization and len(ids) >= QUANTIZE_MIN_ROWS:
+            codes = build_quantizer(self.quantization, vectors, **self.quantization_params)
+            codes.save(os.path.join(self.path, segment_name))
+            codes = load_quantizer(self.quantization, os.path.join(self.path, segment_name))
+        _write_json_atomic(os.path.join(self.path, f"{segment_name}.json"),
+                           {"ids": ids, "metadatas": metadatas, "documents": documents})
+        return {
+            "name": segment_name,
+            "vectors": np.load(os.path.join(self.path, f"{segment_name}.npy"), mmap_mode="r"),
+            "ids": ids,
+            "metadatas": metadatas,
+            "documents": documents,
+            "live": np.ones(len(ids), dtype=bool),
+            "ann": None,
+            "codes": codes,
+        }
+
+    def _remove_segment_files(self, segment_names: List[str]) -> None:
+        for segment_name in segment_names:
+            for extension in (".npy", ".json"):
+                try:
+                    os.remove(os.path.join(self.path, f"{segment_name}{extension}"))
+                except OSError:
+                    # Windows refuses to delete a file another reader still has mapped
+                    logger.debug(f"Could not remove {segment_name}{extension}, leaving it for later")
+            remove_quantizer_files(os.path.join(self.path, segment_name))
+
+    # ------------------------------------------------------------------ writes
+
+    def _write(self, ids: List[str], embeddings, metadatas: Optional[List[Dict]],
+               documents: Optional[List[str]], replace: bool) -> None:
+        if not ids:
+            return
+        vectors = normalize_rows(embeddings)
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} embeddings for {len(ids)} ids")
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+        metadatas = list(metadatas) if metadatas else [{} for _ in ids]
+        documents = list(documents) if documents is not None else [None for _ in ids]
+
+        with self._lock:
+            self._maybe_reload()
+            keep = []
+            for i, item_id in enumerate(ids):
+                if item_id in self._locations:
+                    if not replace:
+                        logger.warning(f"Add of existing ID {item_id} ignored, use upsert to overwrite")
+                        continue
+                    seg_idx, row = self._locations[item_id]
+                    self._segments[seg_idx]["live"][row] = False
+                keep.append(i)
+            if keep:
+                segment = self._write_segment(vectors[keep], [ids[i] for i in keep],
+                                              [metadatas[i] for i in keep], [documents[i] for i in keep])
+                self._segments.append(segment)
+                for row, i in enumerate(keep):
+                    self._locations[ids[i]] = (len(self._segments) - 1, row)
+            self._save_state()
+            if len(self._segments) > self.max_segments:
+                self._merge_tail()
+
+    def add(self, ids: List[str], embeddings=None, metadatas: Optional[List[Dict]] = None,
+            documents: Optional[List[str]] = None, **kwargs) -> None:
+        """Add new rows; IDs that already exist are ignored (as in Chroma)."""
+        if embeddings is None:
+            raise ValueError("VectorIndex requires precomputed embeddings")
+        self._write(list(ids), embeddings, metadatas, documents, replace=False)
+
+    def upsert(self, ids: List[str], embeddings=None, metadatas: Optional[List[Dict]] = None,
+               documents: Optional[List[str]] = None, **kwargs) -> None:
+        """Add rows, replacing any existing rows with the same IDs."""
+        if embeddings is None:
+            raise ValueError("VectorIndex requires precomputed embeddings")
+        self._write(list(ids), embeddings, metadatas, documents, replace=True)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """Delete rows by ID and/or metadata filter (tombstoned until the next compaction)."""
+        with self._lock:
+            self._maybe_reload()
+            targets = set(ids or [])
+            if where:
+                targets.update(item_id for item_id, (seg_idx, row) in self._locations.items()
+                               if matches_where(self._segments[seg_idx]["metadatas"][row], where))
+            for item_id in targets:
+                location = self._locations.pop(item_id, None)
+                if location:
+                    self._segments[location[0]]["live"][location[1]] = False
+            self._save_state()
+
+    def update(self, ids: List[str], metadatas: Optional[List[Dict]] = None,
+               documents: Optional[List[str]] = None, **kwargs) -> None:
+        """Replace metadata and/or documents of existing rows without touching their vectors."""
+        with self._lock:
+            self._maybe_reload()
+            touched = set()
+            for i, item_id in enumerate(ids):
+                location = self._locations.get(item_id)
+                if not location:
+                    continue
+                segment = self._segments[location[0]]
+                if metadatas is not None:
+                    segment["metadatas"][location[1]] = metadatas[i]
+                if documents is not None:
+                    segment["documents"][location[1]] = documents[i]
+                touched.add(location[0])
+            for seg_idx in touched:
+                segment = self._segments[seg_idx]
+                _write_json_atomic(os.path.join(self.path, f"{segment['name']}.json"),
+                                   {"ids": segment["ids"], "metadatas": segment["metadatas"],
+                                    "documents": segment["documents"]})
+            if touched:
+                self._save_state()
+
+    def _merge_segments(self, start: int) -> None:
+        """Rewrite segments[start:] as one segment without their tombstoned rows."""
+        merged = self._segments[start:]
+        vectors, ids, metadatas, documents = [], [], [], []
+        for segment in merged:
+            rows = np.flatnonzero(segment["live"])
+            if len(rows) == 0:
+                continue
+            vectors.append(np.asarray(segment["vectors"][rows]))
+            ids.extend(segment["ids"][row] for row in rows)
+            metadatas.extend(segment["metadatas"][row] for row in rows)
+            documents.extend(segment["documents"][row] for row in rows)
+        self._segments = self._segments[:start]
+        if ids:
+            self._segments.append(self._write_segment(np.concatenate(vectors), ids, metadatas, documents))
+        self._rebuild_locations()
+        self._save_state()
+        self._remove_segment_files([segment["name"] for segment in merged])
+
+    def _merge_tail(self) -> None:
+        """Size-tiered merge of the newest segments, leaving large older ones (and an ANN segment) alone."""
+        first = 0
+        for seg_idx, segment in enumerate(self._segments):
+            if segment.get("ann") is not None:
+                first = seg_idx + 1
+        start = len(self._segments) - 1
+        merged_rows = largest = int(self._segments[start]["live"].sum())
+        while start > first:
+            previous_rows = int(self._segments[start - 1]["live"].sum())
+            # Stop at a much larger segment, unless there would still be too many segments
+            if previous_rows > MERGE_SIZE_RATIO * max(largest, 1) and start + 1 <= self.max_segments:
+                break
+            start -= 1
+            merged_rows += previous_rows
+            largest = max(largest, previous_rows)
+        if start < len(self._segments) - 1:
+            logger.debug(f"Merging {len(self._segments) - start} segments ({merged_rows} rows) of {self.name}")
+            self._merge_segments(start)
+
+    def compact(self) -> None:
+        """Merge all live rows into one segment and drop tombstoned rows."""
+        with self._lock:
+            if not self._segments:
+                return
+            old_ann, self._ann_state = self._ann_state, None
+            self._merge_segments(0)
+            if old_ann:
+                remove_ann_files(old_ann["kind"], os.path.join(self.path, old_ann["segment"]))
+
+    def build_ann(self, kind: Optional[str] = None, **build_params) -> None:
+        """Compact, then build and persist an ANN index ('ivf' or 'hnsw') over the merged segment."""
+        kind = kind or self.ann or "ivf"
+        params = {**self.ann_params, **build_params}
+        with self._lock:
+            self._maybe_reload()
+            self.compact()
+            if not self._segments:
+                return
+            segment = self._segments[0]
+            prefix = os.path.join(self.path, segment["name"])
+            index = build_ann(kind, segment["vectors"], **params)
+            index.save(prefix)
+            index.set_search_params(**self.search_params)
+            segment["ann"] = index
+            self._ann_state = {"kind": kind, "segment": segment["name"], "params": params,
+                               "trained_rows": len(segment["ids"]), "changed_rows": 0}
+            self._save_state()
+            logger.info(f"Built {kind} index over {len(segment['ids'])} rows of {self.name}")
+
+    def _ann_segment(self) -> Optional[int]:
+        for seg_idx, segment in enumerate(self._segments):
+            if segment.get("ann") is not None:
+                return seg_idx
+        return None
+
+    def _extend_ann(self, ann_idx: int) -> bool:
+        """
+        Fold rows written since the last build into the ANN segment and append them to its index.
+        Returns False (caller rebuilds) once too much changed since the index was trained.
+        """
+        base = self._segments[ann_idx]
+        others = [segment for seg_idx, segment in enumerate(self._segments) if seg_idx != ann_idx]
+        new_rows = sum(int(segment["live"].sum()) for segment in others)
+        deleted_rows = int((~base["live"]).sum())
+        trained_rows = self._ann_state.get("trained_rows") or len(base["ids"])
+        changed_rows = self._ann_state.get("changed_rows", 0) + new_rows
+        if changed_rows + deleted_rows > ANN_REBUILD_FRACTION * trained_rows:
+            return False
+        if not new_rows:
+            return True  # Deletes only: tombstones are masked at query time
+
+        vectors, ids = [np.asarray(base["vectors"])], list(base["ids"])
+        metadatas, documents = list(base["metadatas"]), list(base["documents"])
+        for segment in others:
+            rows = np.flatnonzero(segment["live"])
+            vectors.append(np.asarray(segment["vectors"][rows]))
+            ids.extend(segment["ids"][row] for row in rows)
+            metadatas.extend(segment["metadatas"][row] for row in rows)
+            documents.extend(segment["documents"][row] for row in rows)
+        start = len(base["ids"])
+        segment = self._write_segment(np.concatenate(vectors), ids, metadatas, documents)
+        segment["live"][:start] = base["live"]  # Deleted base rows stay tombstoned
+        kind = self._ann_state["kind"]
+        # A fresh handle: queries may still be using base["ann"]
+        index = load_ann(kind, os.path.join(self.path, base["name"]), self.dim, self.search_params)
+        index = index.add(segment["vectors"], start)
+        index.save(os.path.join(self.path, segment["name"]))
+        index.set_search_params(**self.search_params)
+        segment["ann"] = index
+
+        old_names = [old["name"] for old in self._segments]
+        self._segments = [segment]
+        self._ann_state = {**self._ann_state, "segment": segment["name"], "trained_rows": trained_rows,
+                           "changed_rows": changed_rows}
+        self._rebuild_locations()
+        self._save_state()
+        self._remove_segment_files(old_names)
+        remove_ann_files(kind, os.path.join(self.path, base["name"]))
+        logger.info(f"Appended {new_rows} rows to the {kind} index of {self.name}")
+        return True
+
+    def finalize(self) -> None:
+        """
+        Called after a bulk load: append new rows to the configured ANN index, or (re)build it
+        if there is none or too much changed since it was trained; without ANN just compact.
+        """
+        if self.ann:
+            with self._lock:
+                self._maybe_reload()
+                ann_idx = self._ann_segment()
+                if (ann_idx is not None and self._ann_state.get("kind") == self.ann
+                        and self._extend_ann(ann_idx)):
+                    return
+            self.build_ann(self.ann)
+        elif len(self._segments) > 1:
+            self.compact()
+
+    def set_search_params(self, **search_params) -> None:
+        """Tune recall/latency at query time, e.g. nprobe for IVF or ef_search for HNSW."""
+        self.search_params.update(search_params)
+        for segment in self._segments:
+            if segment.get("ann") is not None:
+                segment["ann"].set_search_params(**search_params)
+
+    # ------------------------------------------------------------------ reads
+
+    def count(self) -> int:
+        with self._lock:
+            self._maybe_reload()
+            return len(self._locations)
+
+    def _segment_scores(self, vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if vectors.dtype == np.float32:
+            return np.asarray(vectors @ query)
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def _segment_mask(self, segment: Dict[str, Any], where: Optional[Dict[str, Any]]) -> np.ndarray:
+        # A copy: searches run outside the lock while deletes clear rows of the live array
+        mask = segment["live"].copy()
+        if not where:
+            return mask
+        for row in np.flatnonzero(mask):
+            if not matches_where(segment["metadatas"][row], where):
+                mask[row] = False
+        return mask
+
+    def _rerank_codes(self, segment: Dict[str, Any], seg_idx: int, query: np.ndarray, k: int,
+                      mask: np.ndarray, live_count: int) -> List[tuple]:
+        """Shortlist rows by their quantized scores, then rescore the shortlist at full precision."""
+        approximate = np.where(mask, segment["codes"].scores(query), -np.inf)
+        shortlist_size = min(k * self.rerank_factor, live_count)
+        shortlist = np.sort(np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size])
+        scores = np.asarray(segment["vectors"][shortlist], dtype=np.float32) @ query
+        top_k = min(k, len(shortlist))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        return [(float(scores[i]), seg_idx, int(shortlist[i])) for i in top]
+
+    def _search(self, query_embedding, k: int, where: Optional[Dict[str, Any]]) -> tuple:
+        """Hits plus the segment list they index into (a snapshot, so a concurrent merge cannot shift it)."""
+        query = normalize_rows(query_embedding)[0]
+        with self._lock:
+            self._maybe_reload()
+            segments = list(self._segments)
+        # Scanned without the lock: writers only append segments, swap the list or flip live flags
+        candidates = []
+        for seg_idx, segment in enumerate(segments):
+            mask = self._segment_mask(segment, where)
+            live_count = int(mask.sum())
+            if live_count == 0:
+                continue
+            if segment.get("ann") is not None:
+                ann_mask = None if live_count == len(mask) else mask
+                scores, rows = segment["ann"].search(segment["vectors"], query, k, mask=ann_mask)
+                candidates.extend((float(score), seg_idx, int(row)) for score, row in zip(scores, rows))
+                continue
+            if segment.get("codes") is not None:
+                candidates.extend(self._rerank_codes(segment, seg_idx, query, k, mask, live_count))
+                continue
+            scores = self._segment_scores(segment["vectors"], query)
+            scores = np.where(mask, scores, -np.inf)
+            top_k = min(k, live_count)
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates.extend((float(scores[row]), seg_idx, int(row)) for row in top)
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return candidates[:k], segments
+
+    def search(self, query_embedding, k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """Cosine search (ANN-backed where built, exact otherwise); returns [(score, segment index, row)] best first."""
+        return self._search(query_embedding, k, where)[0]
+
+    def _row(self, segment: Dict[str, Any], row: int, include: List[str]) -> Dict[str, Any]:
+        item = {"id": segment["ids"][row]}
+        if "documents" in include:
+            item["document"] = segment["documents"][row]
+        if "metadatas" in include:
+            item["metadata"] = segment["metadatas"][row]
+        if "embeddings" in include:
+            item["embedding"] = np.asarray(segment["vectors"][row], dtype=np.float32)
+        return item
+
+    def query(self, query_embeddings=None, query_texts=None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        """Chroma-compatible query: lists of lists per query, distances are cosine distances."""
+        if query_embeddings is None:
+            raise ValueError("VectorIndex requires query_embeddings; text queries need an embedding model")
+        include = include or ["documents", "metadatas", "distances"]
+        result = {"ids": []}
+        for key in ("documents", "metadatas", "distances", "embeddings"):
+            if key in include:
+                result[key] = []
+        for query_embedding in query_embeddings:
+            hits, segments = self._search(query_embedding, n_results, where)
+            rows = [self._row(segments[seg_idx], row, include) for _, seg_idx, row in hits]
+            result["ids"].append([item["id"] for item in rows])
+            if "documents" in include:
+                result["documents"].append([item["document"] for item in rows])
+            if "metadatas" in include:
+                result["metadatas"].append([item["metadata"] for item in rows])
+            if "distances" in include:
+                result["distances"].append([1.0 - score for score, _, _ in hits])
+            if "embeddings" in include:
+                result["embeddings"].append([item["embedding"] for item in rows])
+        return result
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: int = 0,
+            include: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        """Chroma-compatible get: flat lists of the selected rows."""
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            self._maybe_reload()
+            if ids is not None:
+                locations = [self._locations[item_id] for item_id in ids if item_id in self._locations]
+            else:
+                locations = [(seg_idx, int(row)) for seg_idx, segment in enumerate(self._segments)
+                             for row in np.flatnonzero(segment["live"])]
+            if where:
+                locations = [(seg_idx, row) for seg_idx, row in locations
+                             if matches_where(self._segments[seg_idx]["metadatas"][row], where)]
+            locations = locations[offset:offset + limit if limit is not None else None]
+            rows = [self._row(self._segments[seg_idx], row, include) for seg_idx, row in locations]
+        result = {"ids": [item["id"] for item in rows]}
+        if "documents" in include:
+            result["documents"] = [item["document"] for item in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [item["metadata"] for item in rows]
+        if "embeddings" in include:
+            result["embeddings"] = np.stack([item["embedding"] for item in rows]) if rows else np.empty((0, self.dim or 0), dtype=np.float32)
+        return result
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes of full-precision vectors and of quantized codes (mapped, not necessarily resident)."""
+        return {"vector_bytes": int(sum(segment["vectors"].nbytes for segment in self._segments)),
+                "code_bytes": int(sum(segment["codes"].nbytes for segment in self._segments
+                                      if segment.get("codes") is not None)),
+                "rows": self.count(), "segments": len(self._segments)}
+
+
+class NumpyVectorClient:
+    """Chroma-like client that keeps one VectorIndex directory per collection under path."""
+
+    def __init__(self, path: str, dtype: str = "float32", max_segments: int = 8, ann: Optional[str] = None,
+                 ann_params: Optional[Dict[str, Any]] = None, search_params: Optional[Dict[str, Any]] = None,
+                 quantization: Optional[str] = None, rerank_factor: int = 4):
+        self.path = path
+        self.dtype = dtype
+        self.max_segments = max_segments
+        self.ann = ann
+        self.ann_params = ann_params or {}
+        self.search_params = search_params or {}
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self._collections: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _collection_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self, name: str) -> VectorIndex:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = VectorIndex(self._collection_path(name), name,
+                                                      dtype=self.dtype, max_segments=self.max_segments,
+                                                      ann=self.ann, ann_params=dict(self.ann_params),
+                                                      search_params=dict(self.search_params),
+                                                      quantization=self.quantization,
+                                                      rerank_factor=self.rerank_factor)
+            return self._collections[name]
+
+    def get_or_create_collection(self, name: str, **kwargs) -> VectorIndex:
+        return self._open(name)
+
+    def create_collection(self, name: str, **kwargs) -> VectorIndex:
+        if os.path.exists(os.path.join(self._collection_path(name), STATE_FILENAME)):
+            raise ValueError(f"Collection {name} already exists")
+        return self._open(name)
+
+    def get_collection(self, name: str, **kwargs) -> VectorIndex:
+        if name not in self._collections and not os.path.exists(os.path.join(self._collection_path(name), STATE_FILENAME)):
+            raise ValueError(f"Collection {name} does not exist")
+        return self._open(name)
+
+    def list_collections(self) -> List[VectorIndex]:
+        names = [entry.name for entry in os.scandir(self.path)
+                 if entry.is_dir() and os.path.exists(os.path.join(entry.path, STATE_FILENAME))]
+        return [self._open(name) for name in sorted(names)]
+
+    def delete_collection(self, name: str) -> None:
+        import shutil
+        with self._lock:
+            self._collections.pop(name, None)
+        shutil.rmtree(self._collection_path(name), ignore_errors=True)
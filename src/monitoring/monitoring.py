@@ -68,7 +68,8 @@ class Monitoring:
             "api_calls": defaultdict(int),
             "query_types": defaultdict(int),
             "error_types": defaultdict(int),
-            "context_sources_used": defaultdict(int)
+            "context_sources_used": defaultdict(int),
+            "cache_stats": defaultdict(lambda: {"hits": 0, "misses": 0})
         }
 
         # Historical data for trend analysis
@@ -173,6 +174,19 @@ class Monitoring:
             except Exception as e:
                 logger.error(f"Error updating metrics: {e}")
 
+    def record_cache_event(self, cache_name: str, hit: bool) -> None:
+        """Count a hit or miss for a named cache (e.g. query embeddings)."""
+        with self._lock:
+            self.metrics["cache_stats"][cache_name]["hits" if hit else "misses"] += 1
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counts and hit rate for every cache that reported events."""
+        stats = {}
+        for cache_name, counts in list(self.metrics["cache_stats"].items()):
+            total = counts["hits"] + counts["misses"]
+            stats[cache_name] = {**counts, "hit_rate": counts["hits"] / total if total else 0.0}
+        return stats
+
     def _extract_processing_time(self, response_data: Dict) -> float:
         """Extract processing time from response data."""
         try:
@@ -279,6 +293,7 @@ class Monitoring:
                     "query_types": dict(self.metrics["query_types"]),
                     "error_types": dict(self.metrics["error_types"]),
                     "context_sources": dict(self.metrics["context_sources_used"]),
+                    "cache_stats": self.get_cache_stats(),
                     "recent_queries": list(self.query_history)[-10:] if self.query_history else []
                 })
 
@@ -505,7 +520,8 @@ class Monitoring:
                 "api_calls": defaultdict(int),
                 "query_types": defaultdict(int),
                 "error_types": defaultdict(int),
-                "context_sources_used": defaultdict(int)
+                "context_sources_used": defaultdict(int),
+                "cache_stats": defaultdict(lambda: {"hits": 0, "misses": 0})
             }
 
             self.query_history.clear()
@@ -28,10 +28,12 @@ Technology Stack:
 
 import os
 import logging
-import requests
 import json
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import model_factory
+from hedging import HedgingPolicy
+from http_client import HTTPClientError, get_http_client
 from typing import Optional, Dict, List
 from datetime import datetime, UTC
 
@@ -40,6 +42,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_TIMEOUT = 15  # seconds
+
 class APIClient:
     """Handles API interactions for the RAG pipeline - Updated 2025-07-15."""
 
@@ -50,6 +55,12 @@ class APIClient:
         self.current_user = "TIRUMALA MANAV"
         self.initialization_time = datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')
 
+        # Gemini fallback is started early when Tavily is slower than its usual latency
+        self.search_hedging = HedgingPolicy(percentile=float(os.getenv("WEB_SEARCH_HEDGE_PERCENTILE", "95")),
+                                            budget=float(os.getenv("WEB_SEARCH_HEDGE_BUDGET", "0.1")))
+        self.search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="web-search")
+        self.http = get_http_client()  # Pooled keep-alive connections shared with the agent tools
+
         self._configure_gemini()
         logger.info(f"APIClient initialized for user {self.current_user} at {self.initialization_time} UTC")
 
@@ -57,7 +68,7 @@ class APIClient:
         """Configure Gemini API if key is available."""
         if self.gemini_api_key:
             try:
-                genai.configure(api_key=self.gemini_api_key)
+                model_factory.configure(self.gemini_api_key)
                 logger.info("Gemini API configured successfully")
             except Exception as e:
                 logger.error(f"Failed to configure Gemini API: {e}")
@@ -72,30 +83,48 @@ class APIClient:
             return None
 
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            enhanced_prompt = f"""
+            model = self._gemini_model(temperature)
+            response = model.generate_content(self._gemini_prompt(prompt))
+            return self._gemini_text(response)
+        except Exception as e:
+            logger.error(f"Gemini API request failed: {e}")
+            return None
+
+    async def aget_gemini_response(self, prompt: str, temperature: float = 0.1) -> Optional[str]:
+        """Async get_gemini_response (generate_content_async)."""
+        if not self.gemini_api_key:
+            logger.error("Gemini API key not available")
+            return None
+
+        try:
+            model = self._gemini_model(temperature)
+            response = await model.generate_content_async(self._gemini_prompt(prompt))
+            return self._gemini_text(response)
+        except Exception as e:
+            logger.error(f"Gemini API request failed: {e}")
+            return None
+
+    def _gemini_prompt(self, prompt: str) -> str:
+        return f"""
             User: {self.current_user}
             Timestamp: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')} UTC
             Query: {prompt}
             Please provide a comprehensive, educational response suitable for a coding chatbot.
             Include code examples, explanations, and best practices where applicable.
             """
-            response = model.generate_content(
-                enhanced_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=2048,
-                )
-            )
-            if response.text:
-                logger.info(f"Gemini response generated successfully (length: {len(response.text)})")
-                return response.text
-            else:
-                logger.warning("Gemini API returned empty response")
-                return None
-        except Exception as e:
-            logger.error(f"Gemini API request failed: {e}")
-            return None
+
+    def _gemini_model(self, temperature: float):
+        """Shared model handle for this temperature (see model_factory)."""
+        return model_factory.get_model('gemini-1.5-flash', api_key=self.gemini_api_key,
+                                       temperature=temperature, max_output_tokens=2048)
+
+    @staticmethod
+    def _gemini_text(response) -> Optional[str]:
+        if response.text:
+            logger.info(f"Gemini response generated successfully (length: {len(response.text)})")
+            return response.text
+        logger.warning("Gemini API returned empty response")
+        return None
 
     def search_tavily(self, query: str, max_results: int = 5) -> Optional[str]:
         """Perform web search using Tavily API with enhanced formatting."""
@@ -104,37 +133,74 @@ class APIClient:
             return None
 
         try:
-            url = "https://api.tavily.com/search"
-            headers = {"Content-Type": "application/json"}
-            enhanced_query = self._enhance_coding_query(query)
-            data = {
-                "api_key": self.tavily_api_key,
-                "query": enhanced_query,
-                "max_results": max_results,
-                "search_depth": "advanced",
-                "include_answer": True,
-                "include_raw_content": False,
-                "include_domains": [
-                    "stackoverflow.com", "github.com", "geeksforgeeks.org",
-                    "leetcode.com", "tutorialspoint.com", "w3schools.com",
-                    "developer.mozilla.org", "docs.python.org", "python.org"
-                ]
-            }
-            logger.debug(f"Tavily search request: {enhanced_query}")
-            response = requests.post(url, json=data, headers=headers, timeout=15)
-            response.raise_for_status()
-            result = response.json()
+            result = self.http.post_json(TAVILY_URL, self._tavily_request(query, max_results), timeout=TAVILY_TIMEOUT)
             return self._format_tavily_results(result)
-        except requests.exceptions.Timeout:
-            logger.error("Tavily search timed out after 15 seconds")
+        except HTTPClientError as e:
+            if e.timeout:
+                logger.error(f"Tavily search timed out after {TAVILY_TIMEOUT} seconds")
+            else:
+                logger.error(f"Tavily search failed: {e}")
             return None
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Tavily search failed: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error in Tavily search: {e}")
+            return None
+
+    async def asearch_tavily(self, query: str, max_results: int = 5) -> Optional[str]:
+        """Async search_tavily over the shared HTTP client."""
+        if not self.tavily_api_key:
+            logger.warning("Tavily API key not available, skipping web search")
+            return None
+
+        try:
+            result = await self.http.apost_json(TAVILY_URL, self._tavily_request(query, max_results),
+                                                timeout=TAVILY_TIMEOUT)
+            return self._format_tavily_results(result)
+        except HTTPClientError as e:
+            if e.timeout:
+                logger.error(f"Tavily search timed out after {TAVILY_TIMEOUT} seconds")
+            else:
+                logger.error(f"Tavily search failed: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error in Tavily search: {e}")
             return None
 
+    def _tavily_request(self, query: str, max_results: int) -> Dict:
+        enhanced_query = self._enhance_coding_query(query)
+        logger.debug(f"Tavily search request: {enhanced_query}")
+        return {
+            "api_key": self.tavily_api_key,
+            "query": enhanced_query,
+            "max_results": max_results,
+            "search_depth": "advanced",
+            "include_answer": True,
+            "include_raw_content": False,
+            "include_domains": [
+                "stackoverflow.com", "github.com", "geeksforgeeks.org",
+                "leetcode.com", "tutorialspoint.com", "w3schools.com",
+                "developer.mozilla.org", "docs.python.org", "python.org"
+            ]
+        }
+
+    def search_web(self, query: str) -> Optional[str]:
+        """
+        Web search with Tavily, hedged by the Gemini fallback: if Tavily has not answered within
+        its observed latency percentile (and the hedging budget allows), Gemini runs in parallel
+        and the first answer wins. Gemini is also used as a plain fallback when Tavily fails.
+        """
+        if not self.tavily_api_key:
+            return self.search_gemini_fallback(query)
+        return self.search_hedging.run(lambda: self.search_tavily(query),
+                                       lambda: self.search_gemini_fallback(query),
+                                       self.search_executor)
+
+    async def asearch_web(self, query: str) -> Optional[str]:
+        """Async search_web; a losing hedged call is cancelled outright."""
+        if not self.tavily_api_key:
+            return await self.asearch_gemini_fallback(query)
+        return await self.search_hedging.arun(lambda: self.asearch_tavily(query),
+                                              lambda: self.asearch_gemini_fallback(query))
+
     def _enhance_coding_query(self, query: str) -> str:
         """Enhance query for better coding-related search results."""
         query_lower = query.lower()
@@ -182,20 +248,36 @@ class APIClient:
             return None
 
         try:
-            enhanced_prompt = f"""
+            response = self.get_gemini_response(self._fallback_prompt(query), temperature=0.2)
+            return self._format_fallback(response) if response else None
+        except Exception as e:
+            logger.error(f"Gemini fallback search failed: {e}")
+            return None
+
+    async def asearch_gemini_fallback(self, query: str) -> Optional[str]:
+        """Async search_gemini_fallback."""
+        if not self.gemini_api_key:
+            logger.warning("Gemini API not available for fallback search")
+            return None
+
+        try:
+            response = await self.aget_gemini_response(self._fallback_prompt(query), temperature=0.2)
+            return self._format_fallback(response) if response else None
+        except Exception as e:
+            logger.error(f"Gemini fallback search failed: {e}")
+            return None
+
+    def _fallback_prompt(self, query: str) -> str:
+        return f"""
             As a coding expert, provide a comprehensive answer for this programming query: {query}
             Include: 1. Explanation, 2. Code examples with ```language```, 3. Step-by-step implementation if applicable,
             4. Time/space complexity if relevant, 5. Best practices, 6. Common pitfalls, 7. Alternatives.
             User: {self.current_user}, Timestamp: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')} UTC,
             Source: Gemini AI Fallback Search
             """
-            response = self.get_gemini_response(enhanced_prompt, temperature=0.2)
-            if response:
-                return f"**🤖 AI Knowledge Base:**\n\n{response}\n\n**ℹ️ Generated at:** {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')} UTC\n**👤 Requested by:** {self.current_user}"
-            return None
-        except Exception as e:
-            logger.error(f"Gemini fallback search failed: {e}")
-            return None
+
+    def _format_fallback(self, response: str) -> str:
+        return f"**🤖 AI Knowledge Base:**\n\n{response}\n\n**ℹ️ Generated at:** {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')} UTC\n**👤 Requested by:** {self.current_user}"
 
     def validate_api_keys(self) -> Dict[str, bool]:
         """Validate availability and functionality of API keys."""
@@ -225,7 +307,7 @@ class APIClient:
         }
         if self.gemini_api_key:
             try:
-                model = genai.GenerativeModel('gemini-1.5-flash')
+                model = model_factory.get_model('gemini-1.5-flash', api_key=self.gemini_api_key)
                 test_response = model.generate_content("Test")
                 status["gemini"] = "✅ Working properly" if test_response.text else "⚠️ Not responding correctly"
             except Exception as e:
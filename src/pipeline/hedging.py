@@ -0,0 +1,203 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Hedged requests - start a backup call when the primary is slower than usual, within a budget
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class HedgingPolicy:
+    """
+    Decides when to hedge a slow primary call with a backup call, and runs the race.
+
+    - Delay: the `percentile` of the primary's recently observed successful latencies
+      (default_delay until min_samples have been seen), clamped to [min_delay, max_delay].
+    - Budget: a token bucket. Every call earns `budget` tokens and a hedge spends one, so at
+      most about budget * calls extra backup calls are made; `burst` caps saved-up tokens.
+      A budget of 0 disables hedging (the backup then only runs after the primary fails).
+    """
+
+    def __init__(self, percentile: float = 95.0, budget: float = 0.1, burst: float = 3.0,
+                 default_delay: float = 3.0, min_delay: float = 0.5, max_delay: float = 10.0,
+                 window: int = 200, min_samples: int = 10):
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._tokens = min(1.0, burst) if budget > 0 else 0.0
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0, "fallbacks": 0}
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before starting the backup."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            delay = self.default_delay
+        else:
+            delay = samples[min(len(samples) - 1, int(len(samples) * self.percentile / 100))]
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def _earn(self) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+
+    def _try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.stats["hedged"] += 1
+                return True
+            self.stats["budget_denied"] += 1
+            return False
+
+    def _timed(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            start = time.perf_counter()
+            result = func()
+            if result:
+                self.record_latency(time.perf_counter() - start)
+            return result
+        return run
+
+    def run(self, primary: Callable[[], Any], backup: Callable[[], Any], executor: Executor) -> Optional[Any]:
+        """
+        Call primary; if it has not answered within hedge_delay() (and the budget allows), also
+        call backup and return whichever gives a result first. A falsy result counts as a
+        failure: the other call is then awaited, or backup is called as a plain fallback.
+        Args:
+            primary: Zero-argument callable, e.g. the Tavily search.
+            backup: Zero-argument callable, e.g. the Gemini fallback.
+            executor: Pool the calls run on (must not be the pool running run() itself).
+        Returns:
+            The first truthy result, or None if both calls failed.
+        """
+        self._earn()
+        primary_future = executor.submit(self._timed(primary))
+        done, _ = wait([primary_future], timeout=self.hedge_delay())
+
+        if not done and not self._try_spend():
+            done, _ = wait([primary_future])
+        if done:
+            result = self._result(primary_future)
+            if result:
+                return result
+            self.stats["fallbacks"] += 1
+            return backup()
+
+        logger.info("Primary call slower than its latency percentile, starting hedged backup call")
+        backup_future = executor.submit(backup)
+        pending = {primary_future, backup_future}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = self._result(future)
+                if result:
+                    if future is backup_future:
+                        self.stats["hedge_wins"] += 1
+                    for loser in pending:
+                        # Queued calls never start; a call already in flight finishes in the
+                        # background and its result is dropped
+                        loser.cancel()
+                    return result
+        return None
+
+    async def arun(self, primary: Callable[[], Awaitable[Any]],
+                   backup: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Async run(): primary and backup return coroutines. The losing call is a task on the
+        event loop, so it is cancelled outright rather than left to finish.
+        """
+        self._earn()
+        primary_task = asyncio.ensure_future(self._atimed(primary))
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait([primary_task], timeout=self.hedge_delay())
+            if not done and not self._try_spend():
+                done, _ = await asyncio.wait([primary_task])
+            if done:
+                result = self._result(primary_task)
+                if result:
+                    return result
+                self.stats["fallbacks"] += 1
+                return await backup()
+
+            logger.info("Primary call slower than its latency percentile, starting hedged backup call")
+            backup_task = asyncio.ensure_future(backup())
+            tasks.append(backup_task)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = self._result(task)
+                    if result:
+                        if task is backup_task:
+                            self.stats["hedge_wins"] += 1
+                        return result
+            return None
+        finally:
+            # The loser, or everything if this call was itself cancelled (e.g. by a deadline)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _atimed(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        result = await func()
+        if result:
+            self.record_latency(time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    def _result(future) -> Optional[Any]:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Hedged call failed: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {**self.stats, "samples": len(self._latencies), "hedge_delay": round(delay, 3)}
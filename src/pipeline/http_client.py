@@ -0,0 +1,382 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Shared pooled HTTP client (sync + async) with keep-alive, per-host limits, retries and connection metrics
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# HTTP/2 needs httpx with the h2 extra; without it requests/aiohttp (HTTP/1.1 keep-alive) are used
+try:
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPClientError(Exception):
+    """A request failed after all retries. status is the HTTP status, if a response arrived."""
+
+    def __init__(self, message: str, status: Optional[int] = None, timeout: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.timeout = timeout
+
+
+class HTTPMetrics:
+    """Thread-safe counters: requests, new connections (TCP + TLS handshakes) and retries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_seconds = 0.0
+        self.retries = 0
+        self.errors = 0
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.new_connections += 1
+            self.handshake_seconds += seconds
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                # Share of requests served on an already open (kept-alive) connection
+                "connection_reuse_ratio": round(1 - self.new_connections / self.requests, 3) if self.requests else None,
+                "avg_handshake_ms": round(1000 * self.handshake_seconds / self.new_connections, 1)
+                if self.new_connections else None,
+                "retries": self.retries,
+                "errors": self.errors,
+            }
+
+
+def _timed_pool(pool_class, connection_class, metrics: HTTPMetrics):
+    """urllib3 pool class whose connections report their connect (TCP + TLS) time."""
+    class TimedConnection(connection_class):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            metrics.record_connect(time.perf_counter() - start)
+
+    return type(pool_class.__name__, (pool_class,), {"ConnectionCls": TimedConnection})
+
+
+class _MeteredAdapter(HTTPAdapter):
+    def __init__(self, metrics: HTTPMetrics, **kwargs):
+        self._metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _timed_pool(HTTPConnectionPool, HTTPConnection, self._metrics),
+            "https": _timed_pool(HTTPSConnectionPool, HTTPSConnection, self._metrics),
+        }
+
+
+class HTTPClient:
+    """
+    One pooled HTTP client for all outbound API calls (Tavily and friends).
+
+    - Connections are kept alive and reused across requests (up to pool_size in total).
+    - HTTP/2 is used when httpx and h2 are installed; otherwise requests (sync) and aiohttp (async).
+    - At most per_host_limit requests run against one host at a time.
+    - Connection errors and 429/5xx responses are retried up to max_retries times with
+      exponential backoff and full jitter, as long as the caller's timeout allows. Timeouts
+      are not retried, so a call never takes much longer than its timeout.
+
+    Use post_json() from threads and apost_json() from coroutines; they share the metrics.
+    Async requests run on a background event loop owned by the client (one session for all
+    callers, whatever loop they run on); close() shuts down both sides.
+    """
+
+    def __init__(self, pool_size: int = 20, per_host_limit: int = 8, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_cap: float = 4.0, keepalive: float = 60.0):
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.keepalive = keepalive
+        self.http2 = httpx is not None
+        self.metrics = HTTPMetrics()
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        # Async requests all run on one background event loop (started on first use), so a
+        # single session and its kept-alive connections serve every caller's loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._async_session = None
+        self._async_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+        if self.http2:
+            self._session = httpx.Client(http2=True, limits=self._httpx_limits())
+        else:
+            self._session = requests.Session()
+            adapter = _MeteredAdapter(self.metrics, pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def _httpx_limits(self):
+        return httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                            keepalive_expiry=self.keepalive)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _httpx_trace(self):
+        """httpcore trace hook: a request that opened a connection reports its handshake time."""
+        started = {}
+
+        def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.started":
+                started["at"] = time.perf_counter()
+            elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                started["done"] = time.perf_counter()
+
+        def record() -> None:
+            if "at" in started:
+                self.metrics.record_connect(started.get("done", started["at"]) - started["at"])
+
+        return trace, record
+
+    def _retry_delay(self, attempt: int, deadline: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if none is left or it would end past the deadline."""
+        if attempt >= self.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        return delay if time.monotonic() + delay < deadline else None
+
+    def post_json(self, url: str, payload: Dict[str, Any], timeout: float = 15.0) -> Dict[str, Any]:
+        """
+        POST a JSON body and return the decoded JSON response.
+        Args:
+            url (str): Endpoint.
+            payload (dict): JSON body.
+            timeout (float): Seconds for the whole call, retries and backoff included. A timed-out
+                attempt is not retried: the server may still be working on (and billing) it.
+        Returns:
+            dict: Decoded response.
+        Raises:
+            HTTPClientError: When the request still fails after retries.
+        """
+        deadline = time.monotonic() + timeout
+        with self._host_limit(url):
+            for attempt in range(self.max_retries + 1):
+                self.metrics.count("requests")
+                status = None
+                try:
+                    if self.http2:
+                        trace, record = self._httpx_trace()
+                        response = self._session.post(url, json=payload, timeout=deadline - time.monotonic(),
+                                                      extensions={"trace": trace})
+                        record()
+                    else:
+                        response = self._session.post(url, json=payload, timeout=deadline - time.monotonic())
+                    status = response.status_code
+                    if status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return response.json()
+                    error = HTTPClientError(f"HTTP {status} from {url}", status=status)
+                except Exception as e:
+                    timed_out = isinstance(e, requests.exceptions.Timeout) or (
+                        self.http2 and isinstance(e, httpx.TimeoutException))
+                    error = HTTPClientError(f"Request to {url} failed: {e}", status=status, timeout=timed_out)
+                    if status is not None or timed_out:
+                        break  # Non-retryable HTTP error, a bad body or a timeout
+                delay = self._retry_delay(attempt, deadline)
+                if delay is None:
+                    break
+                self.metrics.count("retries")
+                time.sleep(delay)
+        self.metrics.count("errors")
+        raise error
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="http-client-loop",
+                                                     daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def _get_async_session(self):
+        """The async session, created on first use. Only called on the client's own loop."""
+        if self._async_session is None:
+            if self.http2:
+                self._async_session = httpx.AsyncClient(http2=True, limits=self._httpx_limits())
+            else:
+                trace_config = aiohttp.TraceConfig()
+
+                async def on_create_start(session, context, params):
+                    context.connect_started = time.perf_counter()
+
+                async def on_create_end(session, context, params):
+                    self.metrics.record_connect(time.perf_counter() - context.connect_started)
+
+                trace_config.on_connection_create_start.append(on_create_start)
+                trace_config.on_connection_create_end.append(on_create_end)
+                connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host_limit,
+                                                 keepalive_timeout=self.keepalive)
+                self._async_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+        return self._async_session
+
+    async def apost_json(self, url: str, payload: Dict[str, Any], timeout: float = 15.0) -> Dict[str, Any]:
+        """
+        Async post_json (aiohttp, or httpx over HTTP/2), callable from any event loop. The request
+        runs on the client's own loop, so connections stay alive across callers, including a
+        separate asyncio.run() per request; cancelling the caller cancels the request.
+        Args:
+            url (str): Endpoint.
+            payload (dict): JSON body.
+            timeout (float): Seconds for the whole call, retries and backoff included.
+        Returns:
+            dict: Decoded response.
+        Raises:
+            HTTPClientError: When the request still fails after retries.
+        """
+        if aiohttp is None and not self.http2:
+            raise HTTPClientError("aiohttp is not installed; it is required for async HTTP requests")
+        future = asyncio.run_coroutine_threadsafe(self._apost_json(url, payload, timeout), self._event_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _apost_json(self, url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        session = self._get_async_session()
+        host = urlsplit(url).netloc
+        if host not in self._async_host_limits:
+            self._async_host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+
+        async with self._async_host_limits[host]:
+            for attempt in range(self.max_retries + 1):
+                self.metrics.count("requests")
+                status = None
+                try:
+                    if self.http2:
+                        trace, record = self._httpx_trace()
+
+                        async def atrace(event, info):
+                            trace(event, info)
+
+                        response = await session.post(url, json=payload, timeout=deadline - time.monotonic(),
+                                                      extensions={"trace": atrace})
+                        record()
+                        status = response.status_code
+                        if status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            return response.json()
+                    else:
+                        attempt_timeout = aiohttp.ClientTimeout(total=deadline - time.monotonic())
+                        async with session.post(url, json=payload, timeout=attempt_timeout) as response:
+                            status = response.status
+                            if status not in RETRY_STATUSES:
+                                response.raise_for_status()
+                                return await response.json()
+                    error = HTTPClientError(f"HTTP {status} from {url}", status=status)
+                except Exception as e:
+                    timed_out = isinstance(e, asyncio.TimeoutError) or (
+                        self.http2 and isinstance(e, httpx.TimeoutException))
+                    error = HTTPClientError(f"Request to {url} failed: {e}", status=status, timeout=timed_out)
+                    if status is not None or timed_out:
+                        break
+                delay = self._retry_delay(attempt, deadline)
+                if delay is None:
+                    break
+                self.metrics.count("retries")
+                await asyncio.sleep(delay)
+        self.metrics.count("errors")
+        raise error
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.metrics.get_stats(), "http2": self.http2, "pool_size": self.pool_size,
+                "per_host_limit": self.per_host_limit}
+
+    def close(self) -> None:
+        """Close pooled connections, and the async session and loop if they were started."""
+        self._session.close()
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._async_session is not None:
+            session, self._async_session = self._async_session, None
+            closing = session.aclose() if self.http2 else session.close()
+            asyncio.run_coroutine_threadsafe(closing, loop).result(timeout=5)
+        self._async_host_limits.clear()
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join(timeout=5)
+        loop.close()
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Process-wide HTTP client configured from HTTP_POOL_SIZE, HTTP_PER_HOST_LIMIT and HTTP_MAX_RETRIES."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient(pool_size=int(os.getenv("HTTP_POOL_SIZE", "20")),
+                                 per_host_limit=int(os.getenv("HTTP_PER_HOST_LIMIT", "8")),
+                                 max_retries=int(os.getenv("HTTP_MAX_RETRIES", "2")))
+        return _client
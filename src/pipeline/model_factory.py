@@ -0,0 +1,89 @@
+"""
+KRAKEN - Advanced AI Coding Assistant
+=====================================
+
+Description: Shared, thread-safe cache of configured Gemini GenerativeModel handles
+
+Author: Tirumala Manav
+Email: tirumalamanav@example.com
+GitHub:https://github.com/TirumalaManav
+LinkedIn: https://linkedin.com/in/tirumalamanav
+
+Project: KRAKEN AI Assistant
+Repository: https://github.com/TirumalaManav/KRAKEN-AI-Assistant
+Created: 2026-10-18
+Last Modified: 2026-10-18
+
+License: MIT License
+Copyright (c) 2025 Tirumala Manav
+
+Technology Stack:
+- LangChain for AI orchestration
+- ChromaDB for vector storage
+- Streamlit for web interface
+- Google Gemini API for LLM capabilities
+- Sentence Transformers for embeddings
+
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import google.generativeai as genai
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+_lock = threading.Lock()
+_configured_key: Optional[str] = None
+_models: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], "genai.GenerativeModel"] = {}
+
+
+def configure(api_key: Optional[str] = None) -> bool:
+    """
+    Configure the Gemini SDK once per API key (GEMINI_API_KEY by default). Calling it again
+    with the same key is free; a different key reconfigures the SDK and drops cached models.
+    Returns:
+        bool: True if a key is configured.
+    """
+    global _configured_key
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return False
+    with _lock:
+        if api_key != _configured_key:
+            genai.configure(api_key=api_key)
+            _models.clear()
+            _configured_key = api_key
+            logger.info("Gemini API configured")
+    return True
+
+
+def get_model(model_name: str = DEFAULT_MODEL, api_key: Optional[str] = None,
+              **generation_config: Any) -> "genai.GenerativeModel":
+    """
+    Shared GenerativeModel for a (model name, generation config) pair, created on first use.
+    Args:
+        model_name (str): Gemini model.
+        api_key (str, optional): Key to configure if not yet configured (default: GEMINI_API_KEY).
+        **generation_config: GenerationConfig fields baked into the model, e.g. temperature=0.2,
+            max_output_tokens=2048. Calls then need no generation_config of their own.
+    Returns:
+        genai.GenerativeModel: Cached model handle, safe to share across threads.
+    Raises:
+        ValueError: If no API key is available.
+    """
+    if not configure(api_key):
+        raise ValueError("GEMINI_API_KEY is not set")
+    key = (model_name, tuple(sorted(generation_config.items())))
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            config = genai.types.GenerationConfig(**generation_config) if generation_config else None
+            model = _models[key] = genai.GenerativeModel(model_name, generation_config=config)
+            logger.debug(f"Created Gemini model handle {model_name} {dict(generation_config)}")
+        return model
@@ -28,7 +28,11 @@ Technology Stack:
 
 import sys
 import os
+import time
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, Optional, List, Any
 from datetime import datetime, UTC
 
@@ -36,13 +40,12 @@ from datetime import datetime, UTC
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'handlers'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'monitoring'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'embeddings'))
 
 # Import from agents folder
 try:
     from agent_manager import AgentManager
     from tools import get_tools
-    from chromadb import Client
-    from chromadb.config import Settings
     from langchain_core.messages import BaseMessage
 except ImportError as e:
     print(f"❌ Import Error: {e}")
@@ -52,6 +55,19 @@ except ImportError as e:
 # Import from current folder
 from api_client import APIClient
 
+# Import vector store backend selection
+from vector_db import create_client
+from index_versions import VersionedClient
+
+# Import shared embedding model registry
+try:
+    from model_registry import get_registry, warm_up_models
+except ImportError as e:
+    print(f"⚠️ Model Registry Import Warning: {e}")
+    print("Embedding warm-up not available - models will load on first query")
+    get_registry = None
+    warm_up_models = None
+
 # Import handlers
 try:
     from input_handler import InputHandler
@@ -82,7 +98,7 @@ class RAGPipeline:
     """
 
     def __init__(self, db_path: str = r"D:\Code Explainer\src\embeddings\vector_db",
-                 enable_monitoring: bool = True):
+                 enable_monitoring: bool = True, warm_up_embeddings: bool = True):
         """Initialize RAG pipeline with all necessary components including monitoring."""
         try:
             self.current_user = "TIRUMALA MANAV"
@@ -90,26 +106,27 @@ class RAGPipeline:
 
             logger.info(f"🚀 Initializing Enhanced RAG Pipeline for user {self.current_user} at {self.initialization_time} UTC...")
 
+            # Initialize monitoring if available (first, so tools can report cache metrics)
+            self.monitoring = Monitoring() if Monitoring and enable_monitoring else None
+            self.enable_monitoring = bool(self.monitoring)
+
             # Initialize core components
             self.db_path = db_path
-            self.client = Client(Settings(persist_directory=db_path))
-            self.tools = get_tools(self.client)
+            self.client = create_client(db_path)  # Backend chosen by VECTOR_DB_BACKEND
+            self.tools = get_tools(self.client, monitoring=self.monitoring)
             self.api_client = APIClient()
-            self.agent_manager = AgentManager(db_path=db_path)
+            self.agent_manager = AgentManager(db_path=db_path, monitoring=self.monitoring)
 
             # Initialize handlers if available
             self.input_handler = InputHandler() if InputHandler else None
             self.output_handler = OutputHandler() if OutputHandler else None
 
-            # Initialize monitoring if available
-            self.monitoring = Monitoring() if Monitoring and enable_monitoring else None
-            self.enable_monitoring = bool(self.monitoring)
-
             # Pipeline configuration
             self.max_context_length = 4000
             self.enable_web_search = True
             self.enable_database_search = True
             self.context_enhancement = True
+            self.retrieval_deadline = float(os.getenv("RETRIEVAL_DEADLINE", "10"))  # seconds per query
             self.use_handlers = bool(self.input_handler and self.output_handler)
 
             # Performance tracking (basic - monitoring provides advanced)
@@ -117,6 +134,20 @@ class RAGPipeline:
             self.successful_queries = 0
             self.failed_queries = 0
 
+            # Load the shared embedding model in the background so the first query doesn't pay for it
+            self.warm_up_thread = None
+            if warm_up_embeddings and warm_up_models:
+                self.warm_up_thread = threading.Thread(target=warm_up_models, name="embedding-warm-up", daemon=True)
+                self.warm_up_thread.start()
+
+            # Shared by all queries, one pool per source: web searches that outlive the deadline
+            # keep their worker busy, and must not leave database searches waiting for one
+            retrieval_workers = int(os.getenv("RETRIEVAL_WORKERS", "8"))
+            self.retrieval_executors = {
+                name: ThreadPoolExecutor(max_workers=retrieval_workers, thread_name_prefix=f"retrieval-{name}")
+                for name in ("database", "web")
+            }
+
             # Validate initialization
             self._validate_components()
 
@@ -157,61 +188,132 @@ class RAGPipeline:
     def retrieve_context(self, query: str, session_id: str = "default") -> Dict[str, Any]:
         """
         Retrieve context from multiple sources with enhanced error handling.
-        Returns detailed context information including source metadata.
+        Database and web search run concurrently on the shared retrieval pool; sources that
+        have not finished by the retrieval deadline are left out of the combined context.
+        Returns detailed context information including source metadata and per-source timings.
         """
-        context_data = {
-            "database_results": None,
-            "web_results": None,
-            "combined_context": "",
-            "sources_used": [],
-            "retrieval_time": 0,
-            "success": False
-        }
-
+        context_data = self._new_context_data()
         retrieval_start = datetime.now(UTC)
 
         try:
             logger.debug(f"🔍 Starting context retrieval for query: {query[:50]}...")
 
-            # Database Search
+            sources = {}
             if self.enable_database_search:
-                context_data["database_results"] = self._search_database(query)
-                if context_data["database_results"]:
-                    context_data["sources_used"].append("database")
-                    logger.info("✅ Database search successful")
-                else:
-                    logger.info("ℹ️ Database search returned no results")
-
-            # Web Search
+                sources["database"] = self._search_database
             if self.enable_web_search:
-                context_data["web_results"] = self._search_web(query)
-                if context_data["web_results"]:
-                    context_data["sources_used"].append("web")
-                    logger.info("✅ Web search successful")
-                else:
-                    logger.info("ℹ️ Web search returned no results")
+                sources["web"] = self._search_web
 
-            # Combine contexts
-            context_data["combined_context"] = self._combine_contexts(
-                context_data["database_results"],
-                context_data["web_results"]
-            )
+            futures = {name: self.retrieval_executors[name].submit(self._timed_search, search, query)
+                       for name, search in sources.items()}
+            wait(futures.values(), timeout=self.retrieval_deadline)
 
-            # Calculate retrieval time
-            context_data["retrieval_time"] = (datetime.now(UTC) - retrieval_start).total_seconds()
-            context_data["success"] = bool(context_data["combined_context"])
+            for name, future in futures.items():
+                # A late search keeps running on its source's pool, but this query no longer waits for it
+                self._record_source(context_data, name, future.result() if future.done() else None)
 
-            logger.info(f"📊 Context retrieval completed in {context_data['retrieval_time']:.2f}s")
-            logger.info(f"📚 Sources used: {', '.join(context_data['sources_used']) or 'none'}")
+            return self._finish_context(context_data, retrieval_start)
 
+        except Exception as e:
+            logger.error(f"❌ Context retrieval failed: {e}")
+            context_data["retrieval_time"] = (datetime.now(UTC) - retrieval_start).total_seconds()
+            context_data["error"] = str(e)
             return context_data
 
+    async def aretrieve_context(self, query: str, session_id: str = "default") -> Dict[str, Any]:
+        """
+        Async retrieve_context: the web search awaits aiohttp/Gemini calls on the event loop,
+        the database search runs on the database retrieval pool. Sources still running at the
+        deadline are cancelled.
+        """
+        context_data = self._new_context_data()
+        retrieval_start = datetime.now(UTC)
+
+        try:
+            logger.debug(f"🔍 Starting async context retrieval for query: {query[:50]}...")
+
+            loop = asyncio.get_running_loop()
+            tasks = {}
+            if self.enable_database_search:
+                tasks["database"] = asyncio.ensure_future(loop.run_in_executor(
+                    self.retrieval_executors["database"], self._timed_search, self._search_database, query))
+            if self.enable_web_search:
+                tasks["web"] = asyncio.ensure_future(self._atimed_search(self._asearch_web, query))
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=self.retrieval_deadline)
+
+            for name, task in tasks.items():
+                # Checked before cancelling: a cancelled run_in_executor future is done at once,
+                # and its result() would raise CancelledError
+                if task.done() and not task.cancelled():
+                    self._record_source(context_data, name, task.result())
+                else:
+                    task.cancel()
+                    self._record_source(context_data, name, None)
+
+            return self._finish_context(context_data, retrieval_start)
+
         except Exception as e:
-            logger.error(f"❌ Context retrieval failed: {e}")
+            logger.error(f"❌ Async context retrieval failed: {e}")
             context_data["retrieval_time"] = (datetime.now(UTC) - retrieval_start).total_seconds()
             context_data["error"] = str(e)
             return context_data
 
+    @staticmethod
+    def _new_context_data() -> Dict[str, Any]:
+        return {
+            "database_results": None,
+            "web_results": None,
+            "combined_context": "",
+            "sources_used": [],
+            "source_timings": {},
+            "retrieval_time": 0,
+            "success": False
+        }
+
+    def _record_source(self, context_data: Dict[str, Any], name: str, outcome) -> None:
+        """Store one source's (result, seconds) in context_data; outcome None means it missed the deadline."""
+        if outcome is None:
+            context_data["source_timings"][name] = {"status": "timeout", "time": self.retrieval_deadline}
+            logger.warning(f"⏱️ {name.capitalize()} search missed the {self.retrieval_deadline:.1f}s deadline")
+            return
+        result, elapsed = outcome
+        context_data[f"{name}_results"] = result
+        context_data["source_timings"][name] = {"status": "ok" if result else "empty", "time": elapsed}
+        if result:
+            context_data["sources_used"].append(name)
+            logger.info(f"✅ {name.capitalize()} search successful in {elapsed:.2f}s")
+        else:
+            logger.info(f"ℹ️ {name.capitalize()} search returned no results")
+
+    def _finish_context(self, context_data: Dict[str, Any], retrieval_start: datetime) -> Dict[str, Any]:
+        """Combine the collected sources and record the total retrieval time."""
+        context_data["combined_context"] = self._combine_contexts(
+            context_data["database_results"],
+            context_data["web_results"]
+        )
+
+        context_data["retrieval_time"] = (datetime.now(UTC) - retrieval_start).total_seconds()
+        context_data["success"] = bool(context_data["combined_context"])
+
+        logger.info(f"📊 Context retrieval completed in {context_data['retrieval_time']:.2f}s")
+        logger.info(f"📚 Sources used: {', '.join(context_data['sources_used']) or 'none'}")
+        return context_data
+
+    @staticmethod
+    def _timed_search(search, query: str):
+        """Run one retrieval source and return (result, seconds taken)."""
+        start = time.perf_counter()
+        result = search(query)
+        return result, time.perf_counter() - start
+
+    @staticmethod
+    async def _atimed_search(search, query: str):
+        """Await one async retrieval source and return (result, seconds taken)."""
+        start = time.perf_counter()
+        result = await search(query)
+        return result, time.perf_counter() - start
+
     def _search_database(self, query: str) -> Optional[str]:
         """Search database using available tools."""
         try:
@@ -227,21 +329,17 @@ class RAGPipeline:
             return None
 
     def _search_web(self, query: str) -> Optional[str]:
-        """Search web using API client with fallback options."""
+        """Search web using API client: Tavily, hedged by the Gemini fallback."""
         try:
-            # Try Tavily first
-            web_result = self.api_client.search_tavily(query)
-            if web_result:
-                return web_result
-
-            # Try Gemini fallback
-            logger.info("🔄 Trying Gemini fallback for web search...")
-            gemini_result = self.api_client.search_gemini_fallback(query)
-            if gemini_result:
-                return gemini_result
-
+            return self.api_client.search_web(query)
+        except Exception as e:
+            logger.warning(f"Web search error: {e}")
             return None
 
+    async def _asearch_web(self, query: str) -> Optional[str]:
+        """Async _search_web."""
+        try:
+            return await self.api_client.asearch_web(query)
         except Exception as e:
             logger.warning(f"Web search error: {e}")
             return None
@@ -406,83 +504,89 @@ Focus on accuracy, include code examples where appropriate, and explain concepts
             logger.debug("🤖 Generating response with agent manager...")
             agent_response = self.agent_manager.process_query(enhanced_query, session_id)
 
-            # Step 4: Process and format final response
-            if agent_response.get("success", False):
-                processing_time = (datetime.now(UTC) - query_start_time).total_seconds()
-                self.successful_queries += 1
-
-                final_response = {
-                    "response": agent_response["response"],
-                    "original_query": query,
-                    "enhanced_query": enhanced_query if enhanced_query != query else None,
-                    "context_data": context_data,
-                    "source": "rag_pipeline",
-                    "session_id": session_id,
-                    "success": True,
-                    "metadata": {
-                        "query_number": self.query_count,
-                        "processing_time": f"{processing_time:.2f}s",
-                        "context_sources": context_data["sources_used"],
-                        "context_retrieval_time": f"{context_data['retrieval_time']:.2f}s",
-                        "agent_response_metadata": agent_response,
-                        "user": self.current_user,
-                        "timestamp": datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC'),
-                        "pipeline_stats": {
-                            "total_queries": self.query_count,
-                            "successful_queries": self.successful_queries,
-                            "failed_queries": self.failed_queries
-                        }
-                    }
-                }
+            return self._build_query_response(query, session_id, context_data, enhanced_query,
+                                              agent_response, query_start_time)
 
-                logger.info(f"✅ RAG query processed successfully in {processing_time:.2f}s")
+        except Exception as e:
+            return self._build_query_error(query, session_id, e, query_start_time)
 
-                # Update monitoring if enabled (for direct process_query calls)
-                if self.enable_monitoring:
-                    self.monitoring.update_metrics(final_response)
+    async def aprocess_query(self, query: str, session_id: str = "default") -> Dict[str, Any]:
+        """
+        Async process_query. Retrieval and generation await network I/O instead of blocking,
+        so one event loop can serve many chats at once.
+        """
+        query_start_time = datetime.now(UTC)
+        self.query_count += 1
 
-                return final_response
+        try:
+            logger.info(f"🎯 Processing async RAG query #{self.query_count}: {query[:50]}...")
 
-            else:
-                # Agent processing failed
-                self.failed_queries += 1
-                processing_time = (datetime.now(UTC) - query_start_time).total_seconds()
+            context_data = await self.aretrieve_context(query, session_id)
+            enhanced_query = self._enhance_query_with_context(query, context_data)
 
-                logger.error(f"❌ Agent processing failed for query: {query[:50]}...")
-                error_response = {
-                    "response": f"I apologize, but I encountered an issue processing your request: {agent_response.get('response', 'Unknown agent error')}",
-                    "original_query": query,
-                    "context_data": context_data,
-                    "source": "rag_pipeline_agent_error",
-                    "session_id": session_id,
-                    "success": False,
-                    "error": agent_response.get("error"),
-                    "metadata": {
-                        "query_number": self.query_count,
-                        "processing_time": f"{processing_time:.2f}s",
-                        "user": self.current_user,
-                        "timestamp": datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')
+            logger.debug("🤖 Generating response with agent manager...")
+            agent_response = await self.agent_manager.aprocess_query(enhanced_query, session_id)
+
+            return self._build_query_response(query, session_id, context_data, enhanced_query,
+                                              agent_response, query_start_time)
+
+        except Exception as e:
+            return self._build_query_error(query, session_id, e, query_start_time)
+
+    def _build_query_response(self, query: str, session_id: str, context_data: Dict[str, Any],
+                              enhanced_query: str, agent_response: Dict[str, Any],
+                              query_start_time: datetime) -> Dict[str, Any]:
+        """Step 4 of process_query: format the agent's answer (or failure) and update monitoring."""
+        if agent_response.get("success", False):
+            processing_time = (datetime.now(UTC) - query_start_time).total_seconds()
+            self.successful_queries += 1
+
+            final_response = {
+                "response": agent_response["response"],
+                "original_query": query,
+                "enhanced_query": enhanced_query if enhanced_query != query else None,
+                "context_data": context_data,
+                "source": "rag_pipeline",
+                "session_id": session_id,
+                "success": True,
+                "metadata": {
+                    "query_number": self.query_count,
+                    "processing_time": f"{processing_time:.2f}s",
+                    "context_sources": context_data["sources_used"],
+                    "context_retrieval_time": f"{context_data['retrieval_time']:.2f}s",
+                    "agent_response_metadata": agent_response,
+                    "user": self.current_user,
+                    "timestamp": datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC'),
+                    "pipeline_stats": {
+                        "total_queries": self.query_count,
+                        "successful_queries": self.successful_queries,
+                        "failed_queries": self.failed_queries
                     }
                 }
+            }
 
-                # Update monitoring if enabled
-                if self.enable_monitoring:
-                    self.monitoring.update_metrics(error_response)
+            logger.info(f"✅ RAG query processed successfully in {processing_time:.2f}s")
 
-                return error_response
+            # Update monitoring if enabled (for direct process_query calls)
+            if self.enable_monitoring:
+                self.monitoring.update_metrics(final_response)
 
-        except Exception as e:
+            return final_response
+
+        else:
+            # Agent processing failed
             self.failed_queries += 1
             processing_time = (datetime.now(UTC) - query_start_time).total_seconds()
 
-            logger.error(f"❌ RAG Pipeline processing failed: {e}")
+            logger.error(f"❌ Agent processing failed for query: {query[:50]}...")
             error_response = {
-                "response": f"I apologize, but I encountered a technical error while processing your request. Please try again or rephrase your question. Error details: {str(e)}",
+                "response": f"I apologize, but I encountered an issue processing your request: {agent_response.get('response', 'Unknown agent error')}",
                 "original_query": query,
-                "source": "rag_pipeline_error",
+                "context_data": context_data,
+                "source": "rag_pipeline_agent_error",
                 "session_id": session_id,
                 "success": False,
-                "error": str(e),
+                "error": agent_response.get("error"),
                 "metadata": {
                     "query_number": self.query_count,
                     "processing_time": f"{processing_time:.2f}s",
@@ -497,6 +601,34 @@ Focus on accuracy, include code examples where appropriate, and explain concepts
 
             return error_response
 
+    def _build_query_error(self, query: str, session_id: str, e: Exception,
+                           query_start_time: datetime) -> Dict[str, Any]:
+        """Error response for a query that raised during retrieval or generation."""
+        self.failed_queries += 1
+        processing_time = (datetime.now(UTC) - query_start_time).total_seconds()
+
+        logger.error(f"❌ RAG Pipeline processing failed: {e}")
+        error_response = {
+            "response": f"I apologize, but I encountered a technical error while processing your request. Please try again or rephrase your question. Error details: {str(e)}",
+            "original_query": query,
+            "source": "rag_pipeline_error",
+            "session_id": session_id,
+            "success": False,
+            "error": str(e),
+            "metadata": {
+                "query_number": self.query_count,
+                "processing_time": f"{processing_time:.2f}s",
+                "user": self.current_user,
+                "timestamp": datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')
+            }
+        }
+
+        # Update monitoring if enabled
+        if self.enable_monitoring:
+            self.monitoring.update_metrics(error_response)
+
+        return error_response
+
     def get_monitoring_status(self) -> Dict[str, Any]:
         """Get comprehensive monitoring status if monitoring is enabled."""
         if not self.enable_monitoring:
@@ -537,6 +669,8 @@ Focus on accuracy, include code examples where appropriate, and explain concepts
                     "path": self.db_path,
                     "collections_count": len(collections),
                     "collections_names": [c.name for c in collections] if collections else [],
+                    # Live blue/green version when db_path is a versioned root
+                    "index_version": self.client.version if isinstance(self.client, VersionedClient) else None,
                     "status": "✅ Connected"
                 }
             except Exception as e:
@@ -587,12 +721,17 @@ Focus on accuracy, include code examples where appropriate, and explain concepts
                 except Exception as e:
                     monitoring_status["error"] = str(e)
 
+            # Embedding model load time and memory
+            embedding_models = get_registry().get_stats() if get_registry else []
+
             # Pipeline performance stats
             performance_stats = {
                 "total_queries": self.query_count,
                 "successful_queries": self.successful_queries,
                 "failed_queries": self.failed_queries,
                 "success_rate": f"{(self.successful_queries / max(self.query_count, 1)) * 100:.1f}%",
+                "web_search_hedging": self.api_client.search_hedging.get_stats(),
+                "http_client": self.api_client.http.get_stats(),
                 "initialization_time": self.initialization_time
             }
 
@@ -618,9 +757,11 @@ Focus on accuracy, include code examples where appropriate, and explain concepts
                 "agent_manager": agent_info,
                 "handlers": handlers_status,
                 "monitoring": monitoring_status,
+                "embedding_models": embedding_models,
                 "performance": performance_stats,
                 "configuration": {
                     "max_context_length": self.max_context_length,
+                    "retrieval_deadline": self.retrieval_deadline,
                     "web_search_enabled": self.enable_web_search,
                     "database_search_enabled": self.enable_database_search,
                     "context_enhancement_enabled": self.context_enhancement,
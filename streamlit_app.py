@@ -33,6 +33,9 @@ import time
 from datetime import datetime, timezone
 import json
 import hashlib
+import re
+import threading
+import numpy as np
 
 import datetime as dt
 if not hasattr(dt, 'UTC'):
@@ -52,69 +55,93 @@ def get_config_value(key: str, default=None):
 
 # Simple Vector Store (NO CHROMADB!)
 class SimpleVectorStore:
-    """Simple in-memory vector store using sentence similarity"""
+    """Simple in-memory TF-IDF store: an inverted index scored with one sparse matrix-vector product"""
+
+    TOKEN_PATTERN = re.compile(r"[\w+#]+")
 
     def __init__(self):
         self.documents = []
-        self.embeddings = []
         self.metadata = []
+        self.vocabulary = {}      # term -> column id
+        self._doc_terms = []      # per document: (term ids, term counts) as numpy arrays
+        self._lock = threading.Lock()
+        self._dirty = True
+        # Compiled term-major (CSC) index, rebuilt lazily after add_documents
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._term_docs = np.empty(0, dtype=np.int32)
+        self._term_weights = np.empty(0, dtype=np.float32)
+        self._idf = np.empty(0, dtype=np.float32)
+        self._doc_norms = np.empty(0, dtype=np.float32)
+
+    def _tokenize(self, text):
+        return self.TOKEN_PATTERN.findall(text.lower())
 
     def add_documents(self, docs, metadatas=None):
-        """Add documents to the store"""
-        for i, doc in enumerate(docs):
-            self.documents.append(doc)
-            # Simple hash-based "embedding" (good enough for basic similarity)
-            embedding = self._simple_embed(doc)
-            self.embeddings.append(embedding)
-
-            if metadatas:
-                self.metadata.append(metadatas[i])
-            else:
-                self.metadata.append({"source": "default"})
-
-    def _simple_embed(self, text):
-        """Create simple text embedding using word frequency"""
-        words = text.lower().split()
-        word_count = {}
-        for word in words:
-            word_count[word] = word_count.get(word, 0) + 1
-        return word_count
+        """Add documents to the store (the index is recompiled on the next search)"""
+        with self._lock:
+            for i, doc in enumerate(docs):
+                terms, counts = np.unique(
+                    [self.vocabulary.setdefault(token, len(self.vocabulary)) for token in self._tokenize(doc)],
+                    return_counts=True)
+                self.documents.append(doc)
+                self._doc_terms.append((terms.astype(np.int32), counts.astype(np.float32)))
+                self.metadata.append(metadatas[i] if metadatas else {"source": "default"})
+            self._dirty = True
+
+    def build(self):
+        """Compile the index now instead of on the next search"""
+        with self._lock:
+            if self._dirty:
+                self._compile()
+
+    def _compile(self):
+        """Build the term-major index with TF-IDF weights and per-document norms"""
+        n_docs, n_terms = len(self.documents), len(self.vocabulary)
+        lengths = [len(terms) for terms, _ in self._doc_terms]
+        terms = np.concatenate([terms for terms, _ in self._doc_terms]) if n_docs else np.empty(0, dtype=np.int32)
+        counts = np.concatenate([counts for _, counts in self._doc_terms]) if n_docs else np.empty(0, dtype=np.float32)
+        docs = np.repeat(np.arange(n_docs, dtype=np.int32), lengths)
+
+        document_frequency = np.bincount(terms, minlength=n_terms)
+        self._idf = (np.log((1 + n_docs) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts)) * self._idf[terms]
+        self._doc_norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n_docs)).astype(np.float32)
+
+        order = np.argsort(terms, kind="stable")
+        self._term_docs = docs[order]
+        self._term_weights = weights[order].astype(np.float32)
+        self._term_ptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+        self._dirty = False
 
     def search(self, query, top_k=3):
-        """Search for similar documents"""
-        query_embedding = self._simple_embed(query)
-
-        # Calculate similarity scores
-        scores = []
-        for i, doc_embedding in enumerate(self.embeddings):
-            score = self._calculate_similarity(query_embedding, doc_embedding)
-            scores.append((score, i))
-
-        # Sort by similarity and return top results
-        scores.sort(reverse=True)
-        results = []
-
-        for score, idx in scores[:top_k]:
-            if score > 0:  # Only return if there's some similarity
-                results.append({
-                    'document': self.documents[idx],
-                    'metadata': self.metadata[idx],
-                    'score': score
-                })
-
-        return results
-
-    def _calculate_similarity(self, embed1, embed2):
-        """Calculate simple similarity between embeddings"""
-        common_words = set(embed1.keys()) & set(embed2.keys())
-        if not common_words:
-            return 0
-
-        similarity = 0
-        for word in common_words:
-            similarity += min(embed1[word], embed2[word])
-
-        return similarity
+        """Search for similar documents (cosine similarity of TF-IDF vectors)"""
+        with self._lock:
+            if self._dirty:
+                self._compile()
+            query_terms, query_counts = np.unique(
+                [self.vocabulary[token] for token in self._tokenize(query) if token in self.vocabulary],
+                return_counts=True)
+            if not len(query_terms) or not self.documents:
+                return []
+            query_weights = (1 + np.log(query_counts)) * self._idf[query_terms]
+
+            # Sparse matrix-vector product: only the posting lists of the query terms are touched
+            spans = [slice(self._term_ptr[t], self._term_ptr[t + 1]) for t in query_terms]
+            docs = np.concatenate([self._term_docs[span] for span in spans])
+            contributions = np.concatenate([self._term_weights[span] * weight
+                                            for span, weight in zip(spans, query_weights)])
+            scores = np.bincount(docs, weights=contributions, minlength=len(self.documents))
+            scores /= np.maximum(self._doc_norms, 1e-12) * np.linalg.norm(query_weights)
+
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+        return [{
+            'document': self.documents[idx],
+            'metadata': self.metadata[idx],
+            'score': float(scores[idx])
+        } for idx in top if scores[idx] > 0]  # Only return if there's some similarity
 
 # Initialize the simple vector store
 @st.cache_resource
@@ -151,6 +178,7 @@ def create_simple_rag():
         metadatas = [{"topic": f"topic_{i}", "category": "programming"} for i in range(len(programming_docs))]
 
         vector_store.add_documents(programming_docs, metadatas)
+        vector_store.build()
 
         return vector_store
 
@@ -170,11 +198,9 @@ def enhanced_rag_query(query, vector_store):
             context_docs = [result['document'] for result in results]
             context = " ".join(context_docs)
 
-            # Generate response with context
-            import google.generativeai as genai
-            api_key = get_config_value("GEMINI_API_KEY")
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            # Generate response with context (model handle shared across messages and sessions)
+            from model_factory import get_model
+            model = get_model('gemini-1.5-flash', api_key=get_config_value("GEMINI_API_KEY"))
 
             enhanced_prompt = f"""You are KRAKEN, an expert AI coding assistant created by Tirumala Manav.
 
@@ -204,14 +230,13 @@ Response:"""
 def test_ai_response(prompt):
     """Test direct AI response using Gemini API"""
     try:
-        import google.generativeai as genai
+        from model_factory import get_model
 
         api_key = get_config_value("GEMINI_API_KEY")
         if not api_key:
             return None, "No API key found"
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = get_model('gemini-1.5-flash', api_key=api_key)
 
         enhanced_prompt = f"""You are KRAKEN, an expert AI coding assistant created by Tirumala Manav. You specialize in:
 - Programming languages (Python, JavaScript, Java, C++, etc.)
@@ -0,0 +1,53 @@
+"""
+Regression tests for the pipelined ingestion job (src/data_processing/ingest.py).
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "data_processing"))
+
+# ingest pulls in the chunker and embedding modules and their dependencies
+for module in ("langchain", "chromadb", "sentence_transformers"):
+    pytest.importorskip(module)
+
+import ingest  # noqa: E402
+
+
+def test_ingest_returns_when_embed_stage_fails_midstream(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i in range(50):
+        (data_dir / f"file_{i}.py").write_text("value = compute(1)\n" * 80)
+
+    walk = ingest.iter_code_files
+
+    def slow_walk(*args, **kwargs):
+        # Discovery is still running when the embedder gives up
+        for item in walk(*args, **kwargs):
+            time.sleep(0.02)
+            yield item
+
+    def failing_embed(chunks, **kwargs):
+        for i, _ in enumerate(chunks):
+            if i == 40:
+                return {"error": "embedding model failed", "chunks": 0}
+        return {"chunks": 0}
+
+    monkeypatch.setattr(ingest, "iter_code_files", slow_walk)
+    monkeypatch.setattr(ingest, "embed_chunk_stream", failing_embed)
+
+    result = {}
+    run = threading.Thread(target=lambda: result.update(ingest.ingest(
+        str(data_dir), client=object(), chunk_workers=1, queue_size=2)), daemon=True)
+    run.start()
+    run.join(timeout=60)
+
+    assert not run.is_alive(), "ingest() hung after the embed stage returned early"
+    assert result["errors"] >= 1
+    assert result["chunks_embedded"] == 0
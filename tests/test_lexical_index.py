@@ -0,0 +1,40 @@
+"""
+Tests for identifier detection in the BM25 lexical index (src/embeddings/lexical_index.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "embeddings"))
+
+from lexical_index import is_identifier_query, query_identifiers, tokenize  # noqa: E402
+
+
+@pytest.mark.parametrize("query", [
+    "Explain recursion, e.g. factorial",
+    "What is Node.js used for?",
+    "Sort a list, i.e. in place",
+    "How do I reverse a string?",
+])
+def test_prose_is_not_an_identifier_query(query):
+    assert not is_identifier_query(query)
+
+
+@pytest.mark.parametrize("query, identifiers", [
+    ("how does heapq.nsmallest work", ["heapq.nsmallest"]),
+    ("use `sorted` here", ["sorted"]),
+    ("what does max_heap_size control", ["max_heap_size"]),
+    ("i.e. the getValue method", ["getvalue"]),
+])
+def test_query_identifiers(query, identifiers):
+    assert query_identifiers(query) == identifiers
+
+
+def test_identifiers_match_indexed_tokens():
+    # The tool only short-circuits on chunks whose tokens contain the identifier itself
+    tokens = set(tokenize("smallest = heapq.nsmallest(3, values)"))
+    assert set(query_identifiers("heapq.nsmallest")) <= tokens
+    assert not set(query_identifiers("heapq.nlargest")) & tokens
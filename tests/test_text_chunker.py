@@ -0,0 +1,81 @@
+"""
+Tests for structure-aware code chunking (src/data_processing/text_chunker.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "data_processing"))
+
+pytest.importorskip("langchain")
+
+from text_chunker import chunk_base_name, chunk_code  # noqa: E402
+
+MAX_CHUNK_CHARS = 1500
+
+SOURCES = [
+    os.path.join(ROOT, "src", "embeddings", "vector_index.py"),
+    os.path.join(ROOT, "src", "data_processing", "text_chunker.py"),
+]
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("path", SOURCES)
+def test_chunks_respect_max_chunk_chars(path):
+    chunks = chunk_code(_read(path), language="python", max_chunk_chars=MAX_CHUNK_CHARS)
+    oversized = [(chunk["symbol"], len(chunk["text"])) for chunk in chunks if len(chunk["text"]) > MAX_CHUNK_CHARS]
+    assert not oversized
+
+
+@pytest.mark.parametrize("path", SOURCES)
+def test_chunks_cover_every_line_at_its_source_position(path):
+    source = _read(path)
+    lines = source.splitlines()
+    covered = set()
+    for chunk in chunk_code(source, language="python", max_chunk_chars=MAX_CHUNK_CHARS):
+        assert chunk["text"] == "\n".join(lines[chunk["start_line"] - 1:chunk["end_line"]])
+        covered.update(range(chunk["start_line"] - 1, chunk["end_line"]))
+    missing = [i + 1 for i, line in enumerate(lines) if line.strip() and i not in covered]
+    assert not missing
+
+
+def test_comments_between_members_are_kept():
+    methods = "\n\n".join(f"    def method_{i}(self):\n        return {i}" + "  # padding" * 20 for i in range(12))
+    source = (
+        "class Big:\n"
+        '    """A class too large for one chunk."""\n\n'
+        "    # Section: first half\n"
+        f"{methods}\n\n"
+        "    # Trailing note about Big\n\n"
+        "# Module footer\n"
+    )
+    text = "\n".join(chunk["text"] for chunk in chunk_code(source, language="python", max_chunk_chars=600))
+    for comment in ("# Section: first half", "# Trailing note about Big", "# Module footer"):
+        assert comment in text
+
+
+def test_long_module_level_gap_is_split():
+    source = "\n".join(f"CONSTANT_{i} = {'x' * 40!r}" for i in range(100))
+    chunks = chunk_code(source, language="python", max_chunk_chars=MAX_CHUNK_CHARS)
+    assert len(chunks) > 1
+    assert all(len(chunk["text"]) <= MAX_CHUNK_CHARS for chunk in chunks)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("pkg/foo.py", "pkg/foo.txt"),
+    ("a/b.py", "a__b.py"),
+    ("pkg/__init__.py", "pkg__/init__.py"),
+])
+def test_chunk_base_names_do_not_collide(first, second):
+    assert chunk_base_name(first) != chunk_base_name(second)
+
+
+def test_chunk_base_name_keeps_the_extension():
+    assert chunk_base_name("pkg/utils.py") == "pkg__utils.py"
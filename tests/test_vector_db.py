@@ -0,0 +1,58 @@
+"""
+Tests for migrating legacy per-file collections (src/embeddings/vector_db.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "embeddings"))
+
+pytest.importorskip("chromadb")
+
+import vector_db  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = dict(rows or {})
+
+    def get(self, include, limit, offset):
+        ids = list(self.rows)[offset:offset + limit]
+        return {"ids": ids, "embeddings": [[0.1, 0.2]] * len(ids),
+                "documents": [None] * len(ids), "metadatas": [None] * len(ids)}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.rows.update(zip(ids, metadatas))
+
+
+class FakeClient:
+    def __init__(self, collections):
+        self.collections = {collection.name: collection for collection in collections}
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, FakeCollection(name))
+
+    def list_collections(self):
+        return list(self.collections.values())
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+
+def test_migrated_rows_use_streaming_ids_and_sources(tmp_path):
+    (tmp_path / "cleaned_1_chunk_0.txt").write_text("def f():\n    return 1\n")
+    client = FakeClient([FakeCollection("cleaned_1_chunk_0", {"cleaned_1_chunk_0_id_0": None})])
+
+    stats = vector_db.migrate_to_consolidated(client, chunk_dir=str(tmp_path))
+
+    rows = client.collections[vector_db.DEFAULT_COLLECTION].rows
+    assert stats["rows"] == 1
+    assert list(rows) == ["cleaned_1_chunk_0"]
+    metadata = rows["cleaned_1_chunk_0"]
+    assert metadata["source"] == "cleaned_1"
+    assert metadata["chunk_file"] == "cleaned_1_chunk_0"
+    assert metadata["chunk_idx"] == 0